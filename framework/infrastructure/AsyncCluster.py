@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import aiohttp
+
+from framework.infrastructure.Cluster import ClusterConnectionData, ClusterHeaders, ClusterUrls
+from framework.infrastructure.Monitoring import AsyncMonitoring
+from framework.infrastructure.Repository import AsyncRepositoy
+from framework.infrastructure.Rms import AsyncRms
+
+
+class AsyncCluster:
+    """The asyncio counterpart of `Cluster`.
+
+    All API methods are coroutines, so a single event loop can drive many
+    requests against the cluster at the same time. The number of requests that
+    are in flight at once is bounded by `max_concurrency`.
+    """
+
+    def __init__(self, cluster_connection_data: ClusterConnectionData, max_concurrency: int = 100):
+        self._connectiondata = cluster_connection_data
+        self._urls = ClusterUrls(cluster_connection_data.baseurl)
+        self._headers = ClusterHeaders()
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self._repository = AsyncRepositoy(self)
+        self._rms = AsyncRms(self)
+        self._monitoring = AsyncMonitoring(self)
+
+        self.session = None
+
+        self._loggedin = False
+
+    @property
+    def repository(self) -> AsyncRepositoy:
+        """A reference to the Repository"""
+
+        return self._repository
+
+    @property
+    def rms(self) -> AsyncRms:
+        return self._rms
+
+    @property
+    def monitoring(self) -> AsyncMonitoring:
+        return self._monitoring
+
+    @staticmethod
+    async def connect_to(cluster_connection_data: ClusterConnectionData, max_concurrency: int = 100):
+        cluster = AsyncCluster(cluster_connection_data, max_concurrency)
+        if await cluster.login():
+            return cluster
+
+        await cluster.close()
+        return None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self._max_concurrency,
+            limit_per_host=self._max_concurrency,
+            force_close=not self._connectiondata.keepalive)
+        return aiohttp.ClientSession(connector=connector)
+
+    async def login(self) -> bool:
+        if self.session is None:
+            self.session = self._create_session()
+
+        authBody = {
+            "username": self._connectiondata.user,
+            "password": self._connectiondata.password,
+            "tenant": self._connectiondata.tenant
+        }
+
+        try:
+            authResp = await self._request('POST', self._urls.login, data=json.dumps(authBody),
+                                           headers=self._headers.di_header)
+        except Exception as e:
+            print(
+                "[bold red]Error connecting to the Data Intelligence cluster:[/bold red]")
+            print(self._urls.base)
+            print("[bold red]" + str(e) + "[/bold red]")
+            return False
+
+        if authResp.status_code != 200:
+            print(
+                "[bold red]Error connecting to the Data Intelligence cluster:[/bold red]")
+            return False
+
+        self._loggedin = True
+        return True
+
+    async def close(self) -> None:
+        """Closes the underlying HTTP session."""
+
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> AsyncCluster:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _request(self, method: str, url: str, data=None, headers=None) -> AsyncClusterResponse:
+        async with self._semaphore:
+            async with self.session.request(method, url, data=data, headers=headers) as response:
+                text = await response.text()
+                return AsyncClusterResponse(response.status, text)
+
+    async def apiget(self, path) -> AsyncClusterResponse:
+        return await self._request('GET', self._urls.base + path)
+
+    async def apipost(self, path, data) -> AsyncClusterResponse:
+        return await self._request('POST', self._urls.base + path, data=data, headers=self._headers.di_header)
+
+    async def apidelete(self, path) -> AsyncClusterResponse:
+        return await self._request('DELETE', self._urls.base + path, headers=self._headers.di_header)
+
+    async def apiput(self, path, data) -> AsyncClusterResponse:
+        return await self._request('PUT', self._urls.base + path, data=data, headers=self._headers.di_header)
+
+
+class AsyncClusterResponse:
+    """The fully read response of a request sent by `AsyncCluster`.
+
+    It offers the `status_code` and `text` attributes of the responses of the
+    requests library, so that the response handling of the synchronous and the
+    asynchronous API can be the same."""
+
+    def __init__(self, status_code: int, text: str) -> None:
+        self.status_code = status_code
+        self.text = text
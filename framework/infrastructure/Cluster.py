@@ -1,6 +1,14 @@
+from __future__ import annotations
+
 import requests
 import json
+import socket
+import threading
 from urllib.parse import urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
 from framework.infrastructure.ConnectionManagement import ConnectionManagement
 
 from framework.infrastructure.Modeler import Modeler
@@ -24,9 +32,19 @@ class Cluster:
         self._rms = Rms(self)
         self._monitoring = Monitoring(self)
 
+        self._adapter = ClusterAdapter.for_connectiondata(
+            cluster_connection_data)
         self.session = requests.session()
+        self.session.mount('https://', self._adapter)
+        if not cluster_connection_data.keepalive:
+            self.session.headers['Connection'] = 'close'
 
         self._loggedin = False
+        # serializes the re-logins, the generation tells whether another
+        # thread has logged in since a request was sent
+        self._loginlock = threading.Lock()
+        self._logingeneration = 0
+        self._relogins = 0
 
     @property
     def modeler(self) -> Modeler:
@@ -52,6 +70,19 @@ class Cluster:
     def monitoring(self) -> Monitoring:
         return self._monitoring
 
+    @property
+    def poolstatistics(self) -> ClusterPoolStatistics:
+        """The usage statistics of the HTTP connection pools of the cluster"""
+
+        return self._adapter.statistics()
+
+    @property
+    def relogins(self) -> int:
+        """The number of times the cluster logged in again because the session
+        had expired"""
+
+        return self._relogins
+
     @staticmethod
     def connect_to(cluster_connection_data):
         cluster = Cluster(cluster_connection_data)
@@ -85,23 +116,62 @@ class Cluster:
         self._loggedin = True
         return True
 
+    @staticmethod
+    def is_session_expired(response) -> bool:
+        """Checks whether the response tells that the session has expired:
+        either a 401 or a redirect to the HTML login page instead of the
+        answer of the API."""
+
+        if response.status_code == 401:
+            return True
+
+        headers = getattr(response, 'headers', None) or {}
+        if not headers.get('Content-Type', '').startswith('text/html'):
+            return False
+        url = getattr(response, 'url', None) or ''
+        return bool(getattr(response, 'history', None)) or 'login' in url.lower()
+
+    def _relogin(self, generation: int) -> bool:
+        """Logs in again unless another thread has already done so since the
+        request of the given login generation was sent."""
+
+        with self._loginlock:
+            if self._logingeneration != generation:
+                return True
+            if not self.login():
+                return False
+            self._logingeneration += 1
+            self._relogins += 1
+            return True
+
+    def _send(self, request):
+        """Sends the request and, if the session has expired, logs in again
+        and sends it once more."""
+
+        generation = self._logingeneration
+        response = request()
+        if self._loggedin and self.is_session_expired(response) and self._relogin(generation):
+            response = request()
+        return response
+
     def apiget(self, path):
-        return self.session.get(self._urls.base + path)
+        return self._send(lambda: self.session.get(self._urls.base + path))
 
     def apipost(self, path, data):
-        return self.session.post(self._urls.base + path, data=data, headers=self._headers.di_header)
+        return self._send(lambda: self.session.post(self._urls.base + path, data=data, headers=self._headers.di_header))
 
     def apidelete(self, path):
-        return self.session.delete(self._urls.base + path, headers=self._headers.di_header)
+        return self._send(lambda: self.session.delete(self._urls.base + path, headers=self._headers.di_header))
 
     def apiput(self, path, data):
-        return self.session.put(self._urls.base + path, data=data, headers=self._headers.di_header)
+        return self._send(lambda: self.session.put(self._urls.base + path, data=data, headers=self._headers.di_header))
 
 
 class ClusterConnectionData(ConnectionDataBase):
     """Holds the data that is needed to establish a connection to a DI cluster"""
 
-    property_names = ['baseurl', 'user', 'password', 'tenant']
+    property_names = ['baseurl', 'user', 'password', 'tenant',
+                      'poolconnections', 'poolmaxsize', 'keepalive', 'keepaliveidle']
 
     def __init__(self, name, base_url=None):
         """Creates a new instance of ClusterConnectionData with the given name
@@ -113,6 +183,13 @@ class ClusterConnectionData(ConnectionDataBase):
         self._name = name
         self.baseurl = base_url
 
+        # Defaults of the HTTP connection pool, these match the defaults of
+        # the requests library.
+        self._poolconnections = 10
+        self._poolmaxsize = 10
+        self._keepalive = True
+        self._keepaliveidle = None
+
     def _validate_baseurl(self, base_url):
         """Validates the given base URL by performing some basic sanity checks."""
 
@@ -176,10 +253,155 @@ class ClusterConnectionData(ConnectionDataBase):
         else:
             self._baseurl = None
 
+    @property
+    def poolconnections(self) -> int:
+        """The number of host specific connection pools that are cached."""
+        return self._poolconnections
+
+    @poolconnections.setter
+    def poolconnections(self, poolconnections) -> None:
+        self._poolconnections = _to_positive_int(
+            poolconnections, 'poolconnections')
+
+    @property
+    def poolmaxsize(self) -> int:
+        """The maximum number of connections that are kept per host."""
+        return self._poolmaxsize
+
+    @poolmaxsize.setter
+    def poolmaxsize(self, poolmaxsize) -> None:
+        self._poolmaxsize = _to_positive_int(poolmaxsize, 'poolmaxsize')
+
+    @property
+    def keepalive(self) -> bool:
+        """Whether connections are kept open and reused between requests."""
+        return self._keepalive
+
+    @keepalive.setter
+    def keepalive(self, keepalive) -> None:
+        if isinstance(keepalive, str):
+            keepalive = keepalive.strip().lower() not in ['false', '0', 'no']
+        self._keepalive = bool(keepalive)
+
+    @property
+    def keepaliveidle(self) -> int:
+        """The idle time in seconds after which TCP keep-alive probes are 
+        sent on open connections. If None the system defaults are used."""
+        return self._keepaliveidle
+
+    @keepaliveidle.setter
+    def keepaliveidle(self, keepaliveidle) -> None:
+        if keepaliveidle is None:
+            self._keepaliveidle = None
+        else:
+            self._keepaliveidle = _to_positive_int(
+                keepaliveidle, 'keepaliveidle')
+
     def fill_properties(self, values_dict: dict, property_names=property_names) -> None:
         super().fill_properties(values_dict, property_names)
 
 
+def _to_positive_int(value, name: str) -> int:
+    try:
+        intvalue = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'{name} must be an integer!')
+
+    if intvalue < 1:
+        raise ValueError(f'{name} must be greater than zero!')
+
+    return intvalue
+
+
+class ClusterAdapter(HTTPAdapter):
+    """A transport adapter for the cluster session that allows to configure
+    the connection pools and TCP keep-alive and keeps track of how the pooled
+    connections are used."""
+
+    def __init__(self, socket_options=None, **kwargs) -> None:
+        self._socket_options = socket_options
+        super().__init__(**kwargs)
+
+    @staticmethod
+    def for_connectiondata(cluster_connection_data) -> ClusterAdapter:
+        socket_options = None
+        keepaliveidle = cluster_connection_data.keepaliveidle
+        if cluster_connection_data.keepalive and keepaliveidle is not None:
+            socket_options = HTTPConnection.default_socket_options + \
+                [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+            # TCP_KEEPIDLE is not available on all platforms (e.g. macOS)
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                socket_options.append(
+                    (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepaliveidle))
+
+        return ClusterAdapter(socket_options,
+                              pool_connections=cluster_connection_data.poolconnections,
+                              pool_maxsize=cluster_connection_data.poolmaxsize)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self._socket_options is not None:
+            pool_kwargs['socket_options'] = self._socket_options
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+
+    def statistics(self) -> ClusterPoolStatistics:
+        """Collects the usage statistics of all host pools of the adapter."""
+
+        requestcount = 0
+        connectioncount = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            requestcount += pool.num_requests
+            connectioncount += pool.num_connections
+
+        return ClusterPoolStatistics(len(pools), requestcount, connectioncount)
+
+
+class ClusterPoolStatistics:
+    """A snapshot of the usage of the HTTP connection pools of a cluster.
+
+    Every request either reuses an idle connection from the pool (a hit) or
+    requires a new connection to be opened (a miss), which means a new TCP
+    connection and TLS handshake."""
+
+    def __init__(self, pools: int, requests: int, connections: int) -> None:
+        self._pools = pools
+        self._requests = requests
+        self._connections = connections
+
+    @property
+    def pools(self) -> int:
+        """The number of host pools"""
+        return self._pools
+
+    @property
+    def requests(self) -> int:
+        """The number of requests sent via the pools"""
+        return self._requests
+
+    @property
+    def hits(self) -> int:
+        """The number of requests that reused a pooled connection"""
+        return max(self._requests - self._connections, 0)
+
+    @property
+    def misses(self) -> int:
+        """The number of requests that had to open a new connection"""
+        return self._connections
+
+    @property
+    def reuseratio(self) -> float:
+        """The share of requests that reused a pooled connection"""
+        if self._requests == 0:
+            return 0.0
+        return self.hits / self._requests
+
+    def __str__(self) -> str:
+        return f'Pools:\t{self.pools}, Requests:\t{self.requests}, Hits:\t{self.hits}, Misses:\t{self.misses}'
+
+
 class ClusterUrls:
     def __init__(self, base_url):
         self._base = base_url
@@ -1,10 +1,15 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
+import copy
 import json
 
+import requests
+
 from framework.infrastructure.connections.Connection import Connection
+from framework.infrastructure.utils.TtlLruCache import CacheStatistics, TtlLruCache
 from framework.validation.abap.AbapClient import AbapConnectionData
 from framework.validation.datalake.DatalakeClient import DatalakeConnectionData
 from framework.validation.hana.HanaClient import HanaConnectionData
@@ -15,15 +20,53 @@ if TYPE_CHECKING:
 
 class ConnectionManagement:
 
-    def __init__(self, cluster: Cluster) -> None:
+    def __init__(self, cluster: Cluster, cache: TtlLruCache = None) -> None:
+        """Creates the connection management for the given cluster.
+
+        Connections that are retrieved via `getconnection` are cached. By 
+        default every connection management has its own cache, but a cache 
+        can also be shared since the entries are keyed by cluster and 
+        connection id."""
+
         self._cluster = cluster
+        self._cache = cache if cache is not None else TtlLruCache(
+            maxsize=256, ttl=300)
+
+    @property
+    def cache(self) -> TtlLruCache:
+        return self._cache
+
+    @property
+    def cachestatistics(self) -> CacheStatistics:
+        return self._cache.statistics()
+
+    def _cachekey(self, connectionid: str):
+        connectiondata = self._cluster._connectiondata
+        return (connectiondata.baseurl, connectiondata.tenant, connectionid)
 
     def getconnection(self, connectionid: str) -> Connection:
+        """Returns the connection with the given id or None if there is no 
+        such connection. The connection is served from the cache if possible."""
+
+        key = self._cachekey(connectionid)
+        connection = self._cache.get(key)
+        if connection is not None:
+            return copy.deepcopy(connection)
+
+        connection = self._fetchconnection(connectionid)
+        if connection is not None:
+            self._cache.put(key, connection)
+            return copy.deepcopy(connection)
+
+        return None
+
+    def _fetchconnection(self, connectionid: str) -> Connection:
+        """Reads the connection with the given id bypassing the cache."""
+
         path = '/app/datahub-app-connection/connections/' + connectionid
         response = self._cluster.apiget(path)
         if 200 == response.status_code:
             return ConnectionJson.deserialize(response.text)
-
         return None
 
     def create_abap_connection(self, connection_data: AbapConnectionData) -> Connection:
@@ -90,16 +133,110 @@ class ConnectionManagement:
     def save_connection(self, connection: Connection):
         path = '/app/datahub-app-connection/connections'
         payload = ConnectionJson.serialize(connection)
-        response = self._cluster.apipost(
-            path, payload)
+        try:
+            response = self._cluster.apipost(
+                path, payload)
+        finally:
+            # invalidated after the request, so that a concurrent read can't
+            # cache the previous definition again
+            self._cache.invalidate(self._cachekey(connection.id))
         if 201 == response.status_code:
             return
 
         raise RuntimeError(response.text)
 
+    def update_connection(self, connection: Connection) -> None:
+        path = f'/app/datahub-app-connection/connections/{connection.id}'
+        payload = ConnectionJson.serialize(connection)
+        try:
+            response = self._cluster.apiput(path, payload)
+        finally:
+            self._cache.invalidate(self._cachekey(connection.id))
+        if response.status_code in [200, 204]:
+            return
+
+        raise RuntimeError(response.text)
+
+    def getconnections(self) -> list[Connection]:
+        """Returns all connections of the cluster."""
+
+        path = '/app/datahub-app-connection/connections'
+        response = self._cluster.apiget(path)
+        if 200 != response.status_code:
+            raise RuntimeError(response.text)
+
+        connections = []
+        for values in json.loads(response.text):
+            connection = Connection(values['id'])
+            connection._values = values
+            connections.append(connection)
+        return connections
+
+    def apply(self, connections: list[Connection], max_workers: int = 8) -> dict[str, ConnectionApplyAction]:
+        """Makes sure that the given connections exist with the given values.
+
+        The existing connections are listed once and compared with the desired
+        connections. Only connections that are missing are created and only
+        connections whose values differ are updated, the requests are sent 
+        concurrently. This makes provisioning re-runnable and fast when 
+        nothing changed. Secrets such as passwords can't be compared because 
+        they are not returned by the connection management, so changes that
+        only affect secrets are not detected.
+
+        Returns
+        -------
+        dict[str, ConnectionApplyAction]
+            The action that was taken per connection id.
+
+        Raises
+        ------
+        RuntimeError
+            If creating or updating any of the connections failed, also if 
+            the request itself failed. All other connections are applied 
+            nevertheless.
+        """
+
+        existing = {}
+        for connection in self.getconnections():
+            existing[connection.id] = connection
+
+        def apply_connection(connection: Connection) -> tuple[ConnectionApplyAction, str]:
+            action = ConnectionApplyAction.CREATED
+            try:
+                current = existing.get(connection.id, None)
+                if current is not None and 'contentData' not in current._values:
+                    # the listing only holds a summary, the full definition
+                    # is read bypassing the cache; a connection that has
+                    # vanished in the meantime is created again
+                    current = self._fetchconnection(connection.id)
+
+                if current is None:
+                    self.save_connection(connection)
+                elif ConnectionDiff.differs(connection._values, current._values):
+                    action = ConnectionApplyAction.UPDATED
+                    self.update_connection(connection)
+                else:
+                    action = ConnectionApplyAction.UNCHANGED
+            except (RuntimeError, requests.RequestException) as e:
+                return action, f'{connection.id}: {e}'
+            return action, None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(apply_connection, connections))
+
+        actions = {connection.id: action for connection, (action, error) in zip(connections, results)}
+        errors = [error for action, error in results if error is not None]
+        if errors:
+            raise RuntimeError('\n'.join(errors))
+
+        return actions
+
     def remove_connection(self, connection_id: str) -> None:
         path = f'/app/datahub-app-connection/connections/{connection_id}'
-        response = self._cluster.apidelete(path)
+        try:
+            response = self._cluster.apidelete(path)
+        finally:
+            self._cache.invalidate(self._cachekey(connection_id))
         if 204 == response.status_code:
             return
 
@@ -112,6 +249,52 @@ class ConnectionType(Enum):
     ADLv2 = "ADL_V2"
 
 
+class ConnectionApplyAction(Enum):
+    CREATED = "CREATED"
+    UPDATED = "UPDATED"
+    UNCHANGED = "UNCHANGED"
+
+
+class ConnectionDiff:
+    """Compares the values of a desired connection with those of an existing
+    one. Only the values that are given for the desired connection are 
+    compared, additional values of the existing connection (e.g. owner or 
+    timestamps) as well as secrets are ignored. Scalars are compared by
+    their string value, because the connection management may return e.g. 
+    a port given as number as string."""
+
+    secret_keys = ['password', 'accountKey']
+
+    @staticmethod
+    def normalize(value):
+        if isinstance(value, bool):
+            return str(value).lower()
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, (int, float)):
+            return str(value)
+        if isinstance(value, list):
+            return [ConnectionDiff.normalize(item) for item in value]
+        if isinstance(value, dict):
+            return {key: ConnectionDiff.normalize(item) for key, item in value.items()}
+        return value
+
+    @staticmethod
+    def differs(desired: dict, existing: dict) -> bool:
+        for key, value in desired.items():
+            if key in ConnectionDiff.secret_keys:
+                continue
+
+            existing_value = existing.get(key, None)
+            if isinstance(value, dict) and isinstance(existing_value, dict):
+                if ConnectionDiff.differs(value, existing_value):
+                    return True
+            elif ConnectionDiff.normalize(value) != ConnectionDiff.normalize(existing_value):
+                return True
+
+        return False
+
+
 class ConnectionJson:
     @staticmethod
     def deserialize(jsoncontent: str) -> Connection:
@@ -1,7 +1,10 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+import copy
 import json
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 
 from framework.infrastructure.replications.Replication import Replication, ReplicationSpace, ReplicationTargetSpace, ReplicationTask
 from framework.infrastructure.graphs.Graph import Graph
@@ -69,6 +72,91 @@ class ReplicationsModeler:
         replication = ModelerReplicationJson.deserialize(response.text, self)
         return replication
 
+    def deploy_replications(self, replications: list[Replication], max_workers: int = 8) -> list[ReplicationDeployment]:
+        """Saves and deploys many replications at once.
+
+        The given replications serve as specification and can be plain
+        `Replication` objects with source space, target space and tasks set.
+        The deployment runs in three stages:
+
+        1. resolve: the connection of every distinct connection id is looked 
+           up once in the connection management.
+        2. save: all .replication files are written to the repository 
+           concurrently.
+        3. deploy: the replication flows are created via the RMS 
+           concurrently.
+
+        At most `max_workers` requests are sent at the same time.
+
+        Returns
+        -------
+        list[ReplicationDeployment]
+            One deployment per given replication, in the same order. A failed
+            deployment has no replication flow but an error, e.g. if a space
+            is missing or the connection management could not find one of 
+            its connections. The other deployments are not affected.
+        """
+
+        deployments = [ReplicationDeployment(
+            self._to_modelerreplication(replication)) for replication in replications]
+        for deployment in deployments:
+            deployment._validate()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            self._resolve_connections(deployments, executor)
+            list(executor.map(ReplicationDeployment._save, deployments))
+            list(executor.map(ReplicationDeployment._deploy, deployments))
+
+        return deployments
+
+    def _to_modelerreplication(self, replication: Replication) -> ModelerReplication:
+        if isinstance(replication, ModelerReplication) and replication._modeler == self:
+            return replication
+
+        modelerreplication = ModelerReplication(replication.name, self)
+        modelerreplication.set_description(replication.description)
+        modelerreplication._version = replication.version or 'ONE_SOURCE_ONE_TARGET'
+        # the spaces get the resolved connection types, so the given
+        # replication must not share them
+        modelerreplication._sourcespace = copy.copy(replication.sourcespace)
+        modelerreplication._targetspace = copy.copy(replication.targetspace)
+        modelerreplication._oneSourceOneTargetTasks = list(replication.tasks)
+        return modelerreplication
+
+    def _resolve_connections(self, deployments: list[ReplicationDeployment], executor: ThreadPoolExecutor) -> None:
+        start = perf_counter()
+        deployments = [deployment for deployment in deployments if deployment.error is None]
+        connectionids = set()
+        for deployment in deployments:
+            connectionids.add(deployment.replication.sourcespace._connectionid)
+            connectionids.add(deployment.replication.targetspace._connectionid)
+
+        connectionmanagement = self._cluster.connectionmanagement
+
+        def getconnection(connectionid: str):
+            try:
+                connection = connectionmanagement.getconnection(connectionid)
+            except Exception as e:
+                return None, f'Resolving the connection {connectionid} failed: {e}'
+            if connection is None:
+                return None, f'No connection with id {connectionid} found!'
+            return connection, None
+
+        connectionids = sorted(connectionids)
+        connections = dict(zip(connectionids, executor.map(
+            getconnection, connectionids)))
+
+        duration = perf_counter() - start
+        for deployment in deployments:
+            deployment._latencies['resolve'] = duration
+            for space in [deployment.replication.sourcespace, deployment.replication.targetspace]:
+                connection, error = connections[space._connectionid]
+                if error is not None:
+                    deployment._error = error
+                    break
+                space._connectiontype = connection.type
+                space._ccmconnectiontype = connection.ccmTypeId
+
 
 class ModelerReplication(Replication):
     def __init__(self, name: str, modeler: ReplicationsModeler) -> None:
@@ -186,6 +274,85 @@ class ModelerReplication(Replication):
         return rms.deletereplicationflow(self)
 
 
+class ReplicationDeployment:
+    """The result of the deployment of a single replication via
+    `ReplicationsModeler.deploy_replications`."""
+
+    def __init__(self, replication: ModelerReplication) -> None:
+        self._replication = replication
+        self._replicationflow = None
+        self._error = None
+        self._latencies = {}
+
+    @property
+    def replication(self) -> ModelerReplication:
+        return self._replication
+
+    @property
+    def replicationflow(self) -> Replicationflow:
+        """The deployed replication flow or None if the deployment failed."""
+        return self._replicationflow
+
+    @property
+    def error(self) -> str:
+        """The reason why the deployment failed or None."""
+        return self._error
+
+    @property
+    def latencies(self) -> dict[str, float]:
+        """The duration in seconds of each stage ('resolve', 'save' and 
+        'deploy') of the deployment. Stages that were not reached are 
+        missing."""
+        return self._latencies
+
+    def _validate(self) -> None:
+        if self._replication.sourcespace is None:
+            self._error = 'The replication has no source space'
+        elif self._replication.targetspace is None:
+            self._error = 'The replication has no target space'
+
+    def _save(self) -> None:
+        if self._error is not None:
+            return
+
+        start = perf_counter()
+        repository = self._replication._modeler.cluster.repository
+        path = 'files/rms/' + self._replication.name + '.replication'
+        try:
+            payload = ModelerReplicationJson.serialize(self._replication)
+            response = repository.write('user', path, payload)
+        except Exception as e:
+            self._error = f'Saving failed: {e}'
+            return
+        finally:
+            self._latencies['save'] = perf_counter() - start
+
+        if response.status_code >= 400:
+            self._error = f'Saving failed with status {response.status_code}: {response.text}'
+
+    def _deploy(self) -> None:
+        if self._error is not None:
+            return
+
+        start = perf_counter()
+        try:
+            self._replicationflow = self._replication.deploy()
+        except Exception as e:
+            self._error = f'Deployment failed: {e}'
+            return
+        finally:
+            self._latencies['deploy'] = perf_counter() - start
+
+        if self._replicationflow is None:
+            self._error = 'Deployment failed'
+
+    def __str__(self) -> str:
+        latencies = ', '.join(
+            f'{stage}: {duration:.3f}s' for stage, duration in self._latencies.items())
+        status = 'OK' if self._error is None else self._error
+        return f'{self._replication.name}:\t{status} - {latencies}'
+
+
 class ModelerReplicationJson:
     """This class provides a static method `serialize` to serialize replications to JSON format."""
 
@@ -8,6 +8,7 @@ from enum import Enum
 from isodate import parse_datetime
 
 if TYPE_CHECKING:
+    from framework.infrastructure.AsyncCluster import AsyncCluster
     from framework.infrastructure.Cluster import Cluster
 
 
@@ -65,6 +66,58 @@ class ReplicationsMonitoring:
         return monitors
 
 
+class AsyncMonitoring:
+    """The asyncio counterpart of `Monitoring` to be used with an `AsyncCluster`."""
+
+    def __init__(self, cluster: AsyncCluster) -> None:
+        self._cluster = cluster
+        self._replications = AsyncReplicationsMonitoring(self)
+
+    @property
+    def cluster(self) -> AsyncCluster:
+        return self._cluster
+
+    @property
+    def replications(self) -> AsyncReplicationsMonitoring:
+        return self._replications
+
+
+class AsyncReplicationsMonitoring:
+    """The asyncio counterpart of `ReplicationsMonitoring`."""
+
+    def __init__(self, monitoring: AsyncMonitoring) -> None:
+        self._monitoring = monitoring
+
+    async def get_monitors(self) -> List[ReplicationMonitor]:
+        response = await self._monitoring.cluster.apiget(
+            '/app/rms/api/dt/v1/replicationflowMonitors')
+        monitors: List[ReplicationMonitor] = []
+        responsedata = json.loads(response.text)
+        for entry in responsedata:
+            monitors.append(ReplicationMonitor(entry))
+        return monitors
+
+    async def get_monitor(self, name) -> ReplicationMonitor:
+        response = await self._monitoring.cluster.apiget(
+            f'/app/rms/api/dt/v1/replicationflowMonitors?name={name}')
+        responsedata = json.loads(response.text)
+
+        monitor = ReplicationMonitor(responsedata[0])
+        if name == monitor.name:
+            return monitor
+
+        return None
+
+    async def get_taskmonitors(self, name) -> List[Replicationtaskmonitor]:
+        response = await self._monitoring.cluster.apiget(
+            f'/app/rms/api/dt/v1/replicationflows/{name}/taskMonitors')
+        monitors: List[Replicationtaskmonitor] = []
+        responsedata = json.loads(response.text)
+        for entry in responsedata:
+            monitors.append(Replicationtaskmonitor(entry))
+        return monitors
+
+
 class ReplicationMonitor:
 
     def __init__(self, values: Dict) -> None:
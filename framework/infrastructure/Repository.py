@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from framework.infrastructure.AsyncCluster import AsyncCluster
     from framework.infrastructure.Cluster import Cluster
 
 class Repositoy: 
@@ -29,3 +30,29 @@ class Repositoy:
         querypath = '/repository/v2/files/' + spacetype + '/' + path + '?op=read'
         return self._cluster.apiget(querypath)
 
+
+class AsyncRepositoy:
+    """The asyncio counterpart of `Repositoy` to be used with an `AsyncCluster`."""
+
+    def __init__(self, cluster: AsyncCluster) -> None:
+        self._cluster = cluster
+
+    async def get_status(self, spacetype, path):
+        querypath = '/repository/v2/files/' + spacetype + '/' + path + '?op=stat'
+        return await self._cluster.apiget(querypath)
+
+    async def exists(self, spacetype, path) -> bool:
+        response = await self.get_status(spacetype, path)
+        return response.status_code == 200
+
+    async def write(self, spacetype, path, content):
+        querypath = '/repository/v2/files/' + spacetype + '/' + path + '?op=write'
+        return await self._cluster.apipost(querypath, content)
+
+    async def remove(self, spacetype, path):
+        querypath = '/repository/v2/files/' + spacetype + '/' + path + '?op=remove'
+        return await self._cluster.apidelete(querypath)
+
+    async def read(self, spacetype, path):
+        querypath = '/repository/v2/files/' + spacetype + '/' + path + '?op=read'
+        return await self._cluster.apiget(querypath)
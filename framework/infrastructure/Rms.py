@@ -1,13 +1,17 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
 
+import asyncio
+import heapq
 import json
-from time import sleep
+import random
+from time import monotonic, sleep
 from enum import Enum
 
 from framework.infrastructure.Modeler import ModelerReplicationJson
 from framework.infrastructure.replications import Replication
 if TYPE_CHECKING:
+    from framework.infrastructure.AsyncCluster import AsyncCluster
     from framework.infrastructure.Cluster import Cluster
 
 
@@ -48,6 +52,14 @@ class Rms:
         replicationflow._changerequeststatusurl = responsedata['url']
         return replicationflow
 
+    def wait_all(self, replicationflows: list[Replicationflow], maxrate: float = 10.0) -> list[Changerequeststatus]:
+        """Waits until none of the given replication flows is busy anymore and
+        returns their change request status in the order of the given flows.
+
+        See `ReplicationflowGroup` for details."""
+
+        return ReplicationflowGroup(replicationflows, maxrate).waitwhilebusy()
+
 
 class Replicationflow:
     def __init__(self, name: str, rms: Rms) -> None:
@@ -55,8 +67,23 @@ class Replicationflow:
         self._rms = rms
         self._changerequeststatusurl = None
 
-        self._waittime = 0.5
-        #self._waittries = 60
+        self._pollingpolicy = PollingPolicy()
+        self._pollcounts = []
+
+    @property
+    def pollingpolicy(self) -> PollingPolicy:
+        """The policy that controls how often the change request status is 
+        polled while waiting."""
+        return self._pollingpolicy
+
+    def set_pollingpolicy(self, pollingpolicy: PollingPolicy) -> None:
+        self._pollingpolicy = pollingpolicy
+
+    @property
+    def pollcounts(self) -> list[int]:
+        """The number of polls that each of the waits on this replication flow
+        took, in the order of the waits."""
+        return self._pollcounts
 
     def getchangerequeststatus(self) -> Changerequeststatus:
         if self._changerequeststatusurl is None:
@@ -73,20 +100,305 @@ class Replicationflow:
         return response
 
     def waitwhile(self, wait_status) -> Changerequeststatus:
-        changerequeststatus = None
-        busy = True
-        while busy:
+        """Polls the change request status as long as it is one of the given
+        wait status and returns the last retrieved change request status.
+
+        The intervals between the polls are determined by the polling policy
+        of the replication flow.
+
+        Raises
+        ------
+        ChangerequeststatusTimeoutError
+            If the change request status is still one of the wait status when
+            the deadline of the polling policy is reached.
+        """
+
+        start = monotonic()
+        polls = 0
+        while True:
             changerequeststatus = self.getchangerequeststatus()
-            status = changerequeststatus.getstatus()
-            busy = status in wait_status
-            sleep(self._waittime)
+            polls += 1
+            if changerequeststatus.getstatus() not in wait_status:
+                break
 
+            interval = self._pollingpolicy.get_waittime(
+                polls, monotonic() - start)
+            if interval is None:
+                self._pollcounts.append(polls)
+                raise ChangerequeststatusTimeoutError(
+                    self._name, changerequeststatus, polls)
+            sleep(interval)
+
+        self._pollcounts.append(polls)
         return changerequeststatus
 
     def waitwhilebusy(self) -> Changerequeststatus:
         return self.waitwhile([ChangerequeststatusStatus.VALIDATING, ChangerequeststatusStatus.PROCESSING])
 
 
+class ReplicationflowGroup:
+    """Waits for the change requests of many replication flows at once.
+
+    The change request status of all flows are polled in a single loop. Each
+    flow is polled according to its own polling policy, but all polls share a
+    common rate limit of `maxrate` polls per second (None means no limit). This
+    way N deployed flows can be waited for in roughly the time of the slowest 
+    one without hammering the RMS.
+    """
+
+    def __init__(self, replicationflows: list[Replicationflow], maxrate: float = 10.0) -> None:
+        if maxrate is not None and maxrate <= 0:
+            raise ValueError('The maxrate must be greater than zero!')
+
+        self._replicationflows = list(replicationflows)
+        self._maxrate = maxrate
+
+    @property
+    def replicationflows(self) -> list[Replicationflow]:
+        return self._replicationflows
+
+    def as_completed(self, wait_status) -> Iterator[tuple[Replicationflow, Changerequeststatus]]:
+        """Yields each replication flow together with its change request status
+        as soon as the status is not one of the given wait status anymore.
+
+        Raises
+        ------
+        ChangerequeststatusTimeoutError
+            If the change request of a flow is still in one of the wait status
+            when the deadline of its polling policy is reached.
+        """
+
+        start = monotonic()
+        mindistance = 0 if self._maxrate is None else 1 / self._maxrate
+        lastpoll = None
+        polls = [0] * len(self._replicationflows)
+
+        # entries of the schedule: (time of the next poll, index of the flow)
+        schedule = [(start, index)
+                    for index in range(len(self._replicationflows))]
+        heapq.heapify(schedule)
+
+        while schedule:
+            duetime, index = heapq.heappop(schedule)
+            if lastpoll is not None:
+                duetime = max(duetime, lastpoll + mindistance)
+            delay = duetime - monotonic()
+            if delay > 0:
+                sleep(delay)
+
+            replicationflow = self._replicationflows[index]
+            lastpoll = monotonic()
+            changerequeststatus = replicationflow.getchangerequeststatus()
+            polls[index] += 1
+
+            if changerequeststatus is None or changerequeststatus.getstatus() not in wait_status:
+                replicationflow._pollcounts.append(polls[index])
+                yield replicationflow, changerequeststatus
+                continue
+
+            interval = replicationflow.pollingpolicy.get_waittime(
+                polls[index], monotonic() - start)
+            if interval is None:
+                replicationflow._pollcounts.append(polls[index])
+                raise ChangerequeststatusTimeoutError(
+                    replicationflow._name, changerequeststatus, polls[index])
+            heapq.heappush(schedule, (monotonic() + interval, index))
+
+    def as_completed_while_busy(self) -> Iterator[tuple[Replicationflow, Changerequeststatus]]:
+        return self.as_completed([ChangerequeststatusStatus.VALIDATING, ChangerequeststatusStatus.PROCESSING])
+
+    def waitwhile(self, wait_status) -> list[Changerequeststatus]:
+        """Waits for all replication flows and returns their change request 
+        status in the order of the flows of the group."""
+
+        results = {}
+        for replicationflow, changerequeststatus in self.as_completed(wait_status):
+            results[id(replicationflow)] = changerequeststatus
+
+        return [results[id(replicationflow)] for replicationflow in self._replicationflows]
+
+    def waitwhilebusy(self) -> list[Changerequeststatus]:
+        return self.waitwhile([ChangerequeststatusStatus.VALIDATING, ChangerequeststatusStatus.PROCESSING])
+
+
+class PollingPolicy:
+    """Determines the wait times between the polls of a change request status.
+
+    The wait time starts with the initial interval and grows by the multiplier
+    with every poll until it reaches the maximum interval. Each wait time is
+    randomly varied by the jitter (a fraction of the wait time) so that many
+    waiting replication flows don't poll in lockstep. Polling stops once the
+    deadline (in seconds) is reached, a deadline of None means no limit.
+    """
+
+    def __init__(self, initialinterval: float = 0.5, multiplier: float = 1.5, maxinterval: float = 10.0,
+                 jitter: float = 0.1, deadline: float = 3600.0) -> None:
+        if initialinterval < 0 or maxinterval < 0:
+            raise ValueError('The intervals must not be negative!')
+        if multiplier < 1:
+            raise ValueError('The multiplier must be at least 1!')
+        if jitter < 0 or jitter >= 1:
+            raise ValueError('The jitter must be between 0 and 1!')
+
+        self._initialinterval = initialinterval
+        self._multiplier = multiplier
+        self._maxinterval = maxinterval
+        self._jitter = jitter
+        self._deadline = deadline
+
+    @property
+    def initialinterval(self) -> float:
+        return self._initialinterval
+
+    @property
+    def multiplier(self) -> float:
+        return self._multiplier
+
+    @property
+    def maxinterval(self) -> float:
+        return self._maxinterval
+
+    @property
+    def jitter(self) -> float:
+        return self._jitter
+
+    @property
+    def deadline(self) -> float:
+        return self._deadline
+
+    def get_interval(self, polls: int) -> float:
+        """Returns the wait time after the given number of polls without 
+        taking the deadline into account."""
+
+        interval = min(self._initialinterval *
+                       self._multiplier ** (polls - 1), self._maxinterval)
+        if self._jitter > 0:
+            interval *= random.uniform(1 - self._jitter, 1 + self._jitter)
+        return interval
+
+    def get_waittime(self, polls: int, elapsed: float) -> float:
+        """Returns the time to wait before the next poll after the given number
+        of polls and elapsed seconds. None is returned if the deadline has been
+        reached."""
+
+        interval = self.get_interval(polls)
+        if self._deadline is None:
+            return interval
+
+        remaining = self._deadline - elapsed
+        if remaining <= 0:
+            return None
+        return min(interval, remaining)
+
+
+class ChangerequeststatusTimeoutError(TimeoutError):
+    """Raised when a change request did not leave its wait status before the 
+    deadline of the polling policy."""
+
+    def __init__(self, name: str, changerequeststatus: Changerequeststatus, polls: int) -> None:
+        super().__init__(
+            f'Change request of replication flow {name} is still {changerequeststatus.getstatus().value} after {polls} polls')
+        self.name = name
+        self.changerequeststatus = changerequeststatus
+        self.polls = polls
+
+
+class AsyncRms:
+    """The asyncio counterpart of `Rms` to be used with an `AsyncCluster`."""
+
+    def __init__(self, cluster: AsyncCluster) -> None:
+        self._cluster = cluster
+
+    @property
+    def cluster(self) -> AsyncCluster:
+        return self._cluster
+
+    async def createreplicationflow(self, replication: Replication) -> AsyncReplicationflow:
+        data = ModelerReplicationJson.serialize(replication)
+        response = await self._cluster.apipost(
+            '/app/rms/api/dt/v1/replicationflows', data)
+
+        if response.status_code >= 400:
+            return None
+
+        responsedata = json.loads(response.text)
+        replicationflow = AsyncReplicationflow(replication.name, self)
+        replicationflow._changerequeststatusurl = responsedata['url']
+        return replicationflow
+
+    async def deletereplicationflow(self, replication) -> AsyncReplicationflow:
+        path = '/app/rms/api/dt/v1/replicationflows/' + replication.name
+        response = await self._cluster.apidelete(path)
+
+        if response.status_code >= 400:
+            return None
+
+        responsedata = json.loads(response.text)
+        replicationflow = AsyncReplicationflow(replication.name, self)
+        replicationflow._changerequeststatusurl = responsedata['url']
+        return replicationflow
+
+
+class AsyncReplicationflow:
+    """The asyncio counterpart of `Replicationflow`."""
+
+    def __init__(self, name: str, rms: AsyncRms) -> None:
+        self._name = name
+        self._rms = rms
+        self._changerequeststatusurl = None
+
+        self._pollingpolicy = PollingPolicy()
+        self._pollcounts = []
+
+    @property
+    def pollingpolicy(self) -> PollingPolicy:
+        return self._pollingpolicy
+
+    def set_pollingpolicy(self, pollingpolicy: PollingPolicy) -> None:
+        self._pollingpolicy = pollingpolicy
+
+    @property
+    def pollcounts(self) -> list[int]:
+        return self._pollcounts
+
+    async def getchangerequeststatus(self) -> Changerequeststatus:
+        if self._changerequeststatusurl is None:
+            return None
+
+        response = await self._rms.cluster.apiget(
+            '/app/rms' + self._changerequeststatusurl)
+        responsedata = json.loads(response.text)
+        return Changerequeststatus(responsedata)
+
+    async def runorresume(self):
+        response = await self._rms.cluster.apiput(
+            '/app/rms/api/dt/v1/replicationflows/' + self._name + '?requestType=RUN_OR_RESUME_ALL_INACTIVE_TASKS', '')
+        return response
+
+    async def waitwhile(self, wait_status) -> Changerequeststatus:
+        start = monotonic()
+        polls = 0
+        while True:
+            changerequeststatus = await self.getchangerequeststatus()
+            polls += 1
+            if changerequeststatus.getstatus() not in wait_status:
+                break
+
+            interval = self._pollingpolicy.get_waittime(
+                polls, monotonic() - start)
+            if interval is None:
+                self._pollcounts.append(polls)
+                raise ChangerequeststatusTimeoutError(
+                    self._name, changerequeststatus, polls)
+            await asyncio.sleep(interval)
+
+        self._pollcounts.append(polls)
+        return changerequeststatus
+
+    async def waitwhilebusy(self) -> Changerequeststatus:
+        return await self.waitwhile([ChangerequeststatusStatus.VALIDATING, ChangerequeststatusStatus.PROCESSING])
+
+
 class Changerequeststatus:
 
     def __init__(self, data) -> None:
@@ -11,6 +11,8 @@ class Replication:
         self._name = name
         self._description = ''
         self._version = None
+        self._sourcespace = None
+        self._targetspace = None
         self._oneSourceOneTargetTasks = []
 
     @property
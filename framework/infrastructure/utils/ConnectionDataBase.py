@@ -1,6 +1,8 @@
 class ConnectionDataBase:
     """A base class to be used by specialized ConnectionData implementations."""
 
+    secret_names = ['password', 'passwd', 'accountkey']
+
     def fill_properties(self, values_dict: dict, property_names) -> None:
         """
         Fills the properties that match the given property_names with the
@@ -13,3 +15,15 @@ class ConnectionDataBase:
                 value = values_dict.get(property_name, None)
                 if value is not None:
                     setattr(self, property_name, value)
+
+    def get_identity(self) -> tuple:
+        """
+        Gets a key that is equal for all connection data with the same type
+        and values, no matter whether they were read separately. Secrets are
+        not part of the key.
+
+        """
+
+        values = tuple((property_name, str(getattr(self, property_name, None)))
+                       for property_name in self.property_names if property_name not in self.secret_names)
+        return (type(self).__name__,) + values
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from framework.infrastructure.Cluster import Cluster, ClusterConnectionData
+    from framework.validation.abap.AbapClient import AbapConnectionData
+    from framework.validation.abap.CitAbapClient import CitAbapClient
+    from framework.validation.hana.HanaClient import HanaClient, HanaConnectionData
+
+
+class SessionRegistry:
+    """A process-wide registry of connected clients.
+
+    The clients are registered by their kind and the identity of their
+    connection data, see `ConnectionDataBase.get_identity`, so all test
+    modules of a run share one login per system. Concurrent requests for the
+    same system wait for the first login instead of logging in themselves.
+    The registered clients are thread-safe: the HANA and ABAP clients borrow
+    their connections from pools.
+
+    A Cluster logs in again by itself when its session has expired.
+    """
+
+    _default = None
+    _defaultlock = threading.Lock()
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients = {}
+        # one lock per key, so logins to different systems don't block each other
+        self._keylocks = {}
+        self._logins = 0
+
+    @classmethod
+    def get_default(cls) -> SessionRegistry:
+        """The registry shared by the whole process."""
+
+        with cls._defaultlock:
+            if cls._default is None:
+                cls._default = SessionRegistry()
+            return cls._default
+
+    @property
+    def logins(self) -> int:
+        """The number of clients that have been connected"""
+        return self._logins
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+    def get(self, kind: str, connection_data, connect):
+        """
+        Gets the client of the given kind for the connection data, connecting
+        it with `connect` if there is none yet.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of the client, e.g. 'cluster'.
+        connection_data
+            The connection data, see `ConnectionDataBase.get_identity`.
+        connect : callable
+            Creates the client from the connection data. If it returns None
+            the result is not registered.
+        """
+
+        key = (kind, connection_data.get_identity())
+        with self._lock:
+            client = self._clients.get(key, None)
+            if client is not None:
+                return client
+            keylock = self._keylocks.setdefault(key, threading.Lock())
+
+        with keylock:
+            with self._lock:
+                client = self._clients.get(key, None)
+            if client is not None:
+                return client
+
+            client = connect(connection_data)
+            if client is not None:
+                with self._lock:
+                    self._clients[key] = client
+                    self._logins += 1
+            return client
+
+    def get_cluster(self, connection_data: ClusterConnectionData) -> Cluster:
+        from framework.infrastructure.Cluster import Cluster
+
+        return self.get('cluster', connection_data, Cluster.connect_to)
+
+    def get_hanaclient(self, connection_data: HanaConnectionData, maxsize: int = 8) -> HanaClient:
+        # imported here, so that the database drivers are only needed if used
+        from framework.validation.hana.HanaClient import HanaClient
+
+        return self.get('hana', connection_data,
+                        lambda connection_data: HanaClient.connect_pooled(connection_data, maxsize=maxsize))
+
+    def get_citabapclient(self, connection_data: AbapConnectionData) -> CitAbapClient:
+        # imported here, so that the RFC SDK is only needed if used
+        from framework.validation.abap.CitAbapClient import CitAbapClient
+
+        return self.get('citabap', connection_data, CitAbapClient.connect_pooled)
+
+    def invalidate(self, connection_data=None) -> None:
+        """Removes the clients of the given connection data or all clients,
+        they are connected again the next time they are requested."""
+
+        with self._lock:
+            if connection_data is None:
+                self._clients.clear()
+                return
+            identity = connection_data.get_identity()
+            for key in [key for key in self._clients if key[1] == identity]:
+                del self._clients[key]
+
+
+def get_cluster(connection_data: ClusterConnectionData) -> Cluster:
+    """Gets the logged in Cluster from the process-wide registry."""
+    return SessionRegistry.get_default().get_cluster(connection_data)
+
+
+def get_hanaclient(connection_data: HanaConnectionData) -> HanaClient:
+    """Gets the pooled HanaClient from the process-wide registry."""
+    return SessionRegistry.get_default().get_hanaclient(connection_data)
+
+
+def get_citabapclient(connection_data: AbapConnectionData) -> CitAbapClient:
+    """Gets the pooled CitAbapClient from the process-wide registry."""
+    return SessionRegistry.get_default().get_citabapclient(connection_data)
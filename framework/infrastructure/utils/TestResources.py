@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import threading
+
+RESOURCES_ATTRIBUTE = 'resources'
+
+# the default number of tests that may use a resource of a kind at the same time
+DEFAULT_LIMITS = {
+    'cluster': 4,
+    'hana': 8,
+}
+
+
+def uses_resources(*names: str):
+    """Declares the systems a test class or test method uses, so that a
+    parallel test run doesn't overload or collide on them.
+
+    The names have the form 'kind:system', e.g. 'cluster:CIT', 'hana:CIT' or
+    'abap:CIT_S4'. The limit of concurrent tests per resource is looked up by
+    the full name first and then by the kind, see `ResourceLimiter`.
+
+    Examples
+    --------
+    >>> @uses_resources('cluster:CIT', 'abap:CIT_S4')
+    ... class testCIT_RMS_runtime(unittest.TestCase):
+    ...     ...
+    """
+
+    def decorate(target):
+        existing = tuple(getattr(target, RESOURCES_ATTRIBUTE, ()))
+        setattr(target, RESOURCES_ATTRIBUTE, existing + tuple(name for name in names if name not in existing))
+        return target
+
+    return decorate
+
+
+def get_resources(test) -> set[str]:
+    """Gets the resources a test case uses, those of its class and of its
+    test method."""
+
+    resources = set(getattr(type(test), RESOURCES_ATTRIBUTE, ()))
+    methodname = getattr(test, '_testMethodName', None)
+    if methodname is not None:
+        method = getattr(type(test), methodname, None)
+        resources.update(getattr(method, RESOURCES_ATTRIBUTE, ()))
+    return resources
+
+
+class ResourceLimiter:
+    """Limits the number of concurrent users per resource.
+
+    Every resource has its own counter, the limit is taken from `limits` by
+    the full resource name, then by its kind, the part before the colon.
+    Resources without a limit are used exclusively. All resources of a test
+    are acquired at once or not at all, so tests can't deadlock each other.
+    """
+
+    def __init__(self, limits: dict[str, int] = None, default: int = 1) -> None:
+        if default < 1:
+            raise ValueError('The default limit must be greater than zero!')
+
+        self._limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        for name, limit in self._limits.items():
+            if limit < 1:
+                raise ValueError(f'The limit of {name} must be greater than zero!')
+        self._default = default
+        self._condition = threading.Condition()
+        self._inuse = {}
+
+    def get_limit(self, resource: str) -> int:
+        limit = self._limits.get(resource, None)
+        if limit is None:
+            limit = self._limits.get(resource.split(':', 1)[0], self._default)
+        return limit
+
+    def get_inuse(self, resource: str) -> int:
+        with self._condition:
+            return self._inuse.get(resource, 0)
+
+    def try_acquire(self, resources) -> bool:
+        """Acquires all resources if none of them is at its limit."""
+
+        with self._condition:
+            if any(self._inuse.get(resource, 0) >= self.get_limit(resource) for resource in resources):
+                return False
+            for resource in resources:
+                self._inuse[resource] = self._inuse.get(resource, 0) + 1
+            return True
+
+    def acquire(self, resources, timeout: float = None) -> bool:
+        """Waits until all resources can be acquired at once.
+
+        Returns
+        -------
+        bool
+            False if the resources could not be acquired within the timeout.
+        """
+
+        with self._condition:
+            return self._condition.wait_for(lambda: self.try_acquire(resources), timeout)
+
+    def release(self, resources) -> None:
+        with self._condition:
+            for resource in resources:
+                self._inuse[resource] -= 1
+            self._condition.notify_all()
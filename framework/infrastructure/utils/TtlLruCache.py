@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class TtlLruCache:
+    """A thread-safe cache that holds at most `maxsize` entries for at most
+    `ttl` seconds each.
+
+    When the cache is full the least recently used entry is evicted. A `ttl` of
+    None means that entries never expire. The cache keeps track of its hits
+    and misses, see `statistics`.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 300.0) -> None:
+        if maxsize < 1:
+            raise ValueError('The maxsize must be greater than zero!')
+
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @property
+    def ttl(self) -> float:
+        return self._ttl
+
+    def get(self, key, default=None):
+        """Returns the value for the given key or the default if there is no
+        valid entry for the key."""
+
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+
+                del self._entries[key]
+
+            self._misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        expires = None if self._ttl is None else monotonic() + self._ttl
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate) -> None:
+        """Removes all entries whose key matches the given predicate."""
+
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def statistics(self) -> CacheStatistics:
+        with self._lock:
+            return CacheStatistics(self._hits, self._misses, self._evictions, len(self._entries))
+
+
+class CacheStatistics:
+    """A snapshot of the usage of a cache."""
+
+    def __init__(self, hits: int, misses: int, evictions: int, size: int) -> None:
+        self._hits = hits
+        self._misses = misses
+        self._evictions = evictions
+        self._size = size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        """The number of entries that were removed because the cache was full"""
+        return self._evictions
+
+    @property
+    def size(self) -> int:
+        """The number of entries in the cache"""
+        return self._size
+
+    @property
+    def hitrate(self) -> float:
+        lookups = self._hits + self._misses
+        if lookups == 0:
+            return 0.0
+        return self._hits / lookups
+
+    def __str__(self) -> str:
+        return f'Hits:\t{self.hits}, Misses:\t{self.misses}, Evictions:\t{self.evictions}, Size:\t{self.size}'
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import threading
+from time import monotonic
+
+from framework.infrastructure.utils.netweaver.SLTConfigurationOperation import (SLTConfigurationOperation,
+                                                                             fixed_mtid_in_systems)
+
+
+class MassTransferIdPool:
+    """A pool of SLT configurations that are created ahead of time.
+
+    After `start` a background thread creates SLT configurations via
+    `SLTConfigurationOperation.get_mass_transfer_id` until `size` of them are
+    available. `lease` hands one out and the thread creates a replacement, so
+    tests don't wait for the creation. Leased configurations can be given back
+    via `release` to be reused or deleted. `close` deletes the configurations
+    that were never leased.
+
+    At most `maxcreated` configurations are created in total, typically the
+    number of leases the tests need, so the pool doesn't create replacements
+    that are only deleted again. Systems that return a fixed mass transfer ID
+    instead of creating a configuration can't be pooled: such an ID is never
+    handed out, because several tests would share it.
+    """
+
+    def __init__(self, operation: SLTConfigurationOperation = None, size: int = 2, version: str = "V1",
+                 source: str = "NONE", retryinterval: float = 5.0, maxcreated: int = None) -> None:
+        if size < 1:
+            raise ValueError('The size must be greater than zero!')
+        if maxcreated is not None and maxcreated < 1:
+            raise ValueError('The maximum number of created configurations must be greater than zero!')
+
+        self._operation = operation if operation is not None else SLTConfigurationOperation()
+        self._size = size
+        self._version = version
+        self._source = source
+        self._retryinterval = retryinterval
+        self._maxcreated = maxcreated
+
+        self._condition = threading.Condition()
+        # (mass transfer ID, configuration to delete it) tuples
+        self._available = []
+        self._leased = {}
+        self._closed = False
+        self._error = None
+        self._thread = None
+
+        self._created = 0
+        self._leases = 0
+        self._deleted = 0
+
+    @property
+    def available(self) -> int:
+        """The number of created configurations that are not leased"""
+        with self._condition:
+            return len(self._available)
+
+    @property
+    def leased(self) -> list[str]:
+        """The mass transfer IDs that are currently leased"""
+        with self._condition:
+            return list(self._leased.keys())
+
+    @property
+    def error(self) -> Exception:
+        """The error of the last failed creation or None"""
+        return self._error
+
+    def start(self) -> MassTransferIdPool:
+        """Starts creating the configurations in the background."""
+
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._fill, name='MassTransferIdPool', daemon=True)
+                self._thread.start()
+        return self
+
+    def _is_exhausted(self) -> bool:
+        """Whether no more configurations are created. Must be called while
+        holding the lock."""
+
+        return self._maxcreated is not None and self._created >= self._maxcreated
+
+    def _is_pooled(self, mt_id: str) -> bool:
+        """Whether the ID is available or leased. Must be called while holding
+        the lock."""
+
+        return mt_id in self._leased or any(mt_id == available for available, json_data in self._available)
+
+    def _fill(self) -> None:
+        while True:
+            with self._condition:
+                while not self._closed and (len(self._available) >= self._size or self._is_exhausted()):
+                    self._condition.wait()
+                if self._closed:
+                    return
+
+            try:
+                mt_id, json_data_del_slt_config = self._operation.get_mass_transfer_id(
+                    self._version, self._source)
+            except Exception as e:
+                with self._condition:
+                    self._error = e
+                    self._condition.notify_all()
+                    self._condition.wait(self._retryinterval)
+                continue
+
+            with self._condition:
+                if mt_id in fixed_mtid_in_systems.values() or self._is_pooled(mt_id):
+                    # the ABAP system didn't create a configuration, the ID
+                    # is in use by someone else and must not be deleted
+                    self._error = RuntimeError(
+                        f'The ABAP system returned the mass transfer ID {mt_id}, which is not unique')
+                    self._condition.notify_all()
+                    if not self._closed:
+                        self._condition.wait(self._retryinterval)
+                    continue
+
+                self._error = None
+                self._created += 1
+                if self._closed:
+                    break
+                self._available.append((mt_id, json_data_del_slt_config))
+                self._condition.notify_all()
+
+        # the pool was closed while the configuration was created
+        self._delete(json_data_del_slt_config)
+
+    def lease(self, timeout: float = 600.0) -> tuple[str, dict]:
+        """Takes a configuration out of the pool, waiting at most `timeout`
+        seconds for one to be created.
+
+        Returns
+        -------
+        tuple[str, dict]
+            The mass transfer ID and the configuration to delete it, just like
+            `SLTConfigurationOperation.get_mass_transfer_id`.
+        """
+
+        self.start()
+        deadline = monotonic() + timeout
+        with self._condition:
+            while len(self._available) == 0:
+                if self._closed:
+                    raise RuntimeError('The mass transfer ID pool has been closed!')
+                if self._is_exhausted() and len(self._leased) == 0:
+                    raise RuntimeError(
+                        f'All {self._maxcreated} mass transfer IDs of the pool have been leased!')
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f'No mass transfer ID available after {timeout} seconds, last error: {self._error}')
+                self._condition.wait(remaining)
+
+            mt_id, json_data_del_slt_config = self._available.pop(0)
+            self._leased[mt_id] = json_data_del_slt_config
+            self._leases += 1
+            self._condition.notify_all()
+            return mt_id, json_data_del_slt_config
+
+    def release(self, json_data_del_slt_config: dict, recycle: bool = False) -> None:
+        """Gives a leased configuration back. It is put back into the pool if
+        `recycle` is set and the pool is not full, otherwise it is deleted."""
+
+        mt_id = json_data_del_slt_config["massTransferId"]
+        with self._condition:
+            self._leased.pop(mt_id, None)
+            if recycle and not self._closed and len(self._available) < self._size:
+                self._available.append((mt_id, json_data_del_slt_config))
+                self._condition.notify_all()
+                return
+
+        self._delete(json_data_del_slt_config)
+
+    def _delete(self, json_data_del_slt_config: dict) -> None:
+        try:
+            self._operation.del_mass_transfer_id(json_data_del_slt_config)
+        except Exception as e:
+            print(f"Deleting the mass transfer ID {json_data_del_slt_config} failed: {e}")
+            return
+        with self._condition:
+            self._deleted += 1
+
+    def close(self, delete_leased: bool = False) -> None:
+        """Stops the creation and deletes the configurations that are not
+        leased. The leased configurations are deleted too if `delete_leased`
+        is set, otherwise the tests are responsible for them. A configuration
+        that is being created is waited for and deleted as well."""
+
+        with self._condition:
+            self._closed = True
+            todelete = [json_data for mt_id, json_data in self._available]
+            self._available.clear()
+            if delete_leased:
+                todelete.extend(self._leased.values())
+                self._leased.clear()
+            self._condition.notify_all()
+            thread = self._thread
+
+        if thread is not None:
+            # without a timeout, otherwise the process may exit while the
+            # configuration is created and it is never deleted
+            thread.join()
+        for json_data_del_slt_config in todelete:
+            self._delete(json_data_del_slt_config)
+
+    def __str__(self) -> str:
+        with self._condition:
+            return (f'Available:\t{len(self._available)}, Leased:\t{len(self._leased)}, '
+                    f'Created:\t{self._created}, Leases:\t{self._leases}, Deleted:\t{self._deleted}')
+
+    def __enter__(self) -> MassTransferIdPool:
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
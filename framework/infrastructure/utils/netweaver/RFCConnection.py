@@ -13,21 +13,26 @@ class RFCConnection:
             RFCConnection._instance = RFCConnection(*args, **kwargs)
         return RFCConnection._instance
 
-    def _open_rfc_connection(self):
-        """Open RFC connection with valid logon credentials."""
-        
-        if all([os.getenv('ABAP_CONN_USER'),
-                os.getenv('ABAP_CONN_PASSWD'),
-                os.getenv('ABAP_CONN_ASHOST'),
-                os.getenv('ABAP_CONN_SYSNR'),
-                os.getenv('ABAP_CONN_CLIENT')]):
-            self.conn = Connection(user=os.getenv('ABAP_CONN_USER'),
-                                   passwd=os.getenv('ABAP_CONN_PASSWD'),
-                                   ashost=os.getenv('ABAP_CONN_ASHOST'),
-                                   sysnr=os.getenv('ABAP_CONN_SYSNR'),
-                                   client=os.getenv('ABAP_CONN_CLIENT'))
-            print("create connection successful")
-        else:
+    @staticmethod
+    def parameters_from_env() -> dict:
+        """Get the logon parameters from the ABAP_CONN_* environment variables."""
+
+        parameters = {'user': os.getenv('ABAP_CONN_USER'),
+                      'passwd': os.getenv('ABAP_CONN_PASSWD'),
+                      'ashost': os.getenv('ABAP_CONN_ASHOST'),
+                      'sysnr': os.getenv('ABAP_CONN_SYSNR'),
+                      'client': os.getenv('ABAP_CONN_CLIENT')}
+        if not all(parameters.values()):
             raise ValueError("The ABAP connection don't allowed None value")
 
+        return parameters
+
+    def _open_rfc_connection(self):
+        """Open RFC connection with valid logon credentials. The connection
+        is not thread-safe, use RFCConnectionPool to share connections between
+        threads."""
+
+        self.conn = Connection(**self.parameters_from_env())
+        print("create connection successful")
+
         return self.conn
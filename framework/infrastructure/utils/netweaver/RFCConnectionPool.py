@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from time import monotonic
+
+from pyrfc import Connection
+
+
+class RFCConnectionPool:
+    """A thread-safe pool of RFC connections to any number of ABAP systems.
+
+    The connections are pooled by key, the key is derived from the logon
+    parameters without the password, so every system, client and user gets its
+    own connections. There are at most `maxsize` connections per key, see
+    `set_maxsize` to change it for a single key. Borrowing a connection waits
+    at most `timeout` seconds if all connections of the key are in use.
+
+    A connection that has been idle for longer than `pinginterval` seconds is
+    pinged before it is handed out. Connections that don't answer are closed
+    and replaced by new ones.
+    """
+
+    _default = None
+    _defaultlock = threading.Lock()
+
+    def __init__(self, maxsize: int = 4, timeout: float = 30.0, pinginterval: float = 30.0, connect=None) -> None:
+        if maxsize < 1:
+            raise ValueError('The maxsize must be greater than zero!')
+
+        self._maxsize = maxsize
+        self._maxsizes = {}
+        self._timeout = timeout
+        self._pinginterval = pinginterval
+        self._connect = connect if connect is not None else self._open_rfc_connection
+
+        self._condition = threading.Condition()
+        # idle connections with the time they were returned per key, most recent last
+        self._idle = {}
+        self._sizes = {}
+        # the keys of the borrowed connections by their id
+        self._borrowed = {}
+
+        self._checkouts = 0
+        self._created = 0
+        self._reconnects = 0
+        self._totalwaittime = 0.0
+        self._maxwaittime = 0.0
+
+    @classmethod
+    def get_default(cls) -> RFCConnectionPool:
+        """The pool shared by all clients that aren't given an own pool."""
+
+        with cls._defaultlock:
+            if cls._default is None:
+                cls._default = RFCConnectionPool()
+            return cls._default
+
+    @staticmethod
+    def key_for(parameters: dict) -> tuple:
+        return tuple(sorted((name, str(value)) for name, value in parameters.items() if name != 'passwd'))
+
+    @staticmethod
+    def _open_rfc_connection(parameters: dict):
+        return Connection(**parameters)
+
+    def set_maxsize(self, parameters: dict, maxsize: int) -> None:
+        """Sets the maximum number of connections for the key of the given
+        parameters."""
+
+        if maxsize < 1:
+            raise ValueError('The maxsize must be greater than zero!')
+        with self._condition:
+            self._maxsizes[self.key_for(parameters)] = maxsize
+            self._condition.notify_all()
+
+    def get_maxsize(self, parameters: dict) -> int:
+        return self._maxsizes.get(self.key_for(parameters), self._maxsize)
+
+    def _is_alive(self, connection) -> bool:
+        try:
+            connection.ping()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self, parameters: dict, timeout: float = None):
+        """Borrows a connection for the given logon parameters. The connection
+        must be given back via `release`, preferably use `connection` instead.
+
+        Raises
+        ------
+        TimeoutError
+            If no connection became available within the timeout.
+        """
+
+        key = self.key_for(parameters)
+        timeout = self._timeout if timeout is None else timeout
+        start = monotonic()
+        deadline = start + timeout
+        with self._condition:
+            while True:
+                idle = self._idle.get(key, [])
+                if idle:
+                    connection, returned = idle.pop()
+                    break
+
+                if self._sizes.get(key, 0) < self._maxsizes.get(key, self._maxsize):
+                    # reserve the slot, the connection is opened outside of
+                    # the lock so that other threads are not blocked
+                    self._sizes[key] = self._sizes.get(key, 0) + 1
+                    connection = None
+                    break
+
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f'No RFC connection available after {timeout} seconds')
+                self._condition.wait(remaining)
+
+        if connection is not None and monotonic() - returned >= self._pinginterval:
+            if not self._is_alive(connection):
+                self._close(connection)
+                connection = None
+                with self._condition:
+                    self._reconnects += 1
+
+        if connection is None:
+            try:
+                connection = self._connect(parameters)
+            except BaseException:
+                with self._condition:
+                    self._sizes[key] -= 1
+                    self._condition.notify_all()
+                raise
+            with self._condition:
+                self._created += 1
+
+        with self._condition:
+            self._borrowed[id(connection)] = key
+            waittime = monotonic() - start
+            self._checkouts += 1
+            self._totalwaittime += waittime
+            self._maxwaittime = max(self._maxwaittime, waittime)
+        return connection
+
+    def release(self, connection) -> None:
+        """Gives a borrowed connection back to the pool."""
+
+        with self._condition:
+            key = self._borrowed.pop(id(connection))
+            self._idle.setdefault(key, []).append((connection, monotonic()))
+            self._condition.notify_all()
+
+    def discard(self, connection) -> None:
+        """Removes a borrowed connection from the pool, e.g. because it broke."""
+
+        with self._condition:
+            key = self._borrowed.pop(id(connection))
+            self._sizes[key] -= 1
+            self._reconnects += 1
+            self._condition.notify_all()
+        self._close(connection)
+
+    @contextmanager
+    def connection(self, parameters: dict, timeout: float = None):
+        """Borrows a connection for the duration of the with block. If the
+        block fails and the connection doesn't answer a ping anymore, it is
+        replaced by a new one the next time it is needed."""
+
+        connection = self.acquire(parameters, timeout)
+        try:
+            yield connection
+        except BaseException:
+            if self._is_alive(connection):
+                self.release(connection)
+            else:
+                self.discard(connection)
+            raise
+        else:
+            self.release(connection)
+
+    def close(self) -> None:
+        """Closes all idle connections."""
+
+        with self._condition:
+            for key, idle in self._idle.items():
+                for connection, returned in idle:
+                    self._sizes[key] -= 1
+                    self._close(connection)
+            self._idle.clear()
+            self._condition.notify_all()
+
+    def statistics(self) -> RFCConnectionPoolStatistics:
+        with self._condition:
+            return RFCConnectionPoolStatistics(
+                sum(self._sizes.values()), sum(len(idle) for idle in self._idle.values()), self._checkouts,
+                self._created, self._reconnects, self._totalwaittime, self._maxwaittime)
+
+
+class RFCConnectionPoolStatistics:
+    """A snapshot of the usage of a RFCConnectionPool."""
+
+    def __init__(self, size: int, idle: int, checkouts: int, created: int, reconnects: int,
+                 totalwaittime: float, maxwaittime: float) -> None:
+        self._size = size
+        self._idle = idle
+        self._checkouts = checkouts
+        self._created = created
+        self._reconnects = reconnects
+        self._totalwaittime = totalwaittime
+        self._maxwaittime = maxwaittime
+
+    @property
+    def size(self) -> int:
+        """The number of open connections of all keys"""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """The number of open connections that are not borrowed"""
+        return self._idle
+
+    @property
+    def checkouts(self) -> int:
+        return self._checkouts
+
+    @property
+    def created(self) -> int:
+        return self._created
+
+    @property
+    def reconnects(self) -> int:
+        """The number of connections replaced because they were broken"""
+        return self._reconnects
+
+    @property
+    def averagewaittime(self) -> float:
+        """The average time in seconds it took to borrow a connection"""
+        if self._checkouts == 0:
+            return 0.0
+        return self._totalwaittime / self._checkouts
+
+    @property
+    def maxwaittime(self) -> float:
+        """The longest time in seconds it took to borrow a connection"""
+        return self._maxwaittime
+
+    def __str__(self) -> str:
+        return (f'Size:\t{self.size}, Idle:\t{self.idle}, Checkouts:\t{self.checkouts}, '
+                f'Created:\t{self.created}, Reconnects:\t{self.reconnects}, '
+                f'Average wait:\t{self.averagewaittime:.3f}s, Max wait:\t{self.maxwaittime:.3f}s')
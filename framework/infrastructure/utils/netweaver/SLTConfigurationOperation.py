@@ -4,6 +4,7 @@ import re
 
 from framework.infrastructure.utils.netweaver import GeneralUtil as util
 from framework.infrastructure.utils.netweaver.RFCConnection import RFCConnection
+from framework.infrastructure.utils.netweaver.RFCConnectionPool import RFCConnectionPool
 
 fixed_mtid_in_systems = {
     "UK5": "3AV"
@@ -11,8 +12,17 @@ fixed_mtid_in_systems = {
 
 class SLTConfigurationOperation:
 
-    def __init__(self):
-        self.conn = RFCConnection.get_instance().conn
+    def __init__(self, pool: RFCConnectionPool = None, parameters: dict = None):
+        """The RFC calls borrow a connection from the given pool, by default 
+        the shared RFCConnectionPool. The logon parameters are taken from the 
+        ABAP_CONN_* environment variables if not given."""
+
+        self._pool = pool if pool is not None else RFCConnectionPool.get_default()
+        self._parameters = parameters if parameters is not None else RFCConnection.parameters_from_env()
+
+    def _call(self, function_module, **kwargs):
+        with self._pool.connection(self._parameters) as conn:
+            return conn.call(function_module, **kwargs)
 
     def get_mass_transfer_id(self, version:str="V1", source:str="NONE",function_module="LTE2E_CREATE_SLT_CONFIG"):
         """Call FM via PyRFC connection and get MT-ID
@@ -55,7 +65,7 @@ class SLTConfigurationOperation:
         # add try exception to handle the situation when the exception is 'The project ZIUUC_xxx already exists'
         fm_result = ""
         try:
-            result = self.conn.call(function_module, IV_JSON_STR=json_str_slt_config)
+            result = self._call(function_module, IV_JSON_STR=json_str_slt_config)
             print("result", result)
             result = util.dict_capital_to_upper(result)
 
@@ -92,7 +102,7 @@ class SLTConfigurationOperation:
             json_str_del_slt_config = json.dumps(json_data_del_slt_config)
 
             # dict result like this: {'EV_RESULT': '{"SUCCESS":"Y","ERROR":"None"}'}
-            del_result = self.conn.call('LTE2E_DELETE_SLT_CONFIG', IV_JSON_STR=json_str_del_slt_config)
+            del_result = self._call('LTE2E_DELETE_SLT_CONFIG', IV_JSON_STR=json_str_del_slt_config)
             print("del_mass_transfer_id - del_result", del_result)
 
             # Get EV_RESULT str to dict
@@ -1,7 +1,10 @@
 class AbapConnectionMock:
     def __init__(self) -> None:
         self._rfcresult = None
+        self._rfcresults = {}
         self._lastrfcall = None
+        self.calls = []
+        self.alive = True
 
     @property
     def last_rfc_call(self) -> list:
@@ -10,6 +13,22 @@ class AbapConnectionMock:
     def set_rfc_result(self, rfcresult):
         self._rfcresult = rfcresult
 
+    def set_rfc_result_for(self, functionmodule: str, rfcresult):
+        """Sets the result of a specific function module. The result can be 
+        a function that gets the parameters of the call."""
+        self._rfcresults[functionmodule] = rfcresult
+
+    def ping(self):
+        if not self.alive:
+            raise RuntimeError('The connection is broken')
+
+    def close(self):
+        self.alive = False
+
     def call(self, functionmodule: str, **parameters):
         self._lastrfcall = [functionmodule, parameters]
+        self.calls.append(self._lastrfcall)
+        if functionmodule in self._rfcresults:
+            rfcresult = self._rfcresults[functionmodule]
+            return rfcresult(**parameters) if callable(rfcresult) else rfcresult
         return self._rfcresult
@@ -0,0 +1,47 @@
+import queue
+
+
+class AsyncSessionMock:
+
+    def __init__(self) -> None:
+        self.lastcalledurl: str = None
+        self.lastmethod: str = None
+        self.posteddata = None
+        self.postedheaders = None
+        self.responses = queue.SimpleQueue()
+        self.closed = False
+
+    def request(self, method, url, data=None, headers=None):
+        self.lastmethod = method
+        self.lastcalledurl = url
+        self.posteddata = data
+        self.postedheaders = headers
+        return self.responses.get(block=False)
+
+    async def close(self):
+        self.closed = True
+
+    # configuration of the mock
+    def setresponse(self, statuscode: int):
+        response = AsyncResponseMock(statuscode, None)
+        self.responses.put(response)
+
+    def setresponsecontent(self, statuscode: int, content: str):
+        response = AsyncResponseMock(statuscode, content)
+        self.responses.put(response)
+
+
+class AsyncResponseMock:
+
+    def __init__(self, statuscode, content) -> None:
+        self.status = statuscode
+        self._content = content
+
+    async def text(self):
+        return self._content
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
@@ -0,0 +1,114 @@
+import threading
+
+from azure.core.exceptions import ResourceNotFoundError
+
+
+class DatalakeServiceMock:
+    """Replaces the DataLakeServiceClient. The files are held in memory by
+    their full path, the file systems are ignored."""
+
+    def __init__(self, chunksize: int = 4) -> None:
+        self._files = {}
+        self._etags = {}
+        self._chunksize = chunksize
+        self._lock = threading.Lock()
+        self.downloads = []
+        self.propertycalls = 0
+        self.listings = 0
+
+    def set_file(self, path: str, content: bytes) -> None:
+        self._files[path] = content
+        self._etags[path] = self._etags.get(path, 0) + 1
+
+    def remove_file(self, path: str) -> None:
+        del self._files[path]
+
+    @property
+    def downloadedbytes(self) -> int:
+        return sum(length for path, offset, length in self.downloads)
+
+    def get_file_system_client(self, file_system: str):
+        return FileSystemClientMock(self)
+
+
+class PathPropertiesMock:
+    def __init__(self, name: str, is_directory: bool = False, etag: str = None, content_length: int = None) -> None:
+        self.name = name
+        self.is_directory = is_directory
+        self.etag = etag
+        self.content_length = content_length
+
+
+class FilePropertiesMock:
+    def __init__(self, name: str, size: int, etag: str) -> None:
+        self.name = name
+        self.size = size
+        self.etag = etag
+
+
+class FileSystemClientMock:
+    def __init__(self, service: DatalakeServiceMock) -> None:
+        self._service = service
+
+    def get_paths(self, path: str = None, recursive: bool = True):
+        with self._service._lock:
+            self._service.listings += 1
+        prefix = '' if path is None else path.rstrip('/') + '/'
+        names = sorted(name for name in self._service._files if name.startswith(prefix))
+        return [PathPropertiesMock(name, False, f'"{self._service._etags[name]}"', len(self._service._files[name]))
+                for name in names]
+
+    def get_directory_client(self, directory: str):
+        return DirectoryClientMock(self._service, directory)
+
+    def get_file_client(self, path: str):
+        return FileClientMock(self._service, path)
+
+
+class DirectoryClientMock:
+    def __init__(self, service: DatalakeServiceMock, directory: str) -> None:
+        self._service = service
+        self._directory = directory
+
+    def get_file_client(self, filename: str):
+        return FileClientMock(self._service, self._directory.rstrip('/') + '/' + filename)
+
+
+class FileClientMock:
+    def __init__(self, service: DatalakeServiceMock, path: str) -> None:
+        self._service = service
+        self.path_name = path
+
+    def _content(self) -> bytes:
+        content = self._service._files.get(self.path_name, None)
+        if content is None:
+            raise ResourceNotFoundError(f'The file {self.path_name} does not exist')
+        return content
+
+    def get_file_properties(self):
+        content = self._content()
+        with self._service._lock:
+            self._service.propertycalls += 1
+        return FilePropertiesMock(self.path_name, len(content), f'"{self._service._etags[self.path_name]}"')
+
+    def download_file(self, offset: int = None, length: int = None, **kwargs):
+        content = self._content()
+        start = 0 if offset is None else offset
+        end = len(content) if length is None else min(len(content), start + length)
+        with self._service._lock:
+            self._service.downloads.append((self.path_name, start, end - start))
+        return DownloaderMock(content[start:end], self._service._chunksize)
+
+
+class DownloaderMock:
+    def __init__(self, content: bytes, chunksize: int) -> None:
+        self._content = content
+        self._chunksize = chunksize
+        self.size = len(content)
+
+    def chunks(self):
+        for start in range(0, len(self._content), self._chunksize):
+            yield self._content[start:start + self._chunksize]
+
+    def readall(self) -> bytes:
+        return self._content
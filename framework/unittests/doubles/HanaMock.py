@@ -2,28 +2,69 @@ class HanaConnectionMock:
     def __init__(self) -> None:
         self._cursorMock = HanaCursorMock(self)
         self._lastsql = ''
+        self._lastparameters = None
         self._sql_result = None
+        self._sql_results = []
+        self._description = None
+        self.executed = []
+        self.connected = True
+        # dropped by the server, the client doesn't know yet
+        self.dropped = False
 
     def cursor(self):
         return self._cursorMock
 
+    def isconnected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
     def set_sql_result(self, sql_result):
         self._sql_result = sql_result
 
+    def set_sql_results(self, *sql_results):
+        """Sets the results of the next statements, one per statement."""
+        self._sql_results = list(sql_results)
+
+    def set_description(self, columnnames: list[str]):
+        self._description = [(name,) for name in columnnames]
+
     @property
     def last_sql(self) -> str:
         return self._lastsql
 
+    @property
+    def last_parameters(self):
+        return self._lastparameters
+
 
 class HanaCursorMock:
     def __init__(self, connection: HanaConnectionMock) -> None:
         self._connectionMock = connection
+        self._position = 0
 
-    def execute(self, sql: str):
+    @property
+    def description(self):
+        return self._connectionMock._description
+
+    def execute(self, sql: str, parameters=None):
+        if self._connectionMock.dropped:
+            raise RuntimeError('Connection reset by peer')
         self._connectionMock._lastsql = sql
+        self._connectionMock._lastparameters = parameters
+        self._connectionMock.executed.append((sql, parameters))
+        if self._connectionMock._sql_results:
+            self._connectionMock._sql_result = self._connectionMock._sql_results.pop(0)
+        self._position = 0
 
     def fetchall(self):
         return self._connectionMock._sql_result
 
+    def fetchmany(self, size: int):
+        rows = self._connectionMock._sql_result[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
     def close(self):
         pass
@@ -39,9 +39,60 @@ class SessionMock:
         response = ResponseMock(statuscode, content)
         self.responses.put(response)
 
+    def setloginredirect(self):
+        """Answers like a cluster whose session has expired: the request is
+        redirected to the HTML login page."""
+        response = ResponseMock(200, '<html><title>Login</title></html>', {'Content-Type': 'text/html'},
+                                'https://cluster/auth/login', [ResponseMock(302, None)])
+        self.responses.put(response)
+
 
 class ResponseMock:
 
-    def __init__(self, statuscode, content) -> None:
+    def __init__(self, statuscode, content, headers: dict = None, url: str = None, history: list = None) -> None:
         self.status_code = statuscode
         self.text = content
+        self.headers = headers if headers is not None else {}
+        self.url = url
+        self.history = history if history is not None else []
+
+
+class RoutingSessionMock(SessionMock):
+    """A session mock that serves the responses per URL instead of in the 
+    order of the calls. This is needed when the order of the calls is not 
+    predictable, e.g. when requests are sent concurrently."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calledurls: list[str] = []
+        self._routes = {}
+
+    def _getresponse(self, url):
+        self.lastcalledurl = url
+        self.calledurls.append(url)
+        for path, responses in self._routes.items():
+            if url.endswith(path):
+                return responses.get(block=False)
+        return self.responses.get(block=False)
+
+    def get(self, url):
+        return self._getresponse(url)
+
+    def post(self, url, data, headers):
+        self.posteddata = data
+        self.postedheaders = headers
+        return self._getresponse(url)
+
+    def delete(self, url, headers):
+        self.postedheaders = headers
+        return self._getresponse(url)
+
+    def put(self, url, data, headers):
+        self.putdata = data
+        self.putheaders = headers
+        return self._getresponse(url)
+
+    # configuration of the mock
+    def setrouteresponsecontent(self, path: str, statuscode: int, content: str):
+        responses = self._routes.setdefault(path, queue.SimpleQueue())
+        responses.put(ResponseMock(statuscode, content))
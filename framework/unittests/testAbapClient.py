@@ -31,6 +31,63 @@ class testAbapClient(unittest.TestCase):
         self.assertEqual(expectedcall, abapmock.last_rfc_call)
 
 
+    def test_read_table(self):
+        cut = AbapClient()
+        abapmock = AbapConnectionMock()
+        cut._connection = abapmock
+
+        abapmock.set_rfc_result({'DATA': [{'WA': '0001| a  '}, {'WA': '0002|b'}]})
+        rows = cut.read_table('DHE2E_WS_LS', ['RECID', 'VALUE'])
+        self.assertEqual([['0001', 'a'], ['0002', 'b']], rows)
+        expectedcall = ['RFC_READ_TABLE',
+                        {'QUERY_TABLE': 'DHE2E_WS_LS', 'DELIMITER': '|',
+                         'FIELDS': [{'FIELDNAME': 'RECID'}, {'FIELDNAME': 'VALUE'}], 'OPTIONS': [],
+                         'ROWCOUNT': 0, 'ROWSKIPS': 0}]
+        self.assertEqual(expectedcall, abapmock.last_rfc_call)
+
+        where = ' AND '.join(f'FIELD{i} = \'{i}\'' for i in range(20))
+        cut.read_table('DHE2E_WS_LS', ['RECID'], where)
+        options = abapmock.last_rfc_call[1]['OPTIONS']
+        self.assertGreater(len(options), 1)
+        self.assertTrue(all(len(option['TEXT']) <= 72 for option in options))
+        self.assertEqual(where, ''.join(option['TEXT'] for option in options))
+
+        # literals are never split, even if they contain spaces
+        where = 'VALUE = \'' + 'a b ' * 16 + '\' AND RECID = \'1\''
+        cut.read_table('DHE2E_WS_LS', ['RECID'], where)
+        options = abapmock.last_rfc_call[1]['OPTIONS']
+        self.assertEqual([{'TEXT': 'VALUE ='}, {'TEXT': ' \'' + 'a b ' * 16 + '\' AND'}, {'TEXT': ' RECID = \'1\''}],
+                         options)
+        with self.assertRaises(ValueError):
+            cut.read_table('DHE2E_WS_LS', ['RECID'], 'VALUE = \'' + 'a' * 80 + '\'')
+
+    def test_iter_table(self):
+        cut = AbapClient()
+        abapmock = AbapConnectionMock()
+        cut._connection = abapmock
+        rows = [{'WA': f'{i:04d}'} for i in range(5)]
+        abapmock.set_rfc_result_for('RFC_READ_TABLE', lambda ROWCOUNT, ROWSKIPS, **parameters: {
+            'DATA': rows[ROWSKIPS:ROWSKIPS + ROWCOUNT]})
+
+        self.assertEqual([[f'{i:04d}'] for i in range(5)], list(cut.iter_table('DHE2E_WS_LS', ['RECID'], pagesize=2)))
+        self.assertEqual([(2, 0), (2, 2), (2, 4)],
+                         [(parameters['ROWCOUNT'], parameters['ROWSKIPS']) for functionmodule, parameters in abapmock.calls])
+
+        # a full last page is followed by an empty one
+        abapmock.calls.clear()
+        self.assertEqual(5, len(list(cut.iter_table('DHE2E_WS_LS', ['RECID'], pagesize=5))))
+        self.assertEqual(2, len(abapmock.calls))
+
+    def test_get_field_types(self):
+        cut = AbapClient()
+        abapmock = AbapConnectionMock()
+        cut._connection = abapmock
+        abapmock.set_rfc_result({'DFIES_TAB': [{'FIELDNAME': 'RECID', 'INTTYPE': 'N', 'LENG': '000010'},
+                                               {'FIELDNAME': 'AMOUNT', 'INTTYPE': 'P', 'LENG': '000016'}]})
+        self.assertEqual({'RECID': ('N', 10), 'AMOUNT': ('P', 16)}, cut.get_field_types('DHE2E_WS_LS'))
+        self.assertEqual(['DDIF_FIELDINFO_GET', {'TABNAME': 'DHE2E_WS_LS'}], abapmock.last_rfc_call)
+
+
 class testAbapConnectionData(unittest.TestCase):
 
     def test_basics(self):
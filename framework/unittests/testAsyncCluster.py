@@ -0,0 +1,115 @@
+import asyncio
+import unittest
+
+from framework.infrastructure.AsyncCluster import AsyncCluster, AsyncClusterResponse
+from framework.infrastructure.Cluster import ClusterConnectionData
+from framework.unittests.doubles.AsyncSessionMock import AsyncResponseMock, AsyncSessionMock
+
+
+def getDummyConnectionData():
+    connectionData = ClusterConnectionData('POD-INT', 'https://cluster')
+    connectionData.tenant = 'default'
+    connectionData.user = 'tester'
+    connectionData.password = '********'
+    return connectionData
+
+
+class CountingResponseMock(AsyncResponseMock):
+    """A response that stays open for a moment and counts how many responses 
+    are open at the same time."""
+
+    def __init__(self, counter: dict) -> None:
+        super().__init__(200, '')
+        self._counter = counter
+
+    async def __aenter__(self):
+        self._counter['running'] += 1
+        self._counter['maximum'] = max(
+            self._counter['maximum'], self._counter['running'])
+        await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._counter['running'] -= 1
+        return False
+
+
+class testAsyncCluster(unittest.IsolatedAsyncioTestCase):
+
+    def test_basics(self):
+        cut = AsyncCluster(getDummyConnectionData())
+        self.assertIsNotNone(cut.repository)
+        self.assertIsNotNone(cut.rms)
+        self.assertIsNotNone(cut.monitoring)
+
+    async def test_login(self):
+        cut = AsyncCluster(getDummyConnectionData())
+        cut.session = AsyncSessionMock()
+        cut.session.setresponse(200)
+        self.assertTrue(await cut.login())
+        self.assertEqual('POST', cut.session.lastmethod)
+        self.assertEqual('https://cluster/api/login/v2/finalize',
+                         cut.session.lastcalledurl)
+        self.assertIn('"tenant": "default"', cut.session.posteddata)
+
+        cut.session.setresponse(401)
+        self.assertFalse(await cut.login())
+
+    async def test_apimethods(self):
+        cut = AsyncCluster(getDummyConnectionData())
+        cut.session = AsyncSessionMock()
+
+        cut.session.setresponsecontent(200, 'content')
+        response = await cut.apiget('/path')
+        self.assertIsInstance(response, AsyncClusterResponse)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('content', response.text)
+        self.assertEqual('GET', cut.session.lastmethod)
+        self.assertEqual('https://cluster/path', cut.session.lastcalledurl)
+
+        cut.session.setresponse(201)
+        response = await cut.apipost('/path', 'data')
+        self.assertEqual('POST', cut.session.lastmethod)
+        self.assertEqual('data', cut.session.posteddata)
+
+        cut.session.setresponse(202)
+        response = await cut.apiput('/path', 'data')
+        self.assertEqual('PUT', cut.session.lastmethod)
+
+        cut.session.setresponse(204)
+        response = await cut.apidelete('/path')
+        self.assertEqual('DELETE', cut.session.lastmethod)
+        self.assertEqual(204, response.status_code)
+
+    async def test_concurrency_is_bounded(self):
+        cut = AsyncCluster(getDummyConnectionData(), max_concurrency=2)
+        cut.session = AsyncSessionMock()
+        counter = {'running': 0, 'maximum': 0}
+        for i in range(6):
+            cut.session.responses.put(CountingResponseMock(counter))
+
+        await asyncio.gather(*[cut.apiget('/path') for i in range(6)])
+        self.assertEqual(2, counter['maximum'])
+
+    async def test_session_limits(self):
+        connectiondata = getDummyConnectionData()
+        connectiondata.poolmaxsize = 10
+        cut = AsyncCluster(connectiondata, max_concurrency=50)
+        session = cut._create_session()
+        # all requests go to the same host, so the pool size doesn't limit them
+        self.assertEqual(50, session.connector.limit)
+        self.assertEqual(50, session.connector.limit_per_host)
+        await session.close()
+
+    async def test_close(self):
+        cut = AsyncCluster(getDummyConnectionData())
+        session = AsyncSessionMock()
+        cut.session = session
+        async with cut:
+            pass
+        self.assertTrue(session.closed)
+        self.assertIsNone(cut.session)
+
+
+if __name__ == '__main__':
+    unittest.main()
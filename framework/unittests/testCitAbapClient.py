@@ -7,7 +7,7 @@ from framework.validation.abap.CitAbapClient import CitAbapClient
 class testCitAbapClient(unittest.TestCase):
 
     def test_get_rowcount(self):
-        cut = CitAbapClient()
+        cut = CitAbapClient(countttl=0)
         abapmock = AbapConnectionMock()
         cut._connection = abapmock
 
@@ -43,10 +43,167 @@ class testCitAbapClient(unittest.TestCase):
 
         rfc_result['EV_RC'] = 1
         rfc_result['EV_MESSAGE'] = 'Test for errors'
+        cut.invalidate()
         self.assertRaises(RuntimeError, cut.get_rowcount, 'WS_LS')
         self.assertRaises(RuntimeError, cut.get_tablename, 'WS_LS')
         self.assertRaises(RuntimeError, cut.get_cdsname, 'WS_LS')
 
+    def test_get_dataset_info(self):
+        cut = CitAbapClient()
+        abapmock = AbapConnectionMock()
+        cut._connection = abapmock
+
+        rfc_result = {}
+        rfc_result['EV_RC'] = 0
+        rfc_result['EV_COUNT'] = '0000000234'
+        rfc_result['EV_TABNAME'] = 'DHE2E_WS_LS'
+        rfc_result['EV_CDSNAME'] = 'DHE2E_CDS_WS_LS'
+        rfc_result['ET_RECID'] = ['001']
+        abapmock.set_rfc_result(rfc_result)
+
+        info = cut.get_dataset_info('WS_LS')
+        self.assertEqual('WS_LS', info.dataset_identifier)
+        self.assertEqual(234, info.rowcount)
+        self.assertEqual('DHE2E_WS_LS', info.tablename)
+        self.assertEqual('DHE2E_CDS_WS_LS', info.cdsname)
+        self.assertEqual(1, len(abapmock.calls))
+
+        # all three values are memoized
+        self.assertEqual(234, cut.get_rowcount('WS_LS'))
+        self.assertEqual('DHE2E_WS_LS', cut.get_tablename('WS_LS'))
+        self.assertEqual('DHE2E_CDS_WS_LS', cut.get_cdsname('WS_LS'))
+        self.assertEqual(1, len(abapmock.calls))
+
+        # changing the records invalidates the count but not the names
+        rfc_result['EV_COUNT'] = '0000000235'
+        cut.insert_records('WS_LS', 1)
+        self.assertEqual('DHE2E_WS_LS', cut.get_tablename('WS_LS'))
+        self.assertEqual(2, len(abapmock.calls))
+        self.assertEqual(235, cut.get_rowcount('WS_LS'))
+        self.assertEqual(3, len(abapmock.calls))
+
+        cut.delete_records('WS_LS', 1)
+        rfc_result['EV_COUNT'] = '0000000234'
+        self.assertEqual(234, cut.get_rowcount('WS_LS'))
+
+        # setup and teardown return the new count which is memoized
+        rfc_result['EV_COUNT'] = '0000000100'
+        cut.setup_table('WS_LS')
+        calls = len(abapmock.calls)
+        self.assertEqual(100, cut.get_rowcount('WS_LS'))
+        self.assertEqual(calls, len(abapmock.calls))
+
+        rfc_result['EV_COUNT'] = '0000000000'
+        cut.teardown_table('WS_LS')
+        self.assertEqual(0, cut.get_rowcount('WS_LS'))
+        self.assertEqual(calls + 1, len(abapmock.calls))
+
+    def test_get_dataset_info_ttl(self):
+        cut = CitAbapClient(countttl=0)
+        abapmock = AbapConnectionMock()
+        cut._connection = abapmock
+
+        rfc_result = {'EV_RC': 0, 'EV_COUNT': '5',
+                      'EV_TABNAME': 'DHE2E_WS_LS', 'EV_CDSNAME': 'DHE2E_CDS_WS_LS'}
+        abapmock.set_rfc_result(rfc_result)
+
+        self.assertEqual(5, cut.get_rowcount('WS_LS'))
+        rfc_result['EV_COUNT'] = '6'
+        self.assertEqual(6, cut.get_rowcount('WS_LS'))
+        self.assertEqual('DHE2E_WS_LS', cut.get_tablename('WS_LS'))
+        self.assertEqual(2, len(abapmock.calls))
+
+        cut.countttl = 60
+        self.assertEqual(60, cut.countttl)
+        self.assertEqual(6, cut.get_rowcount('WS_LS'))
+        rfc_result['EV_COUNT'] = '7'
+        self.assertEqual(6, cut.get_rowcount('WS_LS'))
+        cut.invalidate('WS_LS')
+        self.assertEqual(7, cut.get_rowcount('WS_LS'))
+
+    def test_get_rowcounts(self):
+        cut = CitAbapClient()
+        cut._connection = AbapConnectionMock()
+        connections = []
+
+        def connect():
+            connection = AbapConnectionMock()
+
+            def rfc_result(IV_TABLE_ID, IV_MODE, IV_NUM_RECS):
+                if IV_TABLE_ID == 'BROKEN':
+                    return {'EV_RC': 4, 'EV_MESSAGE': 'Unknown dataset'}
+                return {'EV_RC': 0, 'EV_COUNT': str(len(IV_TABLE_ID)),
+                        'EV_TABNAME': f'DHE2E_{IV_TABLE_ID}', 'EV_CDSNAME': f'DHE2E_CDS_{IV_TABLE_ID}'}
+            connection.set_rfc_result_for(
+                'DHE2E_CIT_RFC_DATA_ACCESS', rfc_result)
+            connections.append(connection)
+            return connection
+        cut._connect = connect
+
+        dataset_identifiers = ['WS_LS', 'WF_LLL', 'BROKEN', 'WN_LMMM']
+        results = {result.dataset_identifier: result for result in cut.get_rowcounts(
+            dataset_identifiers, max_workers=2)}
+
+        self.assertEqual(set(dataset_identifiers), set(results.keys()))
+        self.assertEqual(5, results['WS_LS'].rowcount)
+        self.assertEqual(6, results['WF_LLL'].rowcount)
+        self.assertEqual(7, results['WN_LMMM'].rowcount)
+        self.assertIsNone(results['WS_LS'].error)
+        self.assertGreaterEqual(results['WS_LS'].duration, 0)
+        self.assertIsNone(results['BROKEN'].rowcount)
+        self.assertIsInstance(results['BROKEN'].error, RuntimeError)
+        self.assertIn('Unknown dataset', str(results['BROKEN']))
+        self.assertLessEqual(len(connections), 2)
+
+        # the counts and names are memoized, the main connection is not used
+        self.assertEqual(5, cut.get_rowcount('WS_LS'))
+        self.assertEqual('DHE2E_WF_LLL', cut.get_tablename('WF_LLL'))
+        self.assertEqual(0, len(cut._connection.calls))
+        calls = sum(len(connection.calls) for connection in connections)
+        results = list(cut.get_rowcounts(['WS_LS', 'WF_LLL']))
+        self.assertEqual([5, 6], [result.rowcount for result in results])
+        self.assertEqual(calls, sum(len(connection.calls)
+                         for connection in connections))
+
+    def test_get_rowcounts_failing_connection(self):
+        cut = CitAbapClient()
+        cut._connection = AbapConnectionMock()
+        connections = []
+
+        def connect():
+            connection = AbapConnectionMock()
+
+            def rfc_result(IV_TABLE_ID, IV_MODE, IV_NUM_RECS):
+                if IV_TABLE_ID == 'BROKEN':
+                    raise RuntimeError('Connection lost')
+                return {'EV_RC': 0, 'EV_COUNT': '1', 'EV_TABNAME': '', 'EV_CDSNAME': ''}
+            connection.set_rfc_result_for(
+                'DHE2E_CIT_RFC_DATA_ACCESS', rfc_result)
+            connections.append(connection)
+            return connection
+        cut._connect = connect
+
+        results = list(cut.get_rowcounts(['BROKEN'], max_workers=1))
+        self.assertIsInstance(results[0].error, RuntimeError)
+        # the failed connection is closed and not reused
+        self.assertFalse(connections[0].alive)
+        self.assertEqual([], cut._spareconnections)
+
+        results = list(cut.get_rowcounts(['WS_LS'], max_workers=1))
+        self.assertEqual(1, results[0].rowcount)
+        self.assertEqual(2, len(connections))
+        self.assertEqual([connections[1]], cut._spareconnections)
+
+        cut.close()
+        self.assertFalse(connections[1].alive)
+        self.assertEqual([], cut._spareconnections)
+
+    def test_get_rowcounts_without_connect(self):
+        cut = CitAbapClient()
+        cut._connection = AbapConnectionMock()
+        results = list(cut.get_rowcounts(['WS_LS']))
+        self.assertIsInstance(results[0].error, RuntimeError)
+
     def test_update_records(self):
         cut = CitAbapClient()
         abapmock = AbapConnectionMock()
@@ -105,6 +262,24 @@ class testCitAbapClient(unittest.TestCase):
                         {'IV_TABLE_ID': 'WN_LM', 'IV_MODE': 'D', 'IV_NUM_RECS': '3'}]
         self.assertEqual(expectedcall, abapmock.last_rfc_call)
 
+    def test_delete_records_concurrent_count(self):
+        cut = CitAbapClient()
+        abapmock = AbapConnectionMock()
+        cut._connection = abapmock
+        counts = [10]
+
+        def rfc_result(IV_TABLE_ID, IV_MODE, IV_NUM_RECS):
+            if IV_MODE == 'D':
+                # a count of another thread while the records are deleted
+                self.assertEqual(10, cut.get_rowcount(IV_TABLE_ID))
+                counts[0] -= int(IV_NUM_RECS)
+            return {'EV_RC': 0, 'EV_COUNT': str(counts[0]), 'EV_TABNAME': 'DHE2E_WN_LM',
+                    'EV_CDSNAME': 'DHE2E_CDS_WN_LM', 'ET_RECID': []}
+        abapmock.set_rfc_result_for('DHE2E_CIT_RFC_DATA_ACCESS', rfc_result)
+
+        cut.delete_records('WN_LM', 3)
+        self.assertEqual(7, cut.get_rowcount('WN_LM'))
+
     def test_insert_records(self):
         cut = CitAbapClient()
         abapmock = AbapConnectionMock()
@@ -133,7 +308,7 @@ class testCitAbapClient(unittest.TestCase):
         self.assertEqual(expectedcall, abapmock.last_rfc_call)
 
     def test_cit_prefix(self):
-        cut = CitAbapClient()
+        cut = CitAbapClient(countttl=0)
         abapmock = AbapConnectionMock()
         cut._connection = abapmock
 
@@ -1,8 +1,9 @@
+import socket
 import unittest
 
-from framework.infrastructure.Cluster import Cluster, ClusterHeaders, ClusterUrls, ClusterConnectionData
+from framework.infrastructure.Cluster import Cluster, ClusterAdapter, ClusterHeaders, ClusterPoolStatistics, ClusterUrls, ClusterConnectionData
 from framework.infrastructure.Repository import Repositoy
-from framework.unittests.doubles.SessionMock import SessionMock
+from framework.unittests.doubles.SessionMock import ResponseMock, SessionMock
 
 
 def getDummyConnectionData():
@@ -65,6 +66,126 @@ class testCluster(unittest.TestCase):
         cut.session.setresponse(202)
         cut.apiput('path', 'data')
 
+    def test_relogin(self):
+        cut = Cluster(getDummyConnectionData())
+        cut.session = SessionMock()
+        cut.session.setresponse(200)
+        self.assertTrue(cut.login())
+
+        # the session has expired, the request is sent again after the login
+        cut.session.setresponse(401)
+        cut.session.setresponse(200)
+        cut.session.setresponsecontent(200, 'content')
+        self.assertEqual('content', cut.apiget('/path').text)
+        self.assertEqual('https://cluster/path', cut.session.lastcalledurl)
+
+        self.assertEqual(1, cut.relogins)
+
+        # the same for a redirect to the login page
+        cut.session.setloginredirect()
+        cut.session.setresponse(200)
+        cut.session.setresponsecontent(201, 'created')
+        self.assertEqual('created', cut.apipost('/path', 'data').text)
+        self.assertEqual('data', cut.session.posteddata)
+        self.assertEqual(2, cut.relogins)
+
+        # a failed login returns the original response
+        cut.session.setresponse(401)
+        cut.session.setresponse(401)
+        self.assertEqual(401, cut.apiget('path').status_code)
+        self.assertEqual(2, cut.relogins)
+
+    def test_relogin_not_loggedin(self):
+        cut = Cluster(getDummyConnectionData())
+        cut.session = SessionMock()
+        cut.session.setresponse(401)
+        self.assertEqual(401, cut.apiget('path').status_code)
+        self.assertEqual(0, cut.relogins)
+
+    def test_relogin_concurrent(self):
+        cut = Cluster(getDummyConnectionData())
+        cut.session = SessionMock()
+        cut.session.setresponse(200)
+        cut.login()
+
+        # another thread has logged in after the request had been sent
+        generation = cut._logingeneration
+        cut.session.setresponse(200)
+        self.assertTrue(cut._relogin(generation))
+        self.assertTrue(cut._relogin(generation))
+        self.assertEqual(1, cut.relogins)
+        self.assertTrue(cut.session.responses.empty())
+
+    def test_is_session_expired(self):
+        self.assertTrue(Cluster.is_session_expired(ResponseMock(401, None)))
+        self.assertFalse(Cluster.is_session_expired(ResponseMock(200, '{}', {'Content-Type': 'application/json'})))
+        self.assertFalse(Cluster.is_session_expired(ResponseMock(200, '<html/>', {'Content-Type': 'text/html'},
+                                                                 'https://cluster/app/index.html')))
+        self.assertTrue(Cluster.is_session_expired(ResponseMock(200, '<html/>', {'Content-Type': 'text/html; charset=utf-8'},
+                                                                'https://cluster/auth/login')))
+
+    def test_adapter(self):
+        connectiondata = getDummyConnectionData()
+        connectiondata.poolconnections = 4
+        connectiondata.poolmaxsize = 50
+        cut = Cluster(connectiondata)
+        adapter = cut.session.get_adapter('https://cluster/path')
+        self.assertIsInstance(adapter, ClusterAdapter)
+        self.assertEqual(50, adapter._pool_maxsize)
+        self.assertEqual(4, adapter._pool_connections)
+        self.assertEqual('keep-alive', cut.session.headers['Connection'])
+
+    def test_without_keepalive(self):
+        connectiondata = getDummyConnectionData()
+        connectiondata.keepalive = False
+        cut = Cluster(connectiondata)
+        self.assertEqual('close', cut.session.headers['Connection'])
+
+    def test_poolstatistics(self):
+        cut = Cluster(getDummyConnectionData())
+        statistics = cut.poolstatistics
+        self.assertEqual(0, statistics.pools)
+        self.assertEqual(0, statistics.requests)
+        self.assertEqual(0.0, statistics.reuseratio)
+
+        pool = cut._adapter.poolmanager.connection_from_url('https://cluster')
+        pool.num_requests = 10
+        pool.num_connections = 3
+        statistics = cut.poolstatistics
+        self.assertEqual(1, statistics.pools)
+        self.assertEqual(10, statistics.requests)
+        self.assertEqual(7, statistics.hits)
+        self.assertEqual(3, statistics.misses)
+        self.assertAlmostEqual(0.7, statistics.reuseratio)
+
+
+class testClusterAdapter(unittest.TestCase):
+
+    def test_keepaliveidle(self):
+        connectiondata = getDummyConnectionData()
+        cut = ClusterAdapter.for_connectiondata(connectiondata)
+        self.assertIsNone(cut._socket_options)
+
+        connectiondata.keepaliveidle = 30
+        cut = ClusterAdapter.for_connectiondata(connectiondata)
+        self.assertIn((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+                      cut._socket_options)
+        self.assertEqual(cut._socket_options,
+                         cut.poolmanager.connection_pool_kw['socket_options'])
+
+        connectiondata.keepalive = False
+        cut = ClusterAdapter.for_connectiondata(connectiondata)
+        self.assertIsNone(cut._socket_options)
+
+
+class testClusterPoolStatistics(unittest.TestCase):
+
+    def test_basics(self):
+        cut = ClusterPoolStatistics(2, 5, 7)
+        self.assertEqual(0, cut.hits)
+        self.assertEqual(7, cut.misses)
+        self.assertEqual(0.0, cut.reuseratio)
+
 
 class testClusterConnectionData(unittest.TestCase):
 
@@ -113,6 +234,25 @@ class testClusterConnectionData(unittest.TestCase):
         cut = ClusterConnectionData('WIHTOUT_URL')
         self.assertIsNone(cut.baseurl)
 
+    def test_pool_settings(self):
+        cut = ClusterConnectionData('foo', 'https://bar')
+        self.assertEqual(10, cut.poolconnections)
+        self.assertEqual(10, cut.poolmaxsize)
+        self.assertTrue(cut.keepalive)
+        self.assertIsNone(cut.keepaliveidle)
+
+        cut.fill_properties({'poolconnections': '2', 'poolmaxsize': 200,
+                             'keepalive': 'false', 'keepaliveidle': '60'})
+        self.assertEqual(2, cut.poolconnections)
+        self.assertEqual(200, cut.poolmaxsize)
+        self.assertFalse(cut.keepalive)
+        self.assertEqual(60, cut.keepaliveidle)
+
+        with self.assertRaises(ValueError):
+            cut.poolmaxsize = 0
+        with self.assertRaises(ValueError):
+            cut.poolconnections = 'many'
+
 
 class testClusterUrls(unittest.TestCase):
     def test_basics(self):
@@ -2,10 +2,14 @@ import json
 import unittest
 import os
 
+import requests
+
 from framework.infrastructure.Cluster import Cluster, ClusterConnectionData
-from framework.infrastructure.ConnectionManagement import ConnectionJson, ConnectionManagement, ConnectionType
+from framework.infrastructure.ConnectionManagement import ConnectionApplyAction, ConnectionDiff, ConnectionJson, ConnectionManagement, ConnectionType
+from framework.infrastructure.connections.Connection import Connection
 from framework.infrastructure.Utils import ConnectionData
-from framework.unittests.doubles.SessionMock import SessionMock
+from framework.infrastructure.utils.TtlLruCache import TtlLruCache
+from framework.unittests.doubles.SessionMock import RoutingSessionMock, SessionMock
 
 test_path = os.path.join(os.path.dirname(
     __file__), 'testdata', 'connectiondata')
@@ -112,6 +116,52 @@ class testConnectionManagement(unittest.TestCase):
         connection = cut.getconnection('NON-EXISTING')
         self.assertIsNone(connection)
 
+    def test_getconnection_cached(self):
+        cluster = Cluster(getDummyConnectionData())
+        cluster.session = SessionMock()
+        cluster.session.setresponsecontent(200, getDummyConnection())
+
+        cut = ConnectionManagement(cluster)
+        connection = cut.getconnection('S4H_2021')
+        connection.description = 'changed by the caller'
+
+        # no further response is queued, so the session must not be used
+        connection = cut.getconnection('S4H_2021')
+        self.assertEqual('S4H 2021 - via QOI-927 (GAERTNERNI) ',
+                         connection.description)
+        self.assertEqual(1, cut.cachestatistics.hits)
+        self.assertEqual(1, cut.cachestatistics.misses)
+        self.assertEqual(0.5, cut.cachestatistics.hitrate)
+
+        cluster.session.setresponse(204)
+        cut.remove_connection('S4H_2021')
+        cluster.session.setresponsecontent(200, getDummyConnection())
+        cut.getconnection('S4H_2021')
+        self.assertTrue(cluster.session.lastcalledurl.endswith(
+            '/connections/S4H_2021'))
+        self.assertEqual(2, cut.cachestatistics.misses)
+
+        cluster.session.setresponse(201)
+        cut.save_connection(connection)
+        self.assertEqual(0, cut.cachestatistics.size)
+
+    def test_shared_cache(self):
+        cache = TtlLruCache()
+        first = Cluster(getDummyConnectionData())
+        first.session = SessionMock()
+        first.session.setresponsecontent(200, getDummyConnection())
+        otherconnectiondata = getDummyConnectionData()
+        otherconnectiondata.tenant = 'other'
+        second = Cluster(otherconnectiondata)
+        second.session = SessionMock()
+        second.session.setresponsecontent(200, getDummyConnection())
+
+        ConnectionManagement(first, cache).getconnection('S4H_2021')
+        ConnectionManagement(first, cache).getconnection('S4H_2021')
+        ConnectionManagement(second, cache).getconnection('S4H_2021')
+        self.assertEqual(1, cache.statistics().hits)
+        self.assertEqual(2, cache.statistics().size)
+
     def test_create_abap_connection(self):
         cluster = Cluster(getDummyConnectionData())
         abap_connection_data = ConnectionData.for_abap('dummyABAP', test_path)
@@ -266,6 +316,159 @@ class testConnectionManagement(unittest.TestCase):
 
         self.assertRaises(RuntimeError, cut.remove_connection, 'non-existing')
 
+    def test_update_connection(self):
+        cluster = Cluster(getDummyConnectionData())
+        cluster.session = SessionMock()
+        cut = ConnectionManagement(cluster)
+
+        connection = Connection('HANA')
+        cluster.session.setresponse(200)
+        cut.update_connection(connection)
+        self.assertTrue(cluster.session.lastcalledurl.endswith(
+            'app/datahub-app-connection/connections/HANA'))
+        self.assertEqual(ConnectionJson.serialize(
+            connection), cluster.session.putdata)
+
+        cluster.session.setresponsecontent(400, 'This is the error message!')
+        self.assertRaises(RuntimeError, cut.update_connection, connection)
+
+    def test_update_connection_concurrent_read(self):
+        cluster = Cluster(getDummyConnectionData())
+        cluster.session = SessionMock()
+        cut = ConnectionManagement(cluster)
+        put = cluster.session.put
+
+        def read_while_writing(url, data, headers):
+            response = put(url, data, headers)
+            cut.getconnection('S4H_2021')
+            return response
+        cluster.session.put = read_while_writing
+
+        # the previous definition read during the update is not kept
+        cluster.session.setresponse(204)
+        cluster.session.setresponsecontent(200, getDummyConnection())
+        cut.update_connection(Connection('S4H_2021'))
+        self.assertEqual(0, cut.cachestatistics.size)
+
+        cluster.session.setresponsecontent(400, 'This is the error message!')
+        cluster.session.setresponsecontent(200, getDummyConnection())
+        self.assertRaises(RuntimeError, cut.update_connection, Connection('S4H_2021'))
+        self.assertEqual(0, cut.cachestatistics.size)
+
+    def _get_desired_connection(self, connectionid: str, host: str) -> Connection:
+        connection = Connection(connectionid)
+        connection.type = ConnectionType.HANA.value
+        connection.contentData['host'] = host
+        connection.contentData['password'] = 'secret'
+        return connection
+
+    def test_apply(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        existing = [
+            {'id': 'UNCHANGED', 'description': '', 'type': 'HANA_DB', 'tags': [], 'owner': 'system',
+             'contentData': {'host': 'a.hana.com', 'password': '******'}},
+            {'id': 'CHANGED', 'description': '', 'type': 'HANA_DB', 'tags': [],
+             'contentData': {'host': 'old.hana.com'}},
+            {'id': 'SUMMARY', 'description': '', 'type': 'HANA_DB', 'tags': []}]
+        session.setrouteresponsecontent(
+            '/app/datahub-app-connection/connections', 200, json.dumps(existing))
+        session.setrouteresponsecontent(
+            '/app/datahub-app-connection/connections', 201, '')
+        session.setrouteresponsecontent(
+            '/connections/SUMMARY', 200, json.dumps(existing[2] | {'contentData': {'host': 'c.hana.com'}}))
+        session.setrouteresponsecontent('/connections/CHANGED', 200, '')
+
+        cut = ConnectionManagement(cluster)
+        actions = cut.apply([self._get_desired_connection('UNCHANGED', 'a.hana.com'),
+                             self._get_desired_connection(
+                                 'CHANGED', 'new.hana.com'),
+                             self._get_desired_connection(
+                                 'SUMMARY', 'c.hana.com'),
+                             self._get_desired_connection('NEW', 'd.hana.com')])
+
+        self.assertEqual({'UNCHANGED': ConnectionApplyAction.UNCHANGED,
+                          'CHANGED': ConnectionApplyAction.UPDATED,
+                          'SUMMARY': ConnectionApplyAction.UNCHANGED,
+                          'NEW': ConnectionApplyAction.CREATED}, actions)
+        self.assertEqual(4, len(session.calledurls))
+
+    def test_apply_vanished_connection(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        session.setrouteresponsecontent('/app/datahub-app-connection/connections', 200, json.dumps(
+            [{'id': 'VANISHED', 'description': '', 'type': 'HANA_DB', 'tags': []}]))
+        session.setrouteresponsecontent('/connections/VANISHED', 404, '')
+        session.setrouteresponsecontent('/app/datahub-app-connection/connections', 201, '')
+
+        cut = ConnectionManagement(cluster)
+        actions = cut.apply([self._get_desired_connection('VANISHED', 'd.hana.com')])
+
+        self.assertEqual({'VANISHED': ConnectionApplyAction.CREATED}, actions)
+        self.assertEqual('https://cluster/app/datahub-app-connection/connections', session.lastcalledurl)
+        # the full definitions are not read via the cache
+        self.assertEqual(0, cut.cachestatistics.misses)
+
+    def test_apply_with_request_errors(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        session.setrouteresponsecontent(
+            '/app/datahub-app-connection/connections', 200, '[]')
+        post = session.post
+
+        def failing_post(url, data, headers):
+            if 'FAILING' in data:
+                raise requests.ConnectionError('Connection aborted')
+            return post(url, data, headers)
+        session.post = failing_post
+        session.setrouteresponsecontent(
+            '/app/datahub-app-connection/connections', 201, '')
+
+        cut = ConnectionManagement(cluster)
+        with self.assertRaises(RuntimeError) as context:
+            cut.apply([self._get_desired_connection('FAILING', 'f.hana.com'),
+                       self._get_desired_connection('NEW', 'd.hana.com')], max_workers=1)
+        self.assertIn('FAILING: Connection aborted', str(context.exception))
+        self.assertNotIn('NEW', str(context.exception))
+
+    def test_apply_with_errors(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        session.setrouteresponsecontent(
+            '/app/datahub-app-connection/connections', 200, '[]')
+        session.setrouteresponsecontent(
+            '/app/datahub-app-connection/connections', 400, 'Invalid connection')
+
+        cut = ConnectionManagement(cluster)
+        with self.assertRaises(RuntimeError) as context:
+            cut.apply([self._get_desired_connection('NEW', 'd.hana.com')])
+        self.assertIn('NEW: Invalid connection', str(context.exception))
+
+
+class testConnectionDiff(unittest.TestCase):
+
+    def test_differs(self):
+        existing = {'id': 'A', 'owner': 'system',
+                    'contentData': {'host': 'a', 'port': 443, 'password': '***'}}
+        self.assertFalse(ConnectionDiff.differs({'id': 'A'}, existing))
+        self.assertFalse(ConnectionDiff.differs(
+            {'contentData': {'host': 'a', 'password': 'secret'}}, existing))
+        self.assertTrue(ConnectionDiff.differs(
+            {'contentData': {'port': 444}}, existing))
+        self.assertTrue(ConnectionDiff.differs({'tags': []}, existing))
+
+    def test_differs_normalized(self):
+        existing = {'contentData': {'port': '30015', 'useTLS': 'true', 'timeout': '60', 'tags': ['1']}}
+        self.assertFalse(ConnectionDiff.differs(
+            {'contentData': {'port': 30015, 'useTLS': True, 'timeout': 60.0, 'tags': [1]}}, existing))
+        self.assertTrue(ConnectionDiff.differs({'contentData': {'port': 30016}}, existing))
+        self.assertTrue(ConnectionDiff.differs({'contentData': {'useTLS': False}}, existing))
+        self.assertTrue(ConnectionDiff.differs({'contentData': {'host': None}}, {'contentData': {'host': ''}}))
+
 
 class testConnectionDeSerializer(unittest.TestCase):
 
@@ -1,7 +1,287 @@
-
+import gzip
+import io
+import json
 import unittest
 
-from framework.validation.datalake.DatalakeClient import DatalakeConnectionData
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from framework.infrastructure.replications.Replication import (ReplicationSpaceFileCompression,
+                                                               ReplicationSpaceFileDelimiter,
+                                                               ReplicationSpaceFileType)
+from framework.unittests.doubles.DatalakeMock import DatalakeServiceMock
+from framework.validation.datalake.DatalakeClient import DatalakeClient, DatalakeConnectionData
+from framework.validation.datalake.RecordReducers import CombinedReducer, KeySet, RecordChecksum, RecordCount
+
+
+def create_client(service: DatalakeServiceMock) -> DatalakeClient:
+    client = DatalakeClient()
+    client.container = 'replications'
+    client._connection = service
+    return client
+
+
+def parquet_content(rows: int, row_group_size: int = 100) -> bytes:
+    table = pa.table({'ID': list(range(rows)), 'NAME': [
+                     f'name {i}' for i in range(rows)]})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=row_group_size)
+    return buffer.getvalue()
+
+
+class testDatalakeClient(unittest.TestCase):
+
+    def test_get_jsonfile_content(self):
+        service = DatalakeServiceMock()
+        service.set_file('target/data.json', b'{"a": [1, 2]}')
+        cut = create_client(service)
+        self.assertEqual({'a': [1, 2]},
+                         cut.get_jsonfile_content('target', 'data.json'))
+
+    def test_iter_jsonlines(self):
+        service = DatalakeServiceMock(chunksize=3)
+        records = [{'ID': i, 'TEXT': 'Grüße'} for i in range(5)]
+        content = '\n'.join(json.dumps(record, ensure_ascii=False)
+                            for record in records) + '\n\n'
+        service.set_file('target/data.jsonl', content.encode('utf-8'))
+        cut = create_client(service)
+
+        self.assertEqual(records, list(
+            cut.iter_jsonlines('target', 'data.jsonl')))
+
+    def test_iter_csv(self):
+        service = DatalakeServiceMock(chunksize=5)
+        service.set_file('target/data.csv',
+                         b'ID;NAME\r\n1;"first; with delimiter"\r\n2;"second\nline"\r\n3;third')
+        cut = create_client(service)
+
+        records = list(cut.iter_csv('target', 'data.csv',
+                       ReplicationSpaceFileDelimiter.SEMICOLON))
+        self.assertEqual([{'ID': '1', 'NAME': 'first; with delimiter'},
+                          {'ID': '2', 'NAME': 'second\nline'},
+                          {'ID': '3', 'NAME': 'third'}], records)
+
+        service.set_file('target/data.csv', gzip.compress(b'1\tA\n2\tB\n'))
+        records = list(cut.iter_csv('target', 'data.csv', ReplicationSpaceFileDelimiter.TAB, False,
+                                    ReplicationSpaceFileCompression.GZIP))
+        self.assertEqual([['1', 'A'], ['2', 'B']], records)
+
+        service.set_file('target/empty.csv', b'')
+        self.assertEqual([], list(cut.iter_csv('target', 'empty.csv')))
+
+    def test_iter_parquet(self):
+        service = DatalakeServiceMock(chunksize=1024)
+        service.set_file('target/data.parquet', parquet_content(1000))
+        cut = create_client(service)
+
+        records = cut.iter_parquet('target', 'data.parquet', batch_size=100)
+        self.assertEqual({'ID': 0, 'NAME': 'name 0'}, next(records))
+        self.assertEqual(999, sum(1 for record in records))
+
+        ids = [record['ID'] for record in cut.iter_parquet(
+            'target', 'data.parquet', columns=['ID'])]
+        self.assertEqual(list(range(1000)), ids)
+
+    def test_open_file(self):
+        service = DatalakeServiceMock()
+        service.set_file('target/data.bin', bytes(range(100)))
+        cut = create_client(service)
+
+        with cut.open_file('target', 'data.bin', buffer_size=10) as file:
+            file.seek(90)
+            self.assertEqual(bytes(range(90, 100)), file.read())
+            file.seek(-5, io.SEEK_END)
+            self.assertEqual(bytes(range(95, 98)), file.read(3))
+            self.assertEqual(b'', file.read(0))
+        self.assertLess(service.downloadedbytes, 100)
+
+
+    def test_exists(self):
+        service = DatalakeServiceMock()
+        service.set_file('target/2024-01-01/part-0.csv', b'1')
+        cut = create_client(service)
+
+        self.assertTrue(cut.exists('target', '2024-01-01/part-0.csv'))
+        self.assertTrue(cut.exists('target/2024-01-01', 'part-0.csv'))
+        self.assertFalse(cut.exists('target', '2024-01-01/part-1.csv'))
+        self.assertTrue(cut.is_file_Exist('target', '2024-01-01/part-0.csv'))
+        self.assertEqual(0, service.listings)
+        self.assertEqual(3, service.propertycalls)
+
+    def test_exists_cached(self):
+        service = DatalakeServiceMock()
+        for day in range(1, 4):
+            for part in range(3):
+                service.set_file(
+                    f'target/2024-01-0{day}/part-{part}.csv', b'1')
+        service.set_file('other/part-0.csv', b'1')
+        cut = create_client(service)
+
+        for day in range(1, 4):
+            for part in range(3):
+                self.assertTrue(cut.exists(
+                    'target', f'2024-01-0{day}/part-{part}.csv', cached=True))
+        self.assertFalse(cut.exists(
+            'target', '2024-01-01/part-3.csv', cached=True))
+        # the listing of the parent folder is used for its subfolders
+        self.assertTrue(cut.exists(
+            'target/2024-01-02', 'part-1.csv', cached=True))
+        self.assertFalse(cut.exists(
+            'target/2024-01-04', 'part-1.csv', cached=True))
+        self.assertEqual(1, service.listings)
+        self.assertEqual(0, service.propertycalls)
+
+        # files created later are only seen after the listing expired
+        service.set_file('target/2024-01-01/part-3.csv', b'1')
+        self.assertFalse(cut.exists(
+            'target', '2024-01-01/part-3.csv', cached=True))
+        cut.invalidate_listings()
+        self.assertTrue(cut.exists(
+            'target', '2024-01-01/part-3.csv', cached=True))
+
+        self.assertTrue(cut.exists('other', 'part-0.csv', cached=True))
+        self.assertEqual(3, service.listings)
+
+    def test_exists_cached_ttl(self):
+        service = DatalakeServiceMock()
+        service.set_file('target/part-0.csv', b'1')
+        cut = DatalakeClient(listingttl=0)
+        cut.container = 'replications'
+        cut._connection = service
+
+        self.assertTrue(cut.exists('target', 'part-0.csv', cached=True))
+        self.assertTrue(cut.exists('target', 'part-0.csv', cached=True))
+        self.assertEqual(2, service.listings)
+
+    def test_get_listing(self):
+        service = DatalakeServiceMock()
+        service.set_file('target/a/1.csv', b'1')
+        service.set_file('target/a/2.csv', b'1')
+        service.set_file('target/b/1.csv', b'1')
+        cut = create_client(service)
+
+        listing = cut.get_listing('target/')
+        self.assertEqual('target', listing.foldername)
+        self.assertEqual(3, len(listing))
+        self.assertEqual(['1.csv', '2.csv'], listing.files_in('target/a'))
+        self.assertEqual(['target/a/1.csv', 'target/a/2.csv',
+                         'target/b/1.csv'], listing.paths)
+        self.assertIs(listing, cut.get_listing('target'))
+
+
+    def test_download_folder(self):
+        service = DatalakeServiceMock()
+        for part in range(10):
+            service.set_file(f'target/part-{part}.csv', f'{part}'.encode())
+        service.set_file('other/part-0.csv', b'x')
+        cut = create_client(service)
+
+        content = cut.download_folder('target', max_workers=4)
+        self.assertEqual(10, len(content))
+        self.assertEqual(b'7', content['target/part-7.csv'])
+        self.assertEqual(1, service.listings)
+
+        # a new listing is requested, which is cached afterwards
+        service.set_file('target/part-10.csv', b'10')
+        self.assertEqual(11, len(cut.download_folder('target')))
+        self.assertTrue(cut.exists('target', 'part-10.csv', cached=True))
+        self.assertEqual(2, service.listings)
+
+    def test_aggregate(self):
+        service = DatalakeServiceMock(chunksize=16)
+        service.set_file('target/2024-01-01/part-0.csv',
+                         b'ID,NAME\n1,a\n2,b\n')
+        service.set_file('target/2024-01-02/part-0.csv.gz',
+                         gzip.compress(b'ID,NAME\n3,c\n2,b\n'))
+        service.set_file('target/2024-01-03/part-0.jsonl',
+                         b'{"ID": "4", "NAME": "d"}\n')
+        service.set_file('target/_SUCCESS', b'')
+        cut = create_client(service)
+
+        reducer = cut.aggregate('target', CombinedReducer(
+            count=RecordCount(), keys=KeySet(['ID']), checksum=RecordChecksum(['ID', 'NAME'])), max_workers=3)
+        result = reducer.result
+        self.assertEqual(5, result['count'])
+        self.assertEqual({('1',), ('2',), ('3',), ('4',)}, result['keys'])
+        self.assertEqual(1, reducer['keys'].duplicates)
+
+        # the checksum does not depend on how the records are split into files
+        other = DatalakeServiceMock()
+        other.set_file('target/all.csv',
+                       b'ID,NAME\n2,b\n4,d\n3,c\n1,a\n2,b\n')
+        checksum = create_client(other).aggregate(
+            'target', RecordChecksum(['ID', 'NAME'])).result
+        self.assertEqual(result['checksum'], checksum)
+
+        records = []
+        cut.aggregate('target', records.append)
+        self.assertEqual(5, len(records))
+
+    def test_aggregate_parquet(self):
+        service = DatalakeServiceMock(chunksize=1024)
+        service.set_file('target/part-0.parquet', parquet_content(300))
+        service.set_file('target/part-1.parquet', parquet_content(200))
+        cut = create_client(service)
+
+        self.assertEqual(500, cut.aggregate('target', RecordCount()).result)
+        self.assertEqual(300, len(cut.aggregate(
+            'target', KeySet(['ID'])).result))
+
+    def test_count_records(self):
+        service = DatalakeServiceMock(chunksize=64)
+        service.set_file('target/part-0.parquet', parquet_content(30000, 5000))
+        service.set_file('target/part-1.csv', b'ID,NAME\n1,a\n2,b\n')
+        service.set_file('target/part-2.csv.gz', gzip.compress(b'ID,NAME\n3,c\n4,d'))
+        service.set_file('target/part-3.jsonl', b'{"ID": "5"}\n\n{"ID": "6"}\n \n')
+        service.set_file('target/empty.csv', b'')
+        service.set_file('target/_SUCCESS', b'')
+        cut = create_client(service)
+
+        self.assertEqual({'target/part-0.parquet': 30000, 'target/part-1.csv': 2, 'target/part-2.csv.gz': 2,
+                          'target/part-3.jsonl': 2, 'target/empty.csv': 0},
+                         cut.get_recordcounts('target', max_workers=2))
+        # only the footer of the parquet file is downloaded
+        size = len(service._files['target/part-0.parquet'])
+        parquetbytes = sum(length for path, offset, length in service.downloads
+                           if path == 'target/part-0.parquet')
+        self.assertLess(parquetbytes, size / 4)
+
+        # the counts of unchanged files are cached
+        service.downloads.clear()
+        self.assertEqual(30006, cut.count_records('target'))
+        self.assertEqual([], service.downloads)
+
+        service.set_file('target/part-1.csv', b'ID,NAME\n1,a\n2,b\n3,c\n')
+        self.assertEqual(30007, cut.count_records('target'))
+        self.assertEqual(['target/part-1.csv'], [path for path, offset, length in service.downloads])
+
+        self.assertEqual(30009, cut.count_records('target', header=False))
+
+    def test_count_records_like_aggregate(self):
+        service = DatalakeServiceMock(chunksize=8)
+        service.set_file('target/part-0.jsonl', b'{"ID": "1"}\n\n{"ID": "2"}\n\n')
+        service.set_file('target/part-1.jsonl.gz', gzip.compress(b'\n{"ID": "3"}'))
+        service.set_file('target/part-2.csv', b'ID\n4\n')
+        cut = create_client(service)
+
+        self.assertEqual(4, cut.aggregate('target', RecordCount()).result)
+        self.assertEqual(4, cut.count_records('target'))
+
+    def test_count_records_compressed_parquet(self):
+        service = DatalakeServiceMock()
+        service.set_file('target/part-0.parquet.gz', gzip.compress(parquet_content(10)))
+        cut = create_client(service)
+
+        self.assertEqual((ReplicationSpaceFileType.PARQUET, ReplicationSpaceFileCompression.GZIP),
+                         cut.detect_format('target/part-0.parquet.gz'))
+        self.assertRaises(ValueError, cut.count_records, 'target')
+        self.assertRaises(ValueError, cut.iter_records, 'target', 'part-0.parquet.gz')
+
+    def test_iter_records(self):
+        service = DatalakeServiceMock()
+        service.set_file('target/data.txt', b'1')
+        cut = create_client(service)
+        self.assertRaises(ValueError, cut.iter_records, 'target', 'data.txt')
 
 
 class testDatalakeConnectionData(unittest.TestCase):
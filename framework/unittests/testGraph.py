@@ -1,7 +1,9 @@
 import unittest
 import json
+from framework.infrastructure.AsyncCluster import AsyncCluster
 from framework.infrastructure.Cluster import Cluster, ClusterConnectionData
-from framework.infrastructure.graphs.Graph import Graph
+from framework.infrastructure.graphs.Graph import AsyncGraph, Graph
+from framework.unittests.doubles.AsyncSessionMock import AsyncSessionMock
 from framework.unittests.doubles.SessionMock import SessionMock
 
 
@@ -98,5 +100,34 @@ class testGraph(unittest.TestCase):
             f"Graph with handle {graph._handleID} not found" in str(context.exception))
 
 
+class testAsyncGraph(unittest.IsolatedAsyncioTestCase):
+
+    async def test_runGraph(self):
+        cluster = AsyncCluster(getDummyConnectionData())
+        cluster.session = AsyncSessionMock()
+        graph = AsyncGraph(cluster)
+        cluster.session.setresponsecontent(200, getDummyResponseForRunGraph())
+        await graph.runGraph("test.cit.slt-to-hana.slt_reader_gen2_InitialLoad", "gen2_test",
+                             {"MTID": "73H", "TABLENAME": "SNWD_SO"}, {"enabled": True, "periodSeconds": 30})
+        self.assertEqual("pending", graph._status)
+        self.assertEqual("9c2cb4a651c44a93b66b0eb637256c48", graph._handleID)
+
+        cluster.session.setresponsecontent(
+            200, getDummyResponseForCheckStatus())
+        self.assertEqual("running", await graph.getStatus())
+
+        cluster.session.setresponsecontent(
+            200, getDummyResponseForCheckStatusByName())
+        self.assertEqual("running", await graph.getStatusByName("test"))
+
+        cluster.session.setresponsecontent(
+            200, '{"configurationSubstitutions":{"MT_ID": "5BV"}}')
+        self.assertEqual({'massTransferId': '5BV'}, await graph.getMTID())
+
+        cluster.session.setresponse(404)
+        with self.assertRaises(Exception):
+            await graph.getStatus()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,5 +1,5 @@
-
 import unittest
+from decimal import Decimal
 
 from framework.unittests.doubles.HanaMock import HanaConnectionMock
 
@@ -34,6 +34,164 @@ class testHanaClient(unittest.TestCase):
             "CIT_TEST", "TESTTABLE", 3, 0, "DIBUG2", True)
         self.assertEqual(records, result)
 
+    def test_get_rowcounts(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_sql_result(
+            [('CIT_TEST', 'TABLE_A', 100), ('CIT_TEST', 'TABLE_B', 7)])
+        counts = cut.get_rowcounts('CIT_TEST', ['TABLE_A', 'TABLE_B', 'TABLE_C'])
+        self.assertEqual({'TABLE_A': 100, 'TABLE_B': 7}, counts)
+        self.assertEqual(
+            'SELECT "SCHEMA_NAME", "TABLE_NAME", "RECORD_COUNT" FROM "SYS"."M_TABLES" WHERE (SCHEMA_NAME = \'CIT_TEST\' AND TABLE_NAME IN (\'TABLE_A\', \'TABLE_B\', \'TABLE_C\'))', hanamock.last_sql)
+
+        self.assertEqual({}, cut.get_rowcounts('CIT_TEST', []))
+
+    def test_get_rowcounts_across_schemas(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_sql_result(
+            [('SCHEMA_A', 'TABLE', 1), ('SCHEMA_B', 'TABLE', 2)])
+        counts = cut.get_rowcounts_across_schemas(
+            [('SCHEMA_A', 'TABLE'), ('SCHEMA_B', 'TABLE')])
+        self.assertEqual(
+            {('SCHEMA_A', 'TABLE'): 1, ('SCHEMA_B', 'TABLE'): 2}, counts)
+        self.assertEqual(
+            'SELECT "SCHEMA_NAME", "TABLE_NAME", "RECORD_COUNT" FROM "SYS"."M_TABLES" WHERE (SCHEMA_NAME = \'SCHEMA_A\' AND TABLE_NAME IN (\'TABLE\')) OR (SCHEMA_NAME = \'SCHEMA_B\' AND TABLE_NAME IN (\'TABLE\'))', hanamock.last_sql)
+
+    def test_get_rowcounts_exact(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_sql_result([[42]])
+        counts = cut.get_rowcounts('CIT_TEST', ['TABLE_A', 'TABLE_B'], True)
+        self.assertEqual({'TABLE_A': 42, 'TABLE_B': 42}, counts)
+        self.assertEqual(
+            'SELECT COUNT(*) FROM "CIT_TEST"."TABLE_B"', hanamock.last_sql)
+
+    def test_iter_rows(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_description(['ID', 'POS', 'VALUE'])
+        hanamock.set_sql_results([(1, 1, 'a'), (1, 2, 'b')],
+                                 [(2, 1, 'c'), (3, 1, 'd')],
+                                 [(3, 2, 'e')])
+        rows = list(cut.iter_rows('CIT_TEST', 'TABLE', ['ID', 'POS'], 2))
+        self.assertEqual([(1, 1, 'a'), (1, 2, 'b'), (2, 1, 'c'),
+                         (3, 1, 'd'), (3, 2, 'e')], rows)
+
+        self.assertEqual(3, len(hanamock.executed))
+        self.assertEqual(
+            ('SELECT * FROM "CIT_TEST"."TABLE" ORDER BY "ID", "POS" LIMIT 2', []), hanamock.executed[0])
+        self.assertEqual(
+            ('SELECT * FROM "CIT_TEST"."TABLE" WHERE ("ID" > ?) OR ("ID" = ? AND "POS" > ?) ORDER BY "ID", "POS" LIMIT 2', [1, 1, 2]), hanamock.executed[1])
+        self.assertEqual([3, 3, 1], hanamock.executed[2][1])
+
+    def test_iter_rows_stops_on_full_last_batch(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_description(['ID'])
+        hanamock.set_sql_results([(1,), (2,)], [])
+        rows = list(cut.iter_rows('CIT_TEST', 'TABLE', ['ID'], 2))
+        self.assertEqual([(1,), (2,)], rows)
+        self.assertEqual(2, len(hanamock.executed))
+
+    def test_iter_rows_unknown_key(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_description(['ID'])
+        hanamock.set_sql_results([(1,)])
+        with self.assertRaises(ValueError):
+            list(cut.iter_rows('CIT_TEST', 'TABLE', ['KEY'], 2))
+        with self.assertRaises(ValueError):
+            list(cut.iter_rows('CIT_TEST', 'TABLE', [], 2))
+
+    def test_fingerprint(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_sql_results([('ID',), ('POS',), ('VALUE',)],
+                                 [(1, 3, 1, 1, 1, 3, Decimal(26), Decimal(255)),
+                                  (2, 2, 2, 1, 3, 2, Decimal(1), Decimal(16))])
+        fingerprints = cut.fingerprint('CIT_TEST', 'TABLE', ['ID', 'POS'], 2)
+
+        self.assertEqual(2, len(fingerprints))
+        self.assertEqual(1, fingerprints[0].bucket)
+        self.assertEqual(3, fingerprints[0].rowcount)
+        self.assertEqual((1, 1), fingerprints[0].firstkey)
+        self.assertEqual((1, 3), fingerprints[0].lastkey)
+        self.assertEqual('1a-ff', fingerprints[0].checksum)
+        self.assertEqual((3, 2), fingerprints[1].lastkey)
+        self.assertEqual('1-10', fingerprints[1].checksum)
+
+        self.assertEqual(
+            'SELECT "COLUMN_NAME" FROM "SYS"."TABLE_COLUMNS" WHERE SCHEMA_NAME = \'CIT_TEST\' AND TABLE_NAME = \'TABLE\' ORDER BY "POSITION"', hanamock.executed[0][0])
+        sql = hanamock.last_sql
+        self.assertIn('NTILE(2) OVER (ORDER BY "ID", "POS")', sql)
+        self.assertIn(
+            'IFNULL(TO_NVARCHAR("ID"), \'<NULL>\') || \'|\' || IFNULL(TO_NVARCHAR("POS"), \'<NULL>\') || \'|\' || IFNULL(TO_NVARCHAR("VALUE"), \'<NULL>\')', sql)
+        self.assertIn('FROM "CIT_TEST"."TABLE"', sql)
+        self.assertIn('SUM(TO_DECIMAL(HEXTONUM(SUBSTRING("ROWHASH", 1, 15)), 38, 0)), '
+                      'SUM(TO_DECIMAL(HEXTONUM(SUBSTRING("ROWHASH", 16, 15)), 38, 0))', sql)
+        # the checksum is order independent, no per bucket string is built
+        self.assertNotIn('STRING_AGG', sql)
+        self.assertTrue(sql.endswith('GROUP BY "BUCKET" ORDER BY "BUCKET"'))
+
+    def test_fingerprint_with_columns(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_sql_result([(1, 1, 5, 5, 10, 11)])
+        fingerprints = cut.fingerprint(
+            'CIT_TEST', 'TABLE', ['ID'], 4, ['VALUE'])
+        self.assertEqual(1, len(hanamock.executed))
+        self.assertNotIn('TO_NVARCHAR("ID")', hanamock.last_sql)
+        self.assertTrue(fingerprints[0].matches(fingerprints[0]))
+
+        with self.assertRaises(ValueError):
+            cut.fingerprint('CIT_TEST', 'TABLE', ['ID'], 0, ['VALUE'])
+
+    def test_get_partition_boundaries(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        hanamock.set_sql_result([(1,), (4,), (4,), (9,)])
+        boundaries = cut.get_partition_boundaries(
+            'CIT_TEST', 'TABLE', 'ID', 4, 1, 20)
+        self.assertEqual([1, 4, 9], boundaries)
+        self.assertEqual(
+            'SELECT MIN("ID") FROM (SELECT "ID", NTILE(4) OVER (ORDER BY "ID") AS "PARTITION" FROM "CIT_TEST"."TABLE" WHERE ("ID" >= ? AND "ID" < ?)) GROUP BY "PARTITION" ORDER BY 1', hanamock.last_sql)
+        self.assertEqual([1, 20], hanamock.last_parameters)
+
+    def test_get_partition_digests(self):
+        cut = HanaClient()
+        hanamock = HanaConnectionMock()
+        cut._connection = hanamock
+
+        self.assertEqual([], cut.get_partition_digests(
+            'CIT_TEST', 'TABLE', 'ID', [], ['ID'], ['ID']))
+
+        hanamock.set_sql_result([(0, 2, Decimal(10), Decimal(1)), (2, 5, Decimal(11), Decimal(2))])
+        digests = cut.get_partition_digests(
+            'CIT_TEST', 'TABLE', 'ID', [(None, 5), (5, 10), (10, None)], ['ID'], ['ID', 'VALUE'])
+        self.assertEqual([(2, 'a-1'), (0, None), (5, 'b-2')], digests)
+        self.assertEqual([5, 5, 10, 10], hanamock.last_parameters)
+        self.assertIn(
+            'IFNULL(LTRIM(RTRIM(TO_NVARCHAR("ID"))), \'\') || \'|\' || IFNULL(LTRIM(RTRIM(TO_NVARCHAR("VALUE"))), \'\')', hanamock.last_sql)
+
     def test_drop_table(self):
         cut = HanaClient()
 
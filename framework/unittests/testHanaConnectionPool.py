@@ -0,0 +1,170 @@
+import threading
+import time
+import unittest
+
+from framework.unittests.doubles.HanaMock import HanaConnectionMock
+from framework.validation.hana.HanaClient import HanaClient, HanaConnectionData
+from framework.validation.hana.HanaConnectionPool import HanaConnectionPool
+
+
+def getDummyConnectionData():
+    connection_data = HanaConnectionData('HANA_EU10')
+    connection_data.address = 'host.eu10.sap.com'
+    connection_data.port = 443
+    connection_data.user = 'DBADMIN'
+    connection_data.password = '******'
+    return connection_data
+
+
+class testHanaConnectionPool(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.connections = []
+
+    def connect(self):
+        connection = HanaConnectionMock()
+        self.connections.append(connection)
+        return connection
+
+    def test_basics(self):
+        cut = HanaConnectionPool(getDummyConnectionData(),
+                                 minsize=2, maxsize=3, connect=self.connect)
+        self.assertEqual(2, len(self.connections))
+
+        with cut.connection() as connection:
+            self.assertIn(connection, self.connections)
+            statistics = cut.statistics()
+            self.assertEqual(2, statistics.size)
+            self.assertEqual(1, statistics.idle)
+
+        statistics = cut.statistics()
+        self.assertEqual(1, statistics.checkouts)
+        self.assertEqual(2, statistics.idle)
+        self.assertEqual(2, statistics.created)
+
+    def test_grows_up_to_maxsize(self):
+        cut = HanaConnectionPool(getDummyConnectionData(),
+                                 minsize=0, maxsize=2, timeout=0.01, connect=self.connect)
+        first = cut.acquire()
+        second = cut.acquire()
+        self.assertIsNot(first, second)
+        self.assertRaises(TimeoutError, cut.acquire)
+
+        cut.release(first)
+        self.assertIs(first, cut.acquire())
+        self.assertEqual(2, cut.statistics().created)
+
+    def test_waits_for_release(self):
+        cut = HanaConnectionPool(getDummyConnectionData(),
+                                 minsize=1, maxsize=1, connect=self.connect)
+        connection = cut.acquire()
+        timer = threading.Timer(0.05, cut.release, [connection])
+        timer.start()
+        self.assertIs(connection, cut.acquire(timeout=5))
+        timer.join()
+        self.assertGreater(cut.statistics().maxwaittime, 0.01)
+
+    def test_health_check(self):
+        cut = HanaConnectionPool(getDummyConnectionData(),
+                                 minsize=1, maxsize=1, connect=self.connect)
+        self.connections[0].connected = False
+        connection = cut.acquire()
+        self.assertIs(self.connections[1], connection)
+        self.assertEqual(1, cut.statistics().broken)
+
+    def test_ping(self):
+        cut = HanaConnectionPool(getDummyConnectionData(), minsize=1, maxsize=1,
+                                 pingafter=0.01, connect=self.connect)
+        # recently used connections are not pinged
+        cut.release(cut.acquire())
+        self.assertEqual([], self.connections[0].executed)
+
+        time.sleep(0.02)
+        cut.release(cut.acquire())
+        self.assertEqual([('SELECT 1 FROM DUMMY', None)], self.connections[0].executed)
+
+        # a connection dropped by the server is replaced
+        self.connections[0].dropped = True
+        time.sleep(0.02)
+        connection = cut.acquire()
+        self.assertIs(self.connections[1], connection)
+        self.assertFalse(self.connections[0].connected)
+        self.assertEqual(1, cut.statistics().broken)
+
+    def test_failing_minsize(self):
+        def connect():
+            if len(self.connections) == 2:
+                raise RuntimeError('Too many connections')
+            return self.connect()
+
+        self.assertRaises(RuntimeError, HanaConnectionPool, getDummyConnectionData(),
+                          minsize=3, maxsize=3, connect=connect)
+        # the connections opened so far are closed
+        self.assertEqual(2, len(self.connections))
+        self.assertFalse(any(connection.connected for connection in self.connections))
+
+    def test_idle_eviction(self):
+        cut = HanaConnectionPool(getDummyConnectionData(), minsize=1, maxsize=3,
+                                 maxidle=0.01, connect=self.connect)
+        first = cut.acquire()
+        second = cut.acquire()
+        cut.release(first)
+        cut.release(second)
+        time.sleep(0.02)
+
+        cut.acquire()
+        statistics = cut.statistics()
+        self.assertEqual(1, statistics.evicted)
+        self.assertEqual(1, statistics.size)
+
+    def test_close(self):
+        cut = HanaConnectionPool(getDummyConnectionData(),
+                                 minsize=2, maxsize=2, connect=self.connect)
+        connection = cut.acquire()
+        cut.close()
+        self.assertFalse(self.connections[0].connected)
+        self.assertTrue(connection.connected)
+        cut.release(connection)
+        self.assertFalse(connection.connected)
+        self.assertEqual(0, cut.statistics().size)
+        self.assertRaises(RuntimeError, cut.acquire)
+
+    def test_sizes(self):
+        self.assertRaises(ValueError, HanaConnectionPool,
+                          getDummyConnectionData(), 2, 1)
+        self.assertRaises(ValueError, HanaConnectionPool,
+                          getDummyConnectionData(), 0, 0)
+
+    def test_hanaclient_with_pool(self):
+        pool = HanaConnectionPool(getDummyConnectionData(),
+                                  minsize=1, maxsize=1, connect=self.connect)
+        cut = HanaClient.with_pool(pool)
+        self.assertIs(pool, cut.pool)
+
+        self.connections[0].set_sql_result([[234]])
+        self.assertEqual(234, cut.get_rowcount('SYSTEM', 'ZCDS_SNWD_SO_2'))
+        self.assertEqual(1, pool.statistics().checkouts)
+        self.assertEqual(1, pool.statistics().idle)
+
+    def test_hanaclient_exact_rowcounts(self):
+        pool = HanaConnectionPool(getDummyConnectionData(),
+                                  minsize=0, maxsize=4, connect=self.connect)
+        cut = HanaClient.with_pool(pool)
+
+        original_connect = self.connect
+
+        def connect():
+            connection = original_connect()
+            connection.set_sql_result([[5]])
+            return connection
+        pool._connect = connect
+
+        tablenames = [f'TABLE_{i}' for i in range(20)]
+        counts = cut.get_rowcounts('CIT_TEST', tablenames, exact=True)
+        self.assertEqual({tablename: 5 for tablename in tablenames}, counts)
+        self.assertEqual(20, pool.statistics().checkouts)
+        self.assertLessEqual(pool.statistics().created, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import threading
+import unittest
+
+from framework.infrastructure.utils.netweaver.MassTransferIdPool import MassTransferIdPool
+
+
+class SLTConfigurationOperationMock:
+    def __init__(self, failures: int = 0, mt_ids: list[str] = None) -> None:
+        self._lock = threading.Lock()
+        self._next = 0
+        self._failures = failures
+        # the IDs to return instead of new ones, e.g. a fixed ID
+        self._mt_ids = list(mt_ids) if mt_ids is not None else []
+        self.calling = threading.Event()
+        self.created = []
+        self.deleted = []
+        self.block = threading.Event()
+        self.block.set()
+
+    def get_mass_transfer_id(self, version: str = "V1", source: str = "NONE"):
+        self.calling.set()
+        self.block.wait()
+        with self._lock:
+            if self._failures > 0:
+                self._failures -= 1
+                raise Exception('The project ZIUUC_001 already exists')
+            if self._mt_ids:
+                mt_id = self._mt_ids.pop(0) if len(self._mt_ids) > 1 else self._mt_ids[0]
+                return mt_id, {'massTransferId': mt_id}
+            self._next += 1
+            mt_id = f'{self._next:03d}'
+            self.created.append((mt_id, version, source))
+        return mt_id, {'massTransferId': mt_id}
+
+    def del_mass_transfer_id(self, json_data_del_slt_config):
+        self.deleted.append(json_data_del_slt_config['massTransferId'])
+
+
+class testMassTransferIdPool(unittest.TestCase):
+
+    def wait_for_available(self, cut: MassTransferIdPool, count: int) -> None:
+        with cut._condition:
+            self.assertTrue(cut._condition.wait_for(
+                lambda: len(cut._available) >= count, timeout=5))
+
+    def test_lease(self):
+        operation = SLTConfigurationOperationMock()
+        cut = MassTransferIdPool(operation, size=2, version='GEN2').start()
+        self.wait_for_available(cut, 2)
+
+        mt_id, json_data_del_slt_config = cut.lease(timeout=5)
+        self.assertEqual('001', mt_id)
+        self.assertEqual({'massTransferId': '001'}, json_data_del_slt_config)
+        self.assertEqual(['001'], cut.leased)
+
+        # the leased configuration is replaced in the background
+        self.wait_for_available(cut, 2)
+        self.assertEqual(3, len(operation.created))
+        self.assertEqual('GEN2', operation.created[0][1])
+
+        cut.close()
+        self.assertEqual(['002', '003'], sorted(operation.deleted))
+        self.assertEqual(['001'], cut.leased)
+        self.assertIn('Leases:\t1', str(cut))
+        self.assertRaises(RuntimeError, cut.lease, 1)
+
+    def test_release(self):
+        operation = SLTConfigurationOperationMock()
+        with MassTransferIdPool(operation, size=1) as cut:
+            mt_id, json_data_del_slt_config = cut.lease(timeout=5)
+            self.wait_for_available(cut, 1)
+
+            # the pool is full, so the configuration is deleted
+            cut.release(json_data_del_slt_config, recycle=True)
+            self.assertEqual([mt_id], operation.deleted)
+
+            mt_id, json_data_del_slt_config = cut.lease(timeout=5)
+            cut.release(json_data_del_slt_config)
+            self.assertEqual(2, len(operation.deleted))
+            self.assertEqual([], cut.leased)
+
+    def test_recycle(self):
+        operation = SLTConfigurationOperationMock()
+        cut = MassTransferIdPool(operation, size=1)
+        operation.block.clear()
+        cut._available.append(('100', {'massTransferId': '100'}))
+        cut.start()
+
+        mt_id, json_data_del_slt_config = cut.lease(timeout=5)
+        cut.release(json_data_del_slt_config, recycle=True)
+        self.assertEqual(1, cut.available)
+        self.assertEqual([], operation.deleted)
+
+        # close waits for a configuration that is being created
+        timer = threading.Timer(0.05, operation.block.set)
+        timer.start()
+        cut.close(delete_leased=True)
+        self.assertFalse(cut._thread.is_alive())
+        self.assertIn('100', operation.deleted)
+        # the configuration that was created during close is deleted as well
+        self.assertEqual([created[0] for created in operation.created],
+                         [deleted for deleted in operation.deleted if deleted != '100'])
+
+    def test_close_during_creation(self):
+        operation = SLTConfigurationOperationMock()
+        operation.block.clear()
+        cut = MassTransferIdPool(operation, size=1).start()
+        self.assertTrue(operation.calling.wait(5))
+
+        threading.Timer(0.05, operation.block.set).start()
+        cut.close()
+        self.assertEqual(['001'], operation.deleted)
+
+    def test_retry_after_error(self):
+        operation = SLTConfigurationOperationMock(failures=2)
+        cut = MassTransferIdPool(operation, size=1, retryinterval=0.01)
+
+        mt_id, json_data_del_slt_config = cut.lease(timeout=5)
+        self.assertEqual('001', mt_id)
+        self.assertIsNone(cut.error)
+        cut.close(delete_leased=True)
+        self.assertIn('001', operation.deleted)
+
+    def test_timeout(self):
+        operation = SLTConfigurationOperationMock(failures=1000)
+        cut = MassTransferIdPool(operation, size=1, retryinterval=0.01)
+        with self.assertRaises(TimeoutError) as context:
+            cut.lease(timeout=0.1)
+        self.assertIn('already exists', str(context.exception))
+        cut.close()
+
+    def test_maxcreated(self):
+        operation = SLTConfigurationOperationMock()
+        cut = MassTransferIdPool(operation, size=2, maxcreated=2).start()
+        first = cut.lease(timeout=5)
+        second = cut.lease(timeout=5)
+
+        # no replacements are created for the leased configurations
+        self.assertRaises(TimeoutError, cut.lease, 0.05)
+        self.assertEqual(2, len(operation.created))
+
+        cut.release(first[1])
+        cut.release(second[1])
+        with self.assertRaises(RuntimeError) as context:
+            cut.lease(timeout=5)
+        self.assertIn('have been leased', str(context.exception))
+        cut.close()
+        self.assertEqual(['001', '002'], sorted(operation.deleted))
+
+    def test_fixed_mt_id(self):
+        operation = SLTConfigurationOperationMock(mt_ids=['3AV'])
+        cut = MassTransferIdPool(operation, size=2, retryinterval=0.01)
+        with self.assertRaises(TimeoutError) as context:
+            cut.lease(timeout=0.1)
+        self.assertIn('3AV, which is not unique', str(context.exception))
+        cut.close()
+        self.assertEqual([], operation.deleted)
+
+    def test_duplicate_mt_id(self):
+        operation = SLTConfigurationOperationMock(mt_ids=['100', '100'])
+        cut = MassTransferIdPool(operation, size=2, retryinterval=0.01)
+        mt_id, json_data_del_slt_config = cut.lease(timeout=5)
+        self.assertEqual('100', mt_id)
+
+        # the same ID is not handed out to another test
+        self.assertRaises(TimeoutError, cut.lease, 0.1)
+        self.assertIn('not unique', str(cut.error))
+        cut.close()
+        self.assertEqual([], operation.deleted)
+        self.assertEqual(['100'], cut.leased)
+
+    def test_invalid_size(self):
+        self.assertRaises(ValueError, MassTransferIdPool,
+                          SLTConfigurationOperationMock(), 0)
+        self.assertRaises(ValueError, MassTransferIdPool,
+                          SLTConfigurationOperationMock(), 1, maxcreated=0)
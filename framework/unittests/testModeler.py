@@ -7,7 +7,7 @@ from requests.sessions import session
 from framework.infrastructure.Cluster import Cluster, ClusterConnectionData
 from framework.infrastructure.Modeler import Modeler, ModelerReplication, ModelerReplicationJson, ReplicationsModeler
 from framework.infrastructure.replications.Replication import Replication, ReplicationLoadtype, ReplicationSpaceFileCompression, ReplicationSpaceFileDelimiter, ReplicationSpaceFileType, ReplicationSpaceGroupDeltaBy, ReplicationSpaceProperty, ReplicationTaskFilter, ReplicationTaskFilterOperator
-from framework.unittests.doubles.SessionMock import SessionMock
+from framework.unittests.doubles.SessionMock import RoutingSessionMock, SessionMock
 
 
 def getDummyConnectionData():
@@ -63,6 +63,138 @@ class testReplicationsModeler(unittest.TestCase):
         self.assertTrue(cluster.session.lastcalledurl.endswith(
             'files/rms/test_replication.replication?op=remove'))
 
+    def _get_replication_spec(self, name: str) -> Replication:
+        replication = Replication(name)
+        replication.set_sourcespace('S4H_2021', '/CDS')
+        replication.set_targetspace('HANA_CLOUD', '/SYSTEM')
+        replication.create_task('Z_SEPM_I_SALESORDER')
+        return replication
+
+    def test_deploy_replications(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        session.setrouteresponsecontent(
+            '/connections/S4H_2021', 200, '{"id": "S4H_2021", "type": "ABAP", "ccmTypeId": "ABAP"}')
+        session.setrouteresponsecontent(
+            '/connections/HANA_CLOUD', 200, '{"id": "HANA_CLOUD", "type": "HANA_DB", "ccmTypeId": "HANA"}')
+        for name in ['first', 'second']:
+            session.setrouteresponsecontent(
+                f'/{name}.replication?op=write', 200, '')
+        session.setrouteresponsecontent(
+            '/broken.replication?op=write', 500, 'Internal error')
+        for i in range(2):
+            session.setrouteresponsecontent(
+                '/app/rms/api/dt/v1/replicationflows', 202, '{"url": "/api/dt/v1/replicationflows/x/changerequeststatus"}')
+
+        cut = ReplicationsModeler(cluster)
+        specs = [self._get_replication_spec(name)
+                 for name in ['first', 'broken', 'second']]
+        deployments = cut.deploy_replications(specs, max_workers=4)
+
+        self.assertEqual(3, len(deployments))
+        self.assertEqual(['first', 'broken', 'second'], [
+                         deployment.replication.name for deployment in deployments])
+        connectionrequests = [
+            url for url in session.calledurls if '/connections/' in url]
+        self.assertEqual(2, len(connectionrequests))
+
+        first = deployments[0]
+        self.assertIsInstance(first.replication, ModelerReplication)
+        self.assertEqual('ONE_SOURCE_ONE_TARGET', first.replication.version)
+        self.assertEqual('ABAP', first.replication.sourcespace._connectiontype)
+        self.assertEqual(
+            'HANA', first.replication.targetspace._ccmconnectiontype)
+        self.assertIsNotNone(first.replicationflow)
+        self.assertIsNone(first.error)
+        self.assertEqual(['resolve', 'save', 'deploy'],
+                         list(first.latencies.keys()))
+
+        broken = deployments[1]
+        self.assertIsNone(broken.replicationflow)
+        self.assertTrue(broken.error.startswith('Saving failed with status 500'))
+        self.assertNotIn('deploy', broken.latencies)
+        self.assertIn('broken', str(broken))
+
+        # the given replications are not changed
+        self.assertIsNone(specs[0].sourcespace._connectiontype)
+        self.assertIsNot(specs[0].sourcespace, first.replication.sourcespace)
+
+    def test_deploy_replications_with_exception(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        session.setrouteresponsecontent(
+            '/connections/S4H_2021', 200, '{"id": "S4H_2021", "type": "ABAP", "ccmTypeId": "ABAP"}')
+        session.setrouteresponsecontent(
+            '/connections/HANA_CLOUD', 200, '{"id": "HANA_CLOUD", "type": "HANA_DB", "ccmTypeId": "HANA"}')
+        session.setrouteresponsecontent('/first.replication?op=write', 200, '')
+        session.setrouteresponsecontent(
+            '/app/rms/api/dt/v1/replicationflows', 202, '{"url": "/api/dt/v1/replicationflows/x/changerequeststatus"}')
+
+        # the session mock raises for the write of 'crashing', it has no response
+        cut = ReplicationsModeler(cluster)
+        deployments = cut.deploy_replications(
+            [self._get_replication_spec(name) for name in ['first', 'crashing']])
+
+        self.assertIsNotNone(deployments[0].replicationflow)
+        self.assertIsNone(deployments[0].error)
+        self.assertIsNone(deployments[1].replicationflow)
+        self.assertTrue(deployments[1].error.startswith('Saving failed'))
+        self.assertIn('save', deployments[1].latencies)
+
+    def test_deploy_replications_unknown_connection(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        session.setrouteresponsecontent(
+            '/connections/S4H_2021', 200, '{"id": "S4H_2021", "type": "ABAP", "ccmTypeId": "ABAP"}')
+        session.setrouteresponsecontent('/connections/HANA_CLOUD', 404, '')
+        session.setrouteresponsecontent(
+            '/connections/HANA_OTHER', 200, '{"id": "HANA_OTHER", "type": "HANA_DB", "ccmTypeId": "HANA"}')
+        session.setrouteresponsecontent('/second.replication?op=write', 200, '')
+        session.setrouteresponsecontent(
+            '/app/rms/api/dt/v1/replicationflows', 202, '{"url": "/api/dt/v1/replicationflows/x/changerequeststatus"}')
+
+        second = self._get_replication_spec('second')
+        second.set_targetspace('HANA_OTHER', '/SYSTEM')
+        cut = ReplicationsModeler(cluster)
+        deployments = cut.deploy_replications([self._get_replication_spec('first'), second])
+
+        # only the deployment with the unknown connection fails
+        self.assertIsNone(deployments[0].replicationflow)
+        self.assertEqual('No connection with id HANA_CLOUD found!', deployments[0].error)
+        self.assertEqual(['resolve'], list(deployments[0].latencies.keys()))
+        self.assertIsNotNone(deployments[1].replicationflow)
+        self.assertIsNone(deployments[1].error)
+        self.assertFalse(any('first.replication' in url for url in session.calledurls))
+
+    def test_deploy_replications_without_spaces(self):
+        cluster = Cluster(getDummyConnectionData())
+        session = RoutingSessionMock()
+        cluster.session = session
+        session.setrouteresponsecontent(
+            '/connections/S4H_2021', 200, '{"id": "S4H_2021", "type": "ABAP", "ccmTypeId": "ABAP"}')
+        session.setrouteresponsecontent(
+            '/connections/HANA_CLOUD', 200, '{"id": "HANA_CLOUD", "type": "HANA_DB", "ccmTypeId": "HANA"}')
+        session.setrouteresponsecontent('/complete.replication?op=write', 200, '')
+        session.setrouteresponsecontent(
+            '/app/rms/api/dt/v1/replicationflows', 202, '{"url": "/api/dt/v1/replicationflows/x/changerequeststatus"}')
+
+        nosource = Replication('nosource')
+        nosource.set_targetspace('HANA_CLOUD', '/SYSTEM')
+        notarget = Replication('notarget')
+        notarget.set_sourcespace('S4H_2021', '/CDS')
+        cut = ReplicationsModeler(cluster)
+        deployments = cut.deploy_replications(
+            [nosource, notarget, self._get_replication_spec('complete')])
+
+        self.assertEqual('The replication has no source space', deployments[0].error)
+        self.assertEqual('The replication has no target space', deployments[1].error)
+        self.assertEqual({}, deployments[0].latencies)
+        self.assertIsNone(deployments[2].error)
+        self.assertIsNotNone(deployments[2].replicationflow)
+
 
 class testModelerReplication(unittest.TestCase):
 
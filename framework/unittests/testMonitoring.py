@@ -2,9 +2,11 @@ from datetime import datetime
 import unittest
 import json
 
+from framework.infrastructure.AsyncCluster import AsyncCluster
 from framework.infrastructure.Cluster import Cluster, ClusterConnectionData
-from framework.infrastructure.Monitoring import Monitoring, ReplicationMonitor, ReplicationMonitorTaskMetrics, Replicationtaskmonitor, ReplicationsMonitoring, ReplicationtaskmonitorPartition, ReplicationtaskmonitorStatus
+from framework.infrastructure.Monitoring import AsyncMonitoring, AsyncReplicationsMonitoring, Monitoring, ReplicationMonitor, ReplicationMonitorTaskMetrics, Replicationtaskmonitor, ReplicationsMonitoring, ReplicationtaskmonitorPartition, ReplicationtaskmonitorStatus
 
+from framework.unittests.doubles.AsyncSessionMock import AsyncSessionMock
 from framework.unittests.doubles.SessionMock import SessionMock
 
 
@@ -82,6 +84,36 @@ class testReplicationsMonitoring(unittest.TestCase):
             '/app/rms/api/dt/v1/replicationflows/E2ESLTtest008/taskMonitors'))
 
 
+class testAsyncReplicationsMonitoring(unittest.IsolatedAsyncioTestCase):
+
+    async def test_getmonitors(self):
+        cluster = AsyncCluster(getDummyConnectionData())
+        sessionmock = AsyncSessionMock()
+        cluster.session = sessionmock
+
+        cut = AsyncReplicationsMonitoring(AsyncMonitoring(cluster))
+
+        sessionmock.setresponsecontent(
+            200, getReplicationflowmonitorsDummyResponse())
+        monitors = await cut.get_monitors()
+        self.assertTrue(sessionmock.lastcalledurl.endswith(
+            '/app/rms/api/dt/v1/replicationflowMonitors'))
+        self.assertEqual(4, len(monitors))
+        self.assertEqual('PERFORMANCE', monitors[0].name)
+
+        sessionmock.setresponsecontent(
+            200, getReplicationflowmonitorsDummySingleResponse())
+        monitor = await cut.get_monitor('abap-s4hc-to-hc')
+        self.assertEqual('abap-s4hc-to-hc', monitor.name)
+
+        sessionmock.setresponsecontent(
+            200, getReplicationtaskmonitorsDummyResponse())
+        taskmonitors = await cut.get_taskmonitors('E2ESLTtest008')
+        self.assertEqual(1, len(taskmonitors))
+        self.assertTrue(sessionmock.lastcalledurl.endswith(
+            '/app/rms/api/dt/v1/replicationflows/E2ESLTtest008/taskMonitors'))
+
+
 class testReplicationMonitor(unittest.TestCase):
 
     def test_skeleton(self):
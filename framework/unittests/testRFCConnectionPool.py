@@ -0,0 +1,205 @@
+import json
+import threading
+import time
+import unittest
+
+from framework.infrastructure.utils.netweaver.RFCConnectionPool import RFCConnectionPool
+from framework.infrastructure.utils.netweaver.SLTConfigurationOperation import SLTConfigurationOperation
+from framework.unittests.doubles.AbapMock import AbapConnectionMock
+from framework.validation.abap.AbapClient import AbapClient, AbapConnectionData
+from framework.validation.abap.CitAbapClient import CitAbapClient
+
+SYSTEM_A = {'user': 'TESTER', 'passwd': 'secret',
+            'ashost': 'a.sap.corp', 'sysnr': '00', 'client': '800'}
+SYSTEM_B = {'user': 'TESTER', 'passwd': 'secret',
+            'ashost': 'b.sap.corp', 'sysnr': '00', 'client': '800'}
+
+
+class testRFCConnectionPool(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.connections = []
+
+    def connect(self, parameters):
+        connection = AbapConnectionMock()
+        connection.parameters = parameters
+        self.connections.append(connection)
+        return connection
+
+    def test_basics(self):
+        cut = RFCConnectionPool(maxsize=2, connect=self.connect)
+
+        with cut.connection(SYSTEM_A) as connection:
+            self.assertEqual(SYSTEM_A, connection.parameters)
+        with cut.connection(SYSTEM_A) as connection:
+            self.assertIs(self.connections[0], connection)
+        with cut.connection(SYSTEM_B) as connection:
+            self.assertEqual(SYSTEM_B, connection.parameters)
+
+        statistics = cut.statistics()
+        self.assertEqual(2, statistics.size)
+        self.assertEqual(2, statistics.idle)
+        self.assertEqual(3, statistics.checkouts)
+        self.assertEqual(2, statistics.created)
+        self.assertIn('Reconnects:\t0', str(statistics))
+
+        cut.close()
+        self.assertEqual(0, cut.statistics().size)
+        self.assertFalse(self.connections[0].alive)
+
+    def test_key(self):
+        other_password = dict(SYSTEM_A)
+        other_password['passwd'] = 'other'
+        self.assertEqual(RFCConnectionPool.key_for(SYSTEM_A),
+                         RFCConnectionPool.key_for(other_password))
+        self.assertNotEqual(RFCConnectionPool.key_for(SYSTEM_A),
+                            RFCConnectionPool.key_for(SYSTEM_B))
+        self.assertNotIn('secret', str(RFCConnectionPool.key_for(SYSTEM_A)))
+
+    def test_maxsize_per_key(self):
+        cut = RFCConnectionPool(maxsize=1, timeout=0.05, connect=self.connect)
+        cut.set_maxsize(SYSTEM_B, 2)
+        self.assertEqual(1, cut.get_maxsize(SYSTEM_A))
+        self.assertEqual(2, cut.get_maxsize(SYSTEM_B))
+
+        first = cut.acquire(SYSTEM_A)
+        self.assertRaises(TimeoutError, cut.acquire, SYSTEM_A)
+
+        second = cut.acquire(SYSTEM_B)
+        third = cut.acquire(SYSTEM_B)
+        self.assertRaises(TimeoutError, cut.acquire, SYSTEM_B)
+        for connection in [first, second, third]:
+            cut.release(connection)
+
+        self.assertRaises(ValueError, cut.set_maxsize, SYSTEM_A, 0)
+        self.assertRaises(ValueError, RFCConnectionPool, 0)
+
+    def test_wait_for_release(self):
+        cut = RFCConnectionPool(maxsize=1, timeout=5, connect=self.connect)
+        connection = cut.acquire(SYSTEM_A)
+
+        def release():
+            time.sleep(0.05)
+            cut.release(connection)
+        thread = threading.Thread(target=release)
+        thread.start()
+
+        self.assertIs(connection, cut.acquire(SYSTEM_A))
+        thread.join()
+        self.assertGreater(cut.statistics().maxwaittime, 0.0)
+        self.assertGreater(cut.statistics().averagewaittime, 0.0)
+
+    def test_reconnect_on_broken_connection(self):
+        cut = RFCConnectionPool(maxsize=1, pinginterval=0,
+                                connect=self.connect)
+
+        with cut.connection(SYSTEM_A) as connection:
+            pass
+        connection.alive = False
+
+        with cut.connection(SYSTEM_A) as connection:
+            self.assertIs(self.connections[1], connection)
+        self.assertEqual(1, cut.statistics().reconnects)
+        self.assertEqual(1, cut.statistics().size)
+
+    def test_no_ping_within_interval(self):
+        cut = RFCConnectionPool(pinginterval=60, connect=self.connect)
+
+        with cut.connection(SYSTEM_A) as connection:
+            pass
+        connection.alive = False
+
+        with cut.connection(SYSTEM_A) as connection:
+            self.assertIs(self.connections[0], connection)
+
+    def test_discard_after_failure(self):
+        cut = RFCConnectionPool(maxsize=1, connect=self.connect)
+
+        with self.assertRaises(RuntimeError):
+            with cut.connection(SYSTEM_A) as connection:
+                connection.alive = False
+                raise RuntimeError('Communication failure')
+        self.assertEqual(0, cut.statistics().size)
+        self.assertEqual(1, cut.statistics().reconnects)
+
+        with self.assertRaises(ValueError):
+            with cut.connection(SYSTEM_A) as connection:
+                raise ValueError('Wrong parameter')
+        self.assertEqual(1, cut.statistics().idle)
+
+    def test_failing_connect(self):
+        def connect(parameters):
+            raise RuntimeError('Logon failed')
+        cut = RFCConnectionPool(maxsize=1, connect=connect)
+        self.assertRaises(RuntimeError, cut.acquire, SYSTEM_A)
+        self.assertEqual(0, cut.statistics().size)
+
+    def test_default(self):
+        self.assertIs(RFCConnectionPool.get_default(),
+                      RFCConnectionPool.get_default())
+
+
+class testPooledClients(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.connections = []
+
+    def connect(self, parameters):
+        connection = AbapConnectionMock()
+        connection.parameters = parameters
+        connection.set_rfc_result_for('RFC_FUNCTION_SEARCH', {})
+        connection.set_rfc_result_for('DHE2E_CIT_RFC_DATA_ACCESS', lambda **parameters: {
+            'EV_RC': 0, 'EV_COUNT': '7', 'EV_TABNAME': 'DHE2E_' + parameters['IV_TABLE_ID'], 'EV_CDSNAME': ''})
+        connection.set_rfc_result_for('LTE2E_CREATE_SLT_CONFIG', {
+            'EV_RESULT': '{ "massTransferId":"023", "success":"Y", "error":"None"}'})
+        connection.set_rfc_result_for('LTE2E_DELETE_SLT_CONFIG', {
+            'EV_RESULT': '{"SUCCESS":"Y","ERROR":"None"}'})
+        self.connections.append(connection)
+        return connection
+
+    def connection_data(self) -> AbapConnectionData:
+        connection_data = AbapConnectionData('SAL')
+        connection_data.user = 'TESTER'
+        connection_data.password = 'secret'
+        connection_data.ashost = 'a.sap.corp'
+        connection_data.sysnr = 0
+        connection_data.client = 800
+        return connection_data
+
+    def test_abapclient(self):
+        pool = RFCConnectionPool(connect=self.connect)
+        cut = AbapClient.connect_pooled(self.connection_data(), pool)
+        self.assertIs(pool, cut.pool)
+
+        cut.call_rfc('RFC_FUNCTION_SEARCH', FUNCNAME='X')
+        cut.call_rfc('RFC_FUNCTION_SEARCH', FUNCNAME='Y')
+        self.assertEqual(1, len(self.connections))
+        self.assertEqual(2, len(self.connections[0].calls))
+        self.assertEqual({'name': 'SAL', 'user': 'TESTER', 'passwd': 'secret', 'ashost': 'a.sap.corp',
+                          'sysnr': '00', 'client': '800'}, self.connections[0].parameters)
+
+    def test_citabapclient(self):
+        pool = RFCConnectionPool(maxsize=3, connect=self.connect)
+        cut = CitAbapClient.connect_pooled(self.connection_data(), pool)
+        self.assertEqual('DHE2E', cut._cit_prefix)
+
+        results = list(cut.get_rowcounts(
+            ['WS_LS', 'WF_LS', 'WN_LS', 'WX_LS', 'WA_LS'], max_workers=5))
+        self.assertEqual([7] * 5, [result.rowcount for result in results])
+        self.assertLessEqual(len(self.connections), 3)
+        self.assertEqual('DHE2E_WX_LS', cut.get_tablename('WX_LS'))
+
+    def test_sltconfigurationoperation(self):
+        pool = RFCConnectionPool(connect=self.connect)
+        cut = SLTConfigurationOperation(pool, SYSTEM_A)
+
+        mt_id, json_data_del_slt_config = cut.get_mass_transfer_id()
+        self.assertEqual('023', mt_id)
+        self.assertEqual({'massTransferId': '023'}, json_data_del_slt_config)
+        cut.del_mass_transfer_id(json_data_del_slt_config)
+
+        self.assertEqual(1, len(self.connections))
+        functionmodule, parameters = self.connections[0].last_rfc_call
+        self.assertEqual('LTE2E_DELETE_SLT_CONFIG', functionmodule)
+        self.assertEqual({'massTransferId': '023'},
+                         json.loads(parameters['IV_JSON_STR']))
@@ -0,0 +1,300 @@
+import datetime
+import hashlib
+import unittest
+from decimal import Decimal
+
+from framework.unittests.doubles.AbapMock import AbapConnectionMock
+from framework.unittests.doubles.HanaMock import HanaConnectionMock
+from framework.validation.abap.CitAbapClient import CitAbapClient
+from framework.validation.hana.HanaClient import HanaClient
+from framework.validation.reconciliation.Reconciliation import (CitAbapReconciliationSide, HanaReconciliationSide,
+                                                                KeyRange, PartitionDigest, Reconciler,
+                                                                ReconciliationSide, RecordDifferenceKind,
+                                                                compute_digest, normalize_abap)
+
+
+class ListSide(ReconciliationSide):
+    """A side whose records are held in memory. The partition column is the
+    first key column."""
+
+    def __init__(self, rows: list[tuple], provides_boundaries: bool = True) -> None:
+        super().__init__('ID', ['ID'], ['ID', 'VALUE'])
+        self._rows = rows
+        self._provides_boundaries = provides_boundaries
+        self.digestcalls = []
+
+    def _in(self, keyrange: KeyRange) -> list[tuple]:
+        return [row for row in self._rows
+                if (keyrange.lower is None or row[0] >= keyrange.lower)
+                and (keyrange.upper is None or row[0] < keyrange.upper)]
+
+    def rowcount(self) -> int:
+        return len(self._rows)
+
+    def digests(self, keyranges: list[KeyRange]) -> list[PartitionDigest]:
+        self.digestcalls.append(keyranges)
+        return [compute_digest([self._to_record(row) for row in self._in(keyrange)]) for keyrange in keyranges]
+
+    def records(self, keyrange: KeyRange) -> dict[tuple, tuple]:
+        return dict(self._to_record(row) for row in self._in(keyrange))
+
+    def boundaries(self, keyrange: KeyRange, partitions: int) -> list:
+        if not self._provides_boundaries:
+            return None
+        values = sorted(row[0] for row in self._in(keyrange))
+        size = max(1, len(values) // partitions)
+        return sorted(set(values[::size]))
+
+
+def make_rows(count: int) -> list[tuple]:
+    return [(f'{i:06d}', f'value {i}') for i in range(count)]
+
+
+def make_int_rows(count: int) -> list[tuple]:
+    return [(i, f'value {i}') for i in range(count)]
+
+
+def make_mixed_rows(count: int) -> list[tuple]:
+    """String keys of different widths, so '10' sorts before '9'."""
+    return [(str(i), f'value {i}') for i in range(count)]
+
+
+class testReconciler(unittest.TestCase):
+
+    def test_consistent(self):
+        source = ListSide(make_rows(1000))
+        target = ListSide(make_rows(1000))
+        report = Reconciler(source, target, partitions=8,
+                            leafsize=10).reconcile()
+
+        self.assertTrue(report.consistent)
+        self.assertEqual(1000, report.sourcecount)
+        self.assertEqual(0, report.mismatchingpartitions)
+        self.assertEqual(0, report.comparedleaves)
+        self.assertEqual(1, len(target.digestcalls))
+
+    def test_differences(self):
+        sourcerows = make_rows(1000)
+        targetrows = make_rows(1000)
+        del targetrows[500]
+        targetrows[10] = ('000010', 'changed')
+        targetrows.append(('999999', 'only in target'))
+
+        source = ListSide(sourcerows)
+        target = ListSide(targetrows)
+        report = Reconciler(source, target, partitions=8,
+                            leafsize=10).reconcile()
+
+        self.assertFalse(report.consistent)
+        self.assertEqual(3, len(report.differences))
+        changed, missingintarget, missinginsource = report.differences
+        self.assertEqual(RecordDifferenceKind.CHANGED, changed.kind)
+        self.assertEqual(('000010',), changed.key)
+        self.assertEqual(('000010', 'value 10'), changed.sourcevalues)
+        self.assertEqual(('000010', 'changed'), changed.targetvalues)
+        self.assertEqual(RecordDifferenceKind.MISSING_IN_TARGET,
+                         missingintarget.kind)
+        self.assertEqual(('000500',), missingintarget.key)
+        self.assertEqual(RecordDifferenceKind.MISSING_IN_SOURCE,
+                         missinginsource.kind)
+        self.assertEqual(('999999',), missinginsource.key)
+
+        # only the mismatching partitions are drilled down
+        self.assertGreater(len(target.digestcalls), 1)
+        for keyranges in target.digestcalls[1:]:
+            self.assertLessEqual(len(keyranges), 3 * 9)
+        self.assertLessEqual(report.comparedleaves, 3)
+        self.assertIn('CHANGED', str(report))
+
+    def test_integer_keys(self):
+        sourcerows = make_int_rows(1000)
+        # the target returns its rows in a different order
+        targetrows = list(reversed(make_int_rows(1000)))
+        report = Reconciler(ListSide(sourcerows), ListSide(targetrows), partitions=8,
+                            leafsize=10).reconcile()
+        self.assertTrue(report.consistent)
+        self.assertEqual(0, report.mismatchingpartitions)
+
+        targetrows[0] = (999, 'changed')
+        report = Reconciler(ListSide(sourcerows), ListSide(targetrows), partitions=8,
+                            leafsize=10).reconcile()
+        self.assertEqual(1, len(report.differences))
+        self.assertEqual(('999',), report.differences[0].key)
+        self.assertEqual(1, report.comparedleaves)
+
+    def test_mixed_width_keys(self):
+        sourcerows = make_mixed_rows(200)
+        targetrows = sorted(make_mixed_rows(200), key=lambda row: int(row[0]))
+        targetrows[9] = ('9', 'changed')
+        report = Reconciler(ListSide(sourcerows), ListSide(targetrows), partitions=4,
+                            leafsize=10).reconcile()
+
+        self.assertEqual(1, len(report.differences))
+        self.assertEqual(('9',), report.differences[0].key)
+        self.assertEqual(1, report.comparedleaves)
+
+    def test_empty_target(self):
+        report = Reconciler(ListSide(make_rows(100)), ListSide([]), partitions=4,
+                            leafsize=10).reconcile()
+
+        # the ranges are split on the boundaries of the source
+        self.assertEqual(100, len(report.differences))
+        self.assertGreater(report.comparedleaves, 1)
+
+    def test_without_boundaries(self):
+        sourcerows = make_rows(10)
+        targetrows = make_rows(10)
+        targetrows[7] = ('000007', 'changed')
+        report = Reconciler(ListSide(sourcerows, False), ListSide(
+            targetrows, False), partitions=8, leafsize=10).reconcile()
+
+        self.assertEqual(1, len(report.differences))
+        self.assertEqual(1, report.comparedleaves)
+
+        # a table that exceeds the leaf size is not compared as a whole
+        with self.assertRaises(RuntimeError):
+            Reconciler(ListSide(make_rows(50), False), ListSide(
+                make_rows(50), False), partitions=8, leafsize=10).reconcile()
+
+    def test_invalid_partitions(self):
+        with self.assertRaises(ValueError):
+            Reconciler(ListSide([]), ListSide([]), partitions=1)
+
+
+class testReconciliationSides(unittest.TestCase):
+
+    def test_compute_digest(self):
+        self.assertEqual(PartitionDigest(0, None), compute_digest([]))
+        first = compute_digest([(('9',), ('9', 'a')), (('10',), ('10', 'b'))])
+        second = compute_digest([(('10',), ('10', 'b')), (('9',), ('9', 'a'))])
+        self.assertEqual(first, second)
+        self.assertEqual(2, first.rowcount)
+        self.assertNotEqual(first, compute_digest(
+            [(('9',), ('9', 'a')), (('10',), ('10', 'c'))]))
+
+        # the same checksum as the sums of the row hash parts of HANA
+        rowhashes = [hashlib.md5(value.encode('utf-8')).hexdigest().upper() for value in ['9|a', '10|b']]
+        sums = [sum(int(rowhash[start - 1:start - 1 + length], 16) for rowhash in rowhashes)
+                for start, length in HanaClient.ROWHASH_PARTS]
+        self.assertEqual(HanaClient.format_checksum(sums), first.checksum)
+
+    def test_hana_side(self):
+        hanaclient = HanaClient()
+        hanamock = HanaConnectionMock()
+        hanaclient._connection = hanamock
+        cut = HanaReconciliationSide(
+            hanaclient, 'CIT_TEST', 'TABLE', 'ID', ['ID'], ['ID', 'VALUE'])
+
+        hanamock.set_sql_result([(1, 3, 10, 11)])
+        digests = cut.digests([KeyRange(None, 10), KeyRange(10, None)])
+        self.assertEqual(
+            [PartitionDigest(0, None), PartitionDigest(3, 'a-b')], digests)
+        self.assertEqual([10, 10], hanamock.last_parameters)
+        self.assertIn('CASE WHEN ("ID" < ?) THEN 0 WHEN ("ID" >= ?) THEN 1 END',
+                      hanamock.last_sql)
+
+        hanamock.set_sql_result([(1, ' a '), (2, None)])
+        records = cut.records(KeyRange(1, 3))
+        self.assertEqual({('1',): ('1', 'a'), ('2',): ('2', '')}, records)
+        self.assertEqual(
+            'SELECT "ID", "VALUE" FROM "CIT_TEST"."TABLE" WHERE ("ID" >= ? AND "ID" < ?)', hanamock.last_sql)
+
+        hanamock.set_sql_result([(1,), (1,), (5,)])
+        self.assertEqual([1, 5], cut.boundaries(KeyRange(), 3))
+        self.assertEqual([], hanamock.last_parameters)
+
+    @staticmethod
+    def _make_cit_abap_side(rows: dict[str, list[str]], fieldtypes: list[tuple], **kwargs):
+        """Creates a side on a mock whose RFC_READ_TABLE returns the rows of 
+        the OPTIONS text page by page."""
+
+        citabapclient = CitAbapClient()
+        abapmock = AbapConnectionMock()
+        citabapclient._connection = abapmock
+        abapmock.set_rfc_result_for('DHE2E_CIT_RFC_DATA_ACCESS', {
+            'EV_RC': 0, 'EV_COUNT': '3', 'EV_TABNAME': 'DHE2E_WS_LS', 'EV_CDSNAME': ''})
+        abapmock.set_rfc_result_for('DDIF_FIELDINFO_GET', {'DFIES_TAB': [
+            {'FIELDNAME': name, 'INTTYPE': inttype, 'LENG': f'{length:06d}'} for name, inttype, length in fieldtypes]})
+
+        def read_table(OPTIONS, ROWCOUNT, ROWSKIPS, **parameters):
+            selected = rows[''.join(option['TEXT'] for option in OPTIONS)][ROWSKIPS:]
+            return {'DATA': [{'WA': row} for row in (selected[:ROWCOUNT] if ROWCOUNT else selected)]}
+        abapmock.set_rfc_result_for('RFC_READ_TABLE', read_table)
+        return CitAbapReconciliationSide(citabapclient, 'WS_LS', **kwargs), abapmock
+
+    def test_cit_abap_side(self):
+        cut, abapmock = self._make_cit_abap_side(
+            {"RECID >= '0001' AND RECID < '00''2'": ['0002|b   ', '0001|a   '],
+             '': ['0002|b   ', '0001|a   ']},
+            [('RECID', 'C', 4), ('VALUE', 'C', 10)],
+            partition_column='RECID', key_columns=['RECID'], columns=['RECID', 'VALUE'])
+        self.assertEqual(3, cut.rowcount())
+
+        digests = cut.digests([KeyRange('0001', "00'2")])
+        self.assertEqual([compute_digest(
+            [(('0001',), ('0001', 'a')), (('0002',), ('0002', 'b'))])], digests)
+        functionmodule, parameters = abapmock.last_rfc_call
+        self.assertEqual('RFC_READ_TABLE', functionmodule)
+        self.assertEqual('DHE2E_WS_LS', parameters['QUERY_TABLE'])
+        self.assertEqual([{'FIELDNAME': 'RECID'}, {
+                         'FIELDNAME': 'VALUE'}], parameters['FIELDS'])
+
+        self.assertEqual({('0001',): ('0001', 'a'), ('0002',): (
+            '0002', 'b')}, cut.records(KeyRange()))
+        self.assertEqual([], abapmock.last_rfc_call[1]['OPTIONS'])
+        # the count and the table name are read with one call
+        self.assertEqual(1, len(
+            [call for call in abapmock.calls if call[0] == 'DHE2E_CIT_RFC_DATA_ACCESS']))
+
+    def test_cit_abap_side_streaming(self):
+        cut, abapmock = self._make_cit_abap_side(
+            {'': ['10|b|10', '9|a|9', '100|c|100'], 'SEQ < 10': ['9|a|9'], 'SEQ >= 100': ['100|c|100']},
+            [('RECID', 'C', 3), ('VALUE', 'C', 10), ('SEQ', 'I', 11)],
+            partition_column='SEQ', key_columns=['RECID'], columns=['RECID', 'VALUE'], pagesize=2)
+
+        # contiguous ranges are read with one query page by page. The bounds
+        # of HANA are integers, '9' is below 10 although it sorts after '10'.
+        digests = cut.digests([KeyRange(None, 10), KeyRange(10, 100), KeyRange(100, None)])
+        self.assertEqual([1, 1, 1], [digest.rowcount for digest in digests])
+        reads = [parameters for functionmodule, parameters in abapmock.calls if functionmodule == 'RFC_READ_TABLE']
+        self.assertEqual([(2, 0), (2, 2)], [(read['ROWCOUNT'], read['ROWSKIPS']) for read in reads])
+        self.assertEqual([[]], list({str(read['OPTIONS']): read['OPTIONS'] for read in reads}.values()))
+        # the partition column is read in addition to the compared columns
+        self.assertEqual([{'FIELDNAME': 'RECID'}, {'FIELDNAME': 'VALUE'}, {'FIELDNAME': 'SEQ'}],
+                         reads[0]['FIELDS'])
+
+        # only the mismatching ranges are read again, integer bounds are not
+        # quoted
+        abapmock.calls.clear()
+        digests = cut.digests([KeyRange(None, 10), KeyRange(100, None)])
+        self.assertEqual([1, 1], [digest.rowcount for digest in digests])
+        self.assertEqual({('9',): ('9', 'a')}, cut.records(KeyRange(None, 10)))
+        self.assertEqual([[{'TEXT': 'SEQ < 10'}], [{'TEXT': 'SEQ >= 100'}], [{'TEXT': 'SEQ < 10'}]],
+                         [parameters['OPTIONS'] for functionmodule, parameters in abapmock.calls
+                          if functionmodule == 'RFC_READ_TABLE'])
+
+    def test_cit_abap_side_types(self):
+        cut, abapmock = self._make_cit_abap_side(
+            {"BUDAT >= '20240101'": ['1|20240131|12.50-|134500|0042']},
+            [('RECID', 'C', 3), ('BUDAT', 'D', 8), ('AMOUNT', 'P', 16), ('UZEIT', 'T', 6), ('ITEM', 'N', 4)],
+            partition_column='BUDAT', key_columns=['RECID'], columns=['BUDAT', 'AMOUNT', 'UZEIT', 'ITEM'])
+
+        # the values are compared in the representation of HANA
+        self.assertEqual({('1',): ('2024-01-31', '-12.50', '13:45:00', '0042')},
+                         cut.records(KeyRange(datetime.date(2024, 1, 1))))
+
+        self.assertEqual('', normalize_abap('00000000', 'D'))
+        self.assertEqual('-42', normalize_abap('  42-', 'I'))
+        self.assertEqual("'0010'", CitAbapReconciliationSide._literal(10, 'N', 4))
+        self.assertEqual('10', CitAbapReconciliationSide._literal(10, 'P', 16))
+        self.assertEqual("'-12.5'", CitAbapReconciliationSide._literal(Decimal('-12.5'), 'P', 16))
+        with self.assertRaises(ValueError):
+            CitAbapReconciliationSide._literal('a', 'I', 11)
+
+        # float and raw fields can't be compared
+        cut, abapmock = self._make_cit_abap_side(
+            {}, [('RECID', 'C', 3), ('RATE', 'F', 16)],
+            partition_column='RECID', key_columns=['RECID'], columns=['RATE'])
+        with self.assertRaises(ValueError):
+            cut.records(KeyRange())
+        self.assertEqual([], [call for call in abapmock.calls if call[0] == 'RFC_READ_TABLE'])
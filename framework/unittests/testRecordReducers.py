@@ -0,0 +1,69 @@
+import unittest
+
+from framework.validation.datalake.RecordReducers import (CombinedReducer, FunctionReducer, KeySet, RecordChecksum,
+                                                          RecordCount)
+
+
+class testRecordReducers(unittest.TestCase):
+
+    def test_recordcount(self):
+        cut = RecordCount()
+        partial = cut.spawn()
+        cut.add({'ID': 1})
+        partial.add({'ID': 2})
+        partial.add({'ID': 3})
+        cut.merge(partial)
+        self.assertEqual(3, cut.result)
+
+    def test_keyset(self):
+        cut = KeySet(['ID', 'POS'])
+        partial = cut.spawn()
+        cut.add({'ID': 1, 'POS': 1, 'VALUE': 'a'})
+        cut.add({'ID': 1, 'POS': 1, 'VALUE': 'b'})
+        partial.add({'ID': 1, 'POS': 1, 'VALUE': 'c'})
+        partial.add({'ID': 1, 'POS': 2, 'VALUE': 'd'})
+        cut.merge(partial)
+        self.assertEqual({('1', '1'), ('1', '2')}, cut.result)
+        self.assertEqual(2, cut.duplicates)
+
+        cut = KeySet()
+        cut.add(['1', 'a'])
+        self.assertEqual({('1', 'a')}, cut.result)
+
+    def test_recordchecksum(self):
+        records = [{'ID': i, 'VALUE': None if i == 3 else f'v{i}'}
+                   for i in range(10)]
+        cut = RecordChecksum(['ID', 'VALUE'])
+        for record in records:
+            cut.add(record)
+
+        other = RecordChecksum(['ID', 'VALUE'])
+        partial = other.spawn()
+        for record in reversed(records[5:]):
+            other.add(record)
+        for record in records[:5]:
+            partial.add(record)
+        other.merge(partial)
+        self.assertEqual(cut.result, other.result)
+        self.assertEqual(32, len(cut.result))
+
+        changed = RecordChecksum(['ID', 'VALUE'])
+        for record in records[1:]:
+            changed.add(record)
+        self.assertNotEqual(cut.result, changed.result)
+
+    def test_combinedreducer(self):
+        cut = CombinedReducer(count=RecordCount(), keys=KeySet(['ID']))
+        partial = cut.spawn()
+        partial.add({'ID': 1})
+        cut.merge(partial)
+        self.assertEqual({'count': 1, 'keys': {('1',)}}, cut.result)
+        self.assertEqual(1, cut['count'].result)
+
+    def test_functionreducer(self):
+        records = []
+        cut = FunctionReducer(records.append)
+        cut.spawn().add({'ID': 1})
+        cut.add({'ID': 2})
+        self.assertEqual([{'ID': 1}, {'ID': 2}], records)
+        self.assertIsNone(cut.result)
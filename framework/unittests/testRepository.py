@@ -1,7 +1,9 @@
 import unittest
 
+from framework.infrastructure.AsyncCluster import AsyncCluster
 from framework.infrastructure.Cluster import Cluster, ClusterConnectionData
-from framework.infrastructure.Repository import Repositoy
+from framework.infrastructure.Repository import AsyncRepositoy, Repositoy
+from framework.unittests.doubles.AsyncSessionMock import AsyncSessionMock
 from framework.unittests.doubles.SessionMock import SessionMock
 
 
@@ -47,5 +49,34 @@ class testRepository(unittest.TestCase):
         self.assertFalse(exists)
 
 
+class testAsyncRepository(unittest.IsolatedAsyncioTestCase):
+
+    async def test_skeleton(self):
+        cluster = AsyncCluster(getDummyConnectionData())
+        sessionmock = AsyncSessionMock()
+        cluster.session = sessionmock
+
+        cut = AsyncRepositoy(cluster)
+
+        sessionmock.setresponse(200)
+        await cut.write('user', 'files/rms/a.replication', 'filecontent')
+        self.assertEqual(
+            'https://cluster/repository/v2/files/user/files/rms/a.replication?op=write', sessionmock.lastcalledurl)
+        self.assertEqual('filecontent', sessionmock.posteddata)
+
+        sessionmock.setresponsecontent(200, 'filecontent')
+        response = await cut.read('user', 'files/rms/a.replication')
+        self.assertEqual('filecontent', response.text)
+
+        sessionmock.setresponse(200)
+        await cut.remove('user', 'files/rms/a.replication')
+        self.assertEqual('DELETE', sessionmock.lastmethod)
+
+        sessionmock.setresponse(200)
+        self.assertTrue(await cut.exists('user', 'files/rms/a.replication'))
+        sessionmock.setresponse(404)
+        self.assertFalse(await cut.exists('user', 'files/rms/a.replication'))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,10 +1,12 @@
 import unittest
 
+from framework.infrastructure.AsyncCluster import AsyncCluster
 from framework.infrastructure.Cluster import Cluster, ClusterConnectionData
 from framework.infrastructure.Modeler import ModelerReplicationJson
-from framework.infrastructure.Rms import Replicationflow, ChangerequeststatusStatus, Rms
+from framework.infrastructure.Rms import AsyncReplicationflow, AsyncRms, ChangerequeststatusTimeoutError, PollingPolicy, Replicationflow, ReplicationflowGroup, ChangerequeststatusStatus, Rms
 from framework.infrastructure.replications.Replication import Replication
-from framework.unittests.doubles.SessionMock import SessionMock
+from framework.unittests.doubles.AsyncSessionMock import AsyncSessionMock
+from framework.unittests.doubles.SessionMock import RoutingSessionMock, SessionMock
 
 
 def getDummyConnectionData():
@@ -155,7 +157,7 @@ class testReplicationflow(unittest.TestCase):
 
         # only for testing! should not be done in 'real' code!
         cut._changerequeststatusurl = '/api/dt/v1/replicationflows/E2Etest008/changerequeststatus'
-        cut._waittime = 0
+        cut.set_pollingpolicy(PollingPolicy(0, jitter=0))
 
         sessionmock.setresponsecontent(200, '{"status": "PROCESSING"}')
         sessionmock.setresponsecontent(200, '{"status": "PROCESSING"}')
@@ -187,7 +189,7 @@ class testReplicationflow(unittest.TestCase):
 
         # only for testing! should not be done in 'real' code!
         cut._changerequeststatusurl = '/api/dt/v1/replicationflows/E2Etest008/changerequeststatus'
-        cut._waittime = 0
+        cut.set_pollingpolicy(PollingPolicy(0, jitter=0))
 
         sessionmock.setresponsecontent(200, '{"status": "PROCESSING"}')
         sessionmock.setresponsecontent(200, '{"status": "VALIDATING"}')
@@ -203,6 +205,208 @@ class testReplicationflow(unittest.TestCase):
         changerequeststatus = cut.waitwhilebusy()
         self.assertEqual(ChangerequeststatusStatus.ERROR,
                          changerequeststatus.getstatus())
+        self.assertEqual([3, 3], cut.pollcounts)
+
+    def test_waitwhile_deadline(self):
+        cluster = Cluster(getDummyConnectionData())
+        sessionmock = SessionMock()
+        cluster.session = sessionmock
+
+        rms = Rms(cluster)
+
+        cut = Replicationflow('E2Etest008', rms)
+
+        # only for testing! should not be done in 'real' code!
+        cut._changerequeststatusurl = '/api/dt/v1/replicationflows/E2Etest008/changerequeststatus'
+        cut.set_pollingpolicy(PollingPolicy(0.01, jitter=0, deadline=0.02))
+
+        for i in range(10):
+            sessionmock.setresponsecontent(200, '{"status": "PROCESSING"}')
+        with self.assertRaises(ChangerequeststatusTimeoutError) as context:
+            cut.waitwhilebusy()
+        self.assertEqual(ChangerequeststatusStatus.PROCESSING,
+                         context.exception.changerequeststatus.getstatus())
+        self.assertGreater(context.exception.polls, 1)
+        self.assertEqual([context.exception.polls], cut.pollcounts)
+
+
+def getDummyReplicationflows(rms: Rms, names: list[str]) -> list[Replicationflow]:
+    replicationflows = []
+    for name in names:
+        replicationflow = Replicationflow(name, rms)
+        # only for testing! should not be done in 'real' code!
+        replicationflow._changerequeststatusurl = f'/api/dt/v1/replicationflows/{name}/changerequeststatus'
+        replicationflow.set_pollingpolicy(PollingPolicy(0, jitter=0))
+        replicationflows.append(replicationflow)
+    return replicationflows
+
+
+class testReplicationflowGroup(unittest.TestCase):
+
+    def test_as_completed(self):
+        cluster = Cluster(getDummyConnectionData())
+        sessionmock = RoutingSessionMock()
+        cluster.session = sessionmock
+        replicationflows = getDummyReplicationflows(
+            Rms(cluster), ['slow', 'fast', 'medium'])
+
+        for status in ['PROCESSING', 'PROCESSING', 'VALIDATING', 'COMPLETED']:
+            sessionmock.setrouteresponsecontent(
+                '/slow/changerequeststatus', 200, f'{{"status": "{status}"}}')
+        sessionmock.setrouteresponsecontent(
+            '/fast/changerequeststatus', 200, '{"status": "ERROR"}')
+        for status in ['PROCESSING', 'COMPLETED']:
+            sessionmock.setrouteresponsecontent(
+                '/medium/changerequeststatus', 200, f'{{"status": "{status}"}}')
+
+        cut = ReplicationflowGroup(replicationflows, maxrate=None)
+        completed = [(replicationflow._name, changerequeststatus.getstatus())
+                     for replicationflow, changerequeststatus in cut.as_completed_while_busy()]
+        self.assertEqual([('fast', ChangerequeststatusStatus.ERROR),
+                          ('medium', ChangerequeststatusStatus.COMPLETED),
+                          ('slow', ChangerequeststatusStatus.COMPLETED)], completed)
+        self.assertEqual(7, len(sessionmock.calledurls))
+        self.assertEqual([4], replicationflows[0].pollcounts)
+        self.assertEqual([1], replicationflows[1].pollcounts)
+        self.assertEqual([2], replicationflows[2].pollcounts)
+
+    def test_wait_all(self):
+        cluster = Cluster(getDummyConnectionData())
+        sessionmock = RoutingSessionMock()
+        cluster.session = sessionmock
+        rms = Rms(cluster)
+        replicationflows = getDummyReplicationflows(rms, ['first', 'second'])
+        replicationflows.append(Replicationflow('without_request', rms))
+
+        sessionmock.setrouteresponsecontent(
+            '/first/changerequeststatus', 200, '{"status": "PROCESSING"}')
+        sessionmock.setrouteresponsecontent(
+            '/first/changerequeststatus', 200, '{"status": "COMPLETED"}')
+        sessionmock.setrouteresponsecontent(
+            '/second/changerequeststatus', 200, '{"status": "ERROR"}')
+
+        changerequeststatus = rms.wait_all(replicationflows, maxrate=1000)
+        self.assertEqual(3, len(changerequeststatus))
+        self.assertEqual(ChangerequeststatusStatus.COMPLETED,
+                         changerequeststatus[0].getstatus())
+        self.assertEqual(ChangerequeststatusStatus.ERROR,
+                         changerequeststatus[1].getstatus())
+        self.assertIsNone(changerequeststatus[2])
+
+    def test_deadline(self):
+        cluster = Cluster(getDummyConnectionData())
+        sessionmock = RoutingSessionMock()
+        cluster.session = sessionmock
+        replicationflows = getDummyReplicationflows(Rms(cluster), ['stuck'])
+        replicationflows[0].set_pollingpolicy(
+            PollingPolicy(0.01, jitter=0, deadline=0.02))
+        for i in range(10):
+            sessionmock.setrouteresponsecontent(
+                '/stuck/changerequeststatus', 200, '{"status": "PROCESSING"}')
+
+        cut = ReplicationflowGroup(replicationflows)
+        with self.assertRaises(ChangerequeststatusTimeoutError) as context:
+            cut.waitwhilebusy()
+        self.assertEqual('stuck', context.exception.name)
+
+    def test_maxrate(self):
+        self.assertRaises(ValueError, ReplicationflowGroup, [], 0)
+
+
+class testPollingPolicy(unittest.TestCase):
+
+    def test_defaults(self):
+        cut = PollingPolicy()
+        self.assertEqual(0.5, cut.initialinterval)
+        self.assertEqual(3600.0, cut.deadline)
+
+    def test_get_interval(self):
+        cut = PollingPolicy(1, multiplier=2, maxinterval=5, jitter=0)
+        self.assertEqual([1, 2, 4, 5, 5], [
+                         cut.get_interval(polls) for polls in range(1, 6)])
+
+        cut = PollingPolicy(1, multiplier=1, jitter=0.5)
+        for polls in range(1, 20):
+            interval = cut.get_interval(polls)
+            self.assertGreaterEqual(interval, 0.5)
+            self.assertLessEqual(interval, 1.5)
+
+    def test_get_waittime(self):
+        cut = PollingPolicy(2, multiplier=1, jitter=0, deadline=10)
+        self.assertEqual(2, cut.get_waittime(1, 0))
+        self.assertEqual(1, cut.get_waittime(5, 9))
+        self.assertIsNone(cut.get_waittime(6, 10))
+
+        cut = PollingPolicy(2, multiplier=1, jitter=0, deadline=None)
+        self.assertEqual(2, cut.get_waittime(1000, 100000))
+
+    def test_validation(self):
+        self.assertRaises(ValueError, PollingPolicy, -1)
+        self.assertRaises(ValueError, PollingPolicy, 1, 0.5)
+        self.assertRaises(ValueError, PollingPolicy, 1, 2, 10, 1)
+
+
+class testAsyncRms(unittest.IsolatedAsyncioTestCase):
+
+    async def test_createreplicationflow(self):
+        cluster = AsyncCluster(getDummyConnectionData())
+        sessionmock = AsyncSessionMock()
+        cluster.session = sessionmock
+
+        replication = Replication('E2Etest008')
+        cut = AsyncRms(cluster)
+
+        sessionmock.setresponsecontent(
+            202, '{"url": "/api/dt/v1/replicationflows/E2Etest008/changerequeststatus"}')
+        replicationflow = await cut.createreplicationflow(replication)
+        self.assertIsInstance(replicationflow, AsyncReplicationflow)
+        self.assertEqual('E2Etest008', replicationflow._name)
+        self.assertEqual(ModelerReplicationJson.serialize(
+            replication), sessionmock.posteddata)
+
+        sessionmock.setresponsecontent(404, '')
+        self.assertIsNone(await cut.createreplicationflow(replication))
+
+    async def test_deletereplicationflow(self):
+        cluster = AsyncCluster(getDummyConnectionData())
+        sessionmock = AsyncSessionMock()
+        cluster.session = sessionmock
+
+        cut = AsyncRms(cluster)
+
+        sessionmock.setresponsecontent(
+            202, '{"url": "/api/dt/v1/replicationflows/E2Etest008/changerequeststatus"}')
+        replicationflow = await cut.deletereplicationflow(Replication('E2Etest008'))
+        self.assertIsNotNone(replicationflow)
+        self.assertEqual('DELETE', sessionmock.lastmethod)
+
+        sessionmock.setresponse(404)
+        self.assertIsNone(await cut.deletereplicationflow(Replication('E2Etest008')))
+
+    async def test_waitwhilebusy(self):
+        cluster = AsyncCluster(getDummyConnectionData())
+        sessionmock = AsyncSessionMock()
+        cluster.session = sessionmock
+
+        cut = AsyncReplicationflow('E2Etest008', AsyncRms(cluster))
+        self.assertIsNone(await cut.getchangerequeststatus())
+
+        # only for testing! should not be done in 'real' code!
+        cut._changerequeststatusurl = '/api/dt/v1/replicationflows/E2Etest008/changerequeststatus'
+        cut.set_pollingpolicy(PollingPolicy(0, jitter=0))
+
+        sessionmock.setresponsecontent(200, '{"status": "PROCESSING"}')
+        sessionmock.setresponsecontent(200, '{"status": "VALIDATING"}')
+        sessionmock.setresponsecontent(200, '{"status": "COMPLETED"}')
+        changerequeststatus = await cut.waitwhilebusy()
+        self.assertEqual(ChangerequeststatusStatus.COMPLETED,
+                         changerequeststatus.getstatus())
+
+        sessionmock.setresponsecontent(
+            202, '{"url": "/api/dt/v1/replicationflows/E2Etest008/changerequeststatus"}')
+        await cut.runorresume()
+        self.assertTrue(sessionmock.lastcalledurl.endswith(
+            '/app/rms/api/dt/v1/replicationflows/E2Etest008?requestType=RUN_OR_RESUME_ALL_INACTIVE_TASKS'))
 
 
 class testChangerequeststatus(unittest.TestCase):
@@ -0,0 +1,122 @@
+import argparse
+import os
+import sys
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+#  The tools are scripts, not a package
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'tools')))
+import runtestcases  # noqa: E402
+from runtestcases import merge_reports, parse_shard, run_parallel, select_shard  # noqa: E402
+import testtimings  # noqa: E402
+
+from framework.infrastructure.utils.TestResources import ResourceLimiter  # noqa: E402
+
+
+def run_classes(prefix, path, pattern, classnames, output):
+    """Runs in the worker processes instead of the test classes: 'passing'
+    writes a report, 'crashing' raises like a broken worker."""
+
+    classname = classnames[0]
+    if classname == 'crashing':
+        raise ValueError('The worker broke')
+    os.makedirs(output)
+    with open(os.path.join(output, f'TEST-{classname}.xml'), 'w', encoding='utf-8') as file:
+        file.write(f'<testsuite name="{classname}" tests="1" failures="0" errors="0" time="0.5" />')
+    return True, {f'{classname}.test': 0.5}
+
+
+class testRuntestcases(unittest.TestCase):
+
+    def test_select_shard(self):
+        durations = {f'class{i}': float(i) for i in range(10)}
+        shards = [select_shard(durations, index, 3) for index in range(1, 4)]
+        self.assertEqual(sorted(durations), sorted(sum(shards, [])))
+        totals = [sum(durations[classname] for classname in shard) for shard in shards]
+        self.assertLessEqual(max(totals) - min(totals), max(durations.values()))
+
+    def test_parse_shard(self):
+        self.assertEqual((1, 1), parse_shard('1/1'))
+        self.assertEqual((2, 4), parse_shard('2/4'))
+        for value in ['0/2', '3/2', '1/0', '-1/2', '1', 'a/b', '1/2/3']:
+            with self.assertRaises(argparse.ArgumentTypeError, msg=value):
+                parse_shard(value)
+
+    def test_merge_reports(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            first = os.path.join(tempdir, 'class-0')
+            second = os.path.join(tempdir, 'class-1')
+            os.makedirs(first)
+            os.makedirs(second)
+            with open(os.path.join(first, 'TEST-a.xml'), 'w', encoding='utf-8') as file:
+                file.write('<testsuite name="a" tests="3" failures="1" errors="0" skipped="1" time="1.5">'
+                           '<testcase name="test_a" /></testsuite>')
+            with open(os.path.join(second, 'TEST-b.xml'), 'w', encoding='utf-8') as file:
+                file.write('<testsuites><testsuite name="b" tests="2" failures="0" errors="1" time="0.25" />'
+                           '<testsuite name="c" tests="1" time="0.25" /></testsuites>')
+
+            filename = os.path.join(tempdir, 'output', 'TEST-results.xml')
+            merge_reports([first, second], filename)
+
+            root = ET.parse(filename).getroot()
+            self.assertEqual('testsuites', root.tag)
+            self.assertEqual(['a', 'b', 'c'], [testsuite.get('name') for testsuite in root])
+            self.assertEqual('6', root.get('tests'))
+            self.assertEqual('1', root.get('failures'))
+            self.assertEqual('1', root.get('errors'))
+            self.assertEqual('1', root.get('skipped'))
+            self.assertEqual('2.000', root.get('time'))
+            self.assertEqual(1, len(root.findall('testsuite/testcase')))
+
+    def test_merge_reports_without_reports(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            filename = os.path.join(tempdir, 'TEST-results.xml')
+            merge_reports([os.path.join(tempdir, 'missing')], filename)
+            root = ET.parse(filename).getroot()
+            self.assertEqual('0', root.get('tests'))
+            self.assertEqual(0, len(root))
+
+    def _run_parallel(self, durations, resources, limiter):
+        with tempfile.TemporaryDirectory() as output, \
+                mock.patch.object(runtestcases, 'run_classes', run_classes):
+            timings = testtimings.TestTimings()
+            successful = run_parallel('test', '.', 'test*.py', durations, resources, output, 2,
+                                      timings, limiter)
+            root = ET.parse(os.path.join(output, 'TEST-results.xml')).getroot()
+            return successful, root, timings
+
+    def test_run_parallel(self):
+        successful, root, timings = self._run_parallel(
+            {'passing': 1.0}, {'passing': set()}, ResourceLimiter())
+
+        self.assertTrue(successful)
+        self.assertEqual('1', root.get('tests'))
+        self.assertEqual(0.5, timings.get('passing.test'))
+
+    def test_run_parallel_with_crashing_worker(self):
+        with mock.patch('sys.stderr'):
+            successful, root, timings = self._run_parallel(
+                {'crashing': 2.0, 'passing': 1.0}, {'crashing': set(), 'passing': set()}, ResourceLimiter())
+
+        # the class is reported as failed, the other report is kept
+        self.assertFalse(successful)
+        self.assertEqual(['crashing', 'passing'], sorted(testsuite.get('name') for testsuite in root))
+        self.assertEqual('2', root.get('tests'))
+        self.assertEqual('1', root.get('errors'))
+        self.assertIn('The worker broke', root.find('testsuite/testcase/error').get('message'))
+        self.assertEqual(0.5, timings.get('passing.test'))
+
+    def test_run_parallel_without_resources(self):
+        limiter = ResourceLimiter({})
+        # held by someone else
+        limiter.try_acquire({'abap:CIT_S4'})
+        with mock.patch('sys.stderr'):
+            successful, root, timings = self._run_parallel(
+                {'passing': 1.0, 'blocked': 2.0}, {'passing': set(), 'blocked': {'abap:CIT_S4'}}, limiter)
+
+        self.assertFalse(successful)
+        self.assertEqual(['blocked', 'passing'], sorted(testsuite.get('name') for testsuite in root))
+        self.assertEqual('1', root.get('errors'))
@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+
+from framework.infrastructure.Cluster import ClusterConnectionData
+from framework.infrastructure.utils.SessionRegistry import SessionRegistry
+from framework.validation.hana.HanaClient import HanaConnectionData
+
+
+def create_connectiondata(user: str = 'tester', password: str = 'secret') -> ClusterConnectionData:
+    connectiondata = ClusterConnectionData('CIT', 'https://cluster')
+    connectiondata.tenant = 'default'
+    connectiondata.user = user
+    connectiondata.password = password
+    return connectiondata
+
+
+class testSessionRegistry(unittest.TestCase):
+
+    def test_identity(self):
+        self.assertEqual(create_connectiondata().get_identity(),
+                         create_connectiondata(password='other').get_identity())
+        self.assertNotEqual(create_connectiondata().get_identity(),
+                            create_connectiondata(user='other').get_identity())
+        self.assertNotIn('secret', str(create_connectiondata().get_identity()))
+
+        hana = HanaConnectionData('CIT')
+        hana.address = 'cluster'
+        self.assertNotEqual(create_connectiondata().get_identity(), hana.get_identity())
+
+    def test_get(self):
+        cut = SessionRegistry()
+        connected = []
+
+        def connect(connectiondata):
+            connected.append(connectiondata)
+            return object()
+
+        first = cut.get('cluster', create_connectiondata(), connect)
+        self.assertIs(first, cut.get('cluster', create_connectiondata(), connect))
+        self.assertEqual(1, len(connected))
+        self.assertIsNot(first, cut.get('cluster', create_connectiondata(user='other'), connect))
+        self.assertIsNot(first, cut.get('hana', create_connectiondata(), connect))
+        self.assertEqual(3, cut.logins)
+        self.assertEqual(3, len(cut))
+
+        cut.invalidate(create_connectiondata())
+        self.assertEqual(1, len(cut))
+        self.assertIsNot(first, cut.get('cluster', create_connectiondata(), connect))
+        cut.invalidate()
+        self.assertEqual(0, len(cut))
+
+    def test_failed_connect(self):
+        cut = SessionRegistry()
+        self.assertIsNone(cut.get('cluster', create_connectiondata(), lambda connectiondata: None))
+        self.assertEqual(0, len(cut))
+        self.assertEqual(0, cut.logins)
+
+    def test_concurrent_get(self):
+        cut = SessionRegistry()
+        calls = []
+
+        def connect(connectiondata):
+            calls.append(connectiondata)
+            time.sleep(0.05)
+            return object()
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            cut.get('cluster', create_connectiondata(), connect))) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual(1, len(set(id(result) for result in results)))
+
+    def test_get_default(self):
+        self.assertIs(SessionRegistry.get_default(), SessionRegistry.get_default())
@@ -0,0 +1,56 @@
+import threading
+import unittest
+
+from framework.infrastructure.utils.TestResources import ResourceLimiter, get_resources, uses_resources
+
+
+@uses_resources('cluster:CIT', 'abap:CIT_S4')
+class ExampleTest(unittest.TestCase):
+
+    @uses_resources('hana:HANA_EU10')
+    def test_hana(self):
+        pass
+
+    def test_cluster(self):
+        pass
+
+
+class testTestResources(unittest.TestCase):
+
+    def test_uses_resources(self):
+        self.assertEqual(('cluster:CIT', 'abap:CIT_S4'), ExampleTest.resources)
+        self.assertEqual({'cluster:CIT', 'abap:CIT_S4', 'hana:HANA_EU10'},
+                         get_resources(ExampleTest('test_hana')))
+        self.assertEqual({'cluster:CIT', 'abap:CIT_S4'},
+                         get_resources(ExampleTest('test_cluster')))
+        self.assertEqual(set(), get_resources(self))
+
+    def test_limits(self):
+        cut = ResourceLimiter({'cluster': 2, 'cluster:CET': 1})
+        self.assertEqual(2, cut.get_limit('cluster:CIT'))
+        self.assertEqual(1, cut.get_limit('cluster:CET'))
+        self.assertEqual(1, cut.get_limit('abap:CIT_S4'))
+        self.assertRaises(ValueError, ResourceLimiter, {'hana': 0})
+        self.assertEqual(8, ResourceLimiter().get_limit('hana:HANA_EU10'))
+
+    def test_try_acquire(self):
+        cut = ResourceLimiter({'cluster': 2})
+        self.assertTrue(cut.try_acquire({'cluster:CIT', 'abap:CIT_S4'}))
+        self.assertTrue(cut.try_acquire({'cluster:CIT'}))
+        self.assertFalse(cut.try_acquire({'cluster:CIT'}))
+        # all or nothing
+        self.assertFalse(cut.try_acquire({'cluster:CET', 'abap:CIT_S4'}))
+        self.assertEqual(0, cut.get_inuse('cluster:CET'))
+        self.assertTrue(cut.try_acquire(set()))
+
+        cut.release({'cluster:CIT', 'abap:CIT_S4'})
+        self.assertEqual(1, cut.get_inuse('cluster:CIT'))
+        self.assertTrue(cut.try_acquire({'cluster:CET', 'abap:CIT_S4'}))
+
+    def test_acquire(self):
+        cut = ResourceLimiter({})
+        self.assertTrue(cut.acquire({'hana:HANA_EU10'}))
+        self.assertFalse(cut.acquire({'hana:HANA_EU10'}, timeout=0.01))
+
+        threading.Timer(0.05, cut.release, [{'hana:HANA_EU10'}]).start()
+        self.assertTrue(cut.acquire({'hana:HANA_EU10'}, timeout=5))
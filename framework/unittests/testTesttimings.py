@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+#  The tools are scripts, not a package
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'tools')))
+import testtimings  # noqa: E402
+from testtimings import pack  # noqa: E402
+
+
+class testPack(unittest.TestCase):
+
+    def test_longest_processing_time_first(self):
+        durations = {'a': 7, 'b': 5, 'c': 4, 'd': 3, 'e': 1}
+        # a -> 0, b -> 1, c -> 1 (9), d -> 0 (10), e -> 1 (10)
+        self.assertEqual([['a', 'd'], ['b', 'c', 'e']], pack(durations, 2))
+        self.assertEqual([['a'], ['b', 'e'], ['c', 'd']], pack(durations, 3))
+
+    def test_deterministic(self):
+        durations = {f'class{i}': i % 4 for i in range(20)}
+        reordered = dict(reversed(list(durations.items())))
+        self.assertEqual(pack(durations, 3), pack(reordered, 3))
+        # ties are broken by name
+        self.assertEqual([['x'], ['y'], ['z']], pack({'z': 1, 'y': 1, 'x': 1}, 3))
+
+    def test_bins(self):
+        self.assertEqual([['a'], [], []], pack({'a': 1}, 3))
+        self.assertEqual([[]], pack({}, 1))
+        self.assertRaises(ValueError, pack, {'a': 1}, 0)
+
+
+class testTestTimings(unittest.TestCase):
+
+    def test_estimate(self):
+        self.assertEqual(1.0, testtimings.TestTimings().estimate('unknown'))
+        self.assertEqual(2.5, testtimings.TestTimings(default=2.5).estimate('unknown'))
+
+        cut = testtimings.TestTimings()
+        cut.record({'a': 1.0, 'b': 3.0, 'c': 10.0})
+        self.assertEqual(10.0, cut.estimate('c'))
+        # unknown tests are estimated with the median
+        self.assertEqual(3.0, cut.estimate('unknown'))
+        self.assertEqual(14.0, cut.estimate_all(['a', 'c', 'unknown']))
+
+    def test_record(self):
+        cut = testtimings.TestTimings()
+        cut.record({'a': 2.0})
+        cut.record({'a': 4.0, 'b': 1.0})
+        self.assertEqual(3.0, cut.get('a'))
+        self.assertEqual(1.0, cut.get('b'))
+        self.assertIsNone(cut.get('c'))
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            filename = os.path.join(tempdir, 'timings.json')
+            cut = testtimings.TestTimings(filename)
+            self.assertEqual(0, len(cut))
+            cut.record({'a': 2.0})
+            cut.save()
+
+            self.assertEqual(['timings.json'], os.listdir(tempdir))
+            with open(filename, 'r', encoding='utf-8') as file:
+                self.assertEqual({'a': 2.0}, json.load(file))
+            self.assertEqual(2.0, testtimings.TestTimings(filename).get('a'))
@@ -0,0 +1,68 @@
+import time
+import unittest
+
+from framework.infrastructure.utils.TtlLruCache import CacheStatistics, TtlLruCache
+
+
+class testTtlLruCache(unittest.TestCase):
+
+    def test_basics(self):
+        cut = TtlLruCache()
+        self.assertIsNone(cut.get('key'))
+        self.assertEqual('default', cut.get('key', 'default'))
+        cut.put('key', 'value')
+        self.assertEqual('value', cut.get('key'))
+        self.assertEqual(1, len(cut))
+
+        statistics = cut.statistics()
+        self.assertEqual(1, statistics.hits)
+        self.assertEqual(2, statistics.misses)
+        self.assertEqual(1, statistics.size)
+
+    def test_lru(self):
+        cut = TtlLruCache(maxsize=2)
+        cut.put('a', 1)
+        cut.put('b', 2)
+        cut.get('a')
+        cut.put('c', 3)
+        self.assertEqual(1, cut.get('a'))
+        self.assertIsNone(cut.get('b'))
+        self.assertEqual(3, cut.get('c'))
+        self.assertEqual(1, cut.statistics().evictions)
+
+    def test_ttl(self):
+        cut = TtlLruCache(ttl=0.01)
+        cut.put('key', 'value')
+        time.sleep(0.02)
+        self.assertIsNone(cut.get('key'))
+        self.assertEqual(0, len(cut))
+
+        cut = TtlLruCache(ttl=None)
+        cut.put('key', 'value')
+        self.assertEqual('value', cut.get('key'))
+
+    def test_invalidate(self):
+        cut = TtlLruCache()
+        cut.put(('a', 1), 1)
+        cut.put(('a', 2), 2)
+        cut.put(('b', 1), 3)
+        cut.invalidate(('a', 1))
+        self.assertIsNone(cut.get(('a', 1)))
+        cut.invalidate_where(lambda key: key[0] == 'a')
+        self.assertEqual(1, len(cut))
+        cut.clear()
+        self.assertEqual(0, len(cut))
+
+    def test_maxsize(self):
+        self.assertRaises(ValueError, TtlLruCache, 0)
+
+
+class testCacheStatistics(unittest.TestCase):
+
+    def test_hitrate(self):
+        self.assertEqual(0.0, CacheStatistics(0, 0, 0, 0).hitrate)
+        self.assertEqual(0.75, CacheStatistics(3, 1, 0, 2).hitrate)
+
+
+if __name__ == '__main__':
+    unittest.main()
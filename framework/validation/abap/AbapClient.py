@@ -1,9 +1,10 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
 
 from pyrfc import Connection
 
 from framework.infrastructure.utils.ConnectionDataBase import ConnectionDataBase
+from framework.infrastructure.utils.netweaver.RFCConnectionPool import RFCConnectionPool
 
 
 class AbapClient:
@@ -11,6 +12,8 @@ class AbapClient:
 
     def __init__(self) -> None:
         self._connection = None
+        self._pool = None
+        self._parameters = None
 
     @staticmethod
     def connect_to(connection_data: AbapConnectionData = None, **kwargs) -> AbapClient:
@@ -20,19 +23,147 @@ class AbapClient:
             abapclient._connection = Connection(
                 user=kwargs['user'], passwd=kwargs['passwd'], ashost=kwargs['ashost'], sysnr=kwargs['sysnr'], client=kwargs['client'])
         else:
-            filled_values = {}
-            for key, value in connection_data._values.items():
-                if value:
-                    filled_values[key] = value
-            abapclient._connection = Connection(**filled_values)
+            abapclient._connection = Connection(
+                **connection_data.rfcparameters)
 
         return abapclient
 
+    @staticmethod
+    def connect_pooled(connection_data: AbapConnectionData, pool: RFCConnectionPool = None) -> AbapClient:
+        """Creates an AbapClient that borrows a connection from a pool for 
+        every RFC call, so that it can be used by many threads at once. By 
+        default the shared RFCConnectionPool is used."""
+
+        abapclient = AbapClient()
+        abapclient._pool = pool if pool is not None else RFCConnectionPool.get_default()
+        abapclient._parameters = connection_data.rfcparameters
+        return abapclient
+
+    @property
+    def pool(self) -> RFCConnectionPool:
+        """The connection pool of the client or None if the client uses a 
+        single connection."""
+        return self._pool
+
     def call_rfc(self, function_module, **kwargs):
+        if self._pool is not None:
+            with self._pool.connection(self._parameters) as connection:
+                return connection.call(function_module, **kwargs)
+
         rfcresult = self._connection.call(function_module, **kwargs)
 
         return rfcresult
 
+    def read_table(self, tablename: str, fields: list[str], where: str = None, delimiter: str = '|',
+                   rowcount: int = 0, rowskips: int = 0) -> list[list[str]]:
+        """
+        Reads rows of a table via RFC_READ_TABLE.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table.
+        fields : list[str]
+            The names of the fields to be read.
+        where : str
+            An optional Open SQL condition, e.g. `RECID >= '0001'`.
+        delimiter : str
+            The character separating the fields, it must not occur in the 
+            values.
+        rowcount : int
+            The maximum number of rows to be read, 0 reads all rows.
+        rowskips : int
+            The number of rows to be skipped.
+
+        Returns
+        -------
+        list[list[str]]
+            The rows with the values of the fields as stripped strings. The 
+            values are in the ABAP external format, e.g. `20240131` for a 
+            date or `12.50-` for a negative packed number.
+        """
+        options = [{'TEXT': line} for line in self._split_where(where)]
+        rfcresult = self.call_rfc('RFC_READ_TABLE', QUERY_TABLE=tablename, DELIMITER=delimiter,
+                                  FIELDS=[{'FIELDNAME': field} for field in fields], OPTIONS=options,
+                                  ROWCOUNT=rowcount, ROWSKIPS=rowskips)
+
+        return [[value.strip() for value in row['WA'].split(delimiter)] for row in rfcresult['DATA']]
+
+    def iter_table(self, tablename: str, fields: list[str], where: str = None, delimiter: str = '|',
+                   pagesize: int = 10000) -> Iterator[list[str]]:
+        """Reads the rows of a table page by page, see `read_table`. Only one 
+        page is held in memory and no single RFC call has to transfer the 
+        whole table, which would hit the memory and time limits of the ABAP 
+        work process for large tables."""
+
+        if pagesize < 1:
+            raise ValueError(f'The page size must be greater than zero, not {pagesize}!')
+
+        rowskips = 0
+        while True:
+            rows = self.read_table(tablename, fields, where, delimiter, rowcount=pagesize, rowskips=rowskips)
+            yield from rows
+            if len(rows) < pagesize:
+                return
+            rowskips += pagesize
+
+    def get_field_types(self, tablename: str) -> dict[str, tuple[str, int]]:
+        """
+        Gets the types of the fields of a table via DDIF_FIELDINFO_GET.
+
+        Parameters
+        ----------
+        tablename : str
+            The name of the table.
+
+        Returns
+        -------
+        dict[str, tuple[str, int]]
+            The ABAP internal type, e.g. `C` or `P`, and the length in 
+            characters by field name.
+        """
+        rfcresult = self.call_rfc('DDIF_FIELDINFO_GET', TABNAME=tablename)
+
+        return {field['FIELDNAME']: (field['INTTYPE'], int(field['LENG']))
+                for field in rfcresult['DFIES_TAB']}
+
+    @staticmethod
+    def _split_where(where: str, linelength: int = 72) -> list[str]:
+        """Splits a condition into the lines of at most 72 characters that
+        RFC_READ_TABLE expects. Lines are only broken between words, never 
+        inside a quoted literal."""
+
+        if not where:
+            return []
+
+        # the spaces inside literals belong to the word, '' is an escaped quote
+        words = []
+        word = ''
+        quoted = False
+        for character in where:
+            if character == ' ' and not quoted:
+                words.append(word)
+                word = ''
+                continue
+            if character == "'":
+                quoted = not quoted
+            word += character
+        words.append(word)
+
+        lines = []
+        line = ''
+        for word in words:
+            candidate = word if line == '' else f'{line} {word}'
+            if len(candidate) > linelength and line != '':
+                lines.append(line)
+                line = ' ' + word
+            else:
+                line = candidate
+            if len(line) > linelength:
+                raise ValueError(f'The condition can\'t be split into lines of {linelength} characters: {word}')
+        lines.append(line)
+        return lines
+
 
 class AbapConnectionData(ConnectionDataBase):
 
@@ -47,6 +178,16 @@ class AbapConnectionData(ConnectionDataBase):
     def name(self) -> str:
         return self._values['name']
 
+    @property
+    def rfcparameters(self) -> dict:
+        """The filled values as parameters of a pyrfc Connection"""
+
+        filled_values = {}
+        for key, value in self._values.items():
+            if value:
+                filled_values[key] = value
+        return filled_values
+
     @property
     def user(self) -> str:
         return self._values.get('user', None)
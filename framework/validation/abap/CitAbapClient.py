@@ -1,8 +1,14 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import monotonic
+
 from pyrfc import Connection
 
+from framework.infrastructure.utils.TtlLruCache import TtlLruCache
+from framework.infrastructure.utils.netweaver.RFCConnectionPool import RFCConnectionPool
 from framework.validation.abap.AbapClient import AbapClient, AbapConnectionData
 
 
@@ -12,40 +18,69 @@ class CitAbapClient(AbapClient):
     for details on the CIT test data.
 
     The access to the CIT test data is done via the DHE2E_CIT_RFC_DATA_ACCESS 
-    RFC function module."""
+    RFC function module.
+
+    The table and CDS view names of a dataset are memoized for the lifetime of
+    the client, the record counts for `countttl` seconds. Changing the records
+    via the client invalidates the memoized count of the dataset."""
 
-    def __init__(self) -> None:
+    def __init__(self, countttl: float = 30.0) -> None:
+        super().__init__()
         self._cit_prefix = 'DHE2E'
+        self._names = {}
+        self._nameslock = threading.Lock()
+        self._counts = TtlLruCache(maxsize=1024, ttl=countttl)
+        self._connect = None
+        self._spareconnections = []
+        self._spareconnectionslock = threading.Lock()
 
     @staticmethod
     def connect_to(connection_data: AbapConnectionData = None, **kwargs) -> CitAbapClient:
         abapclient = CitAbapClient()
 
         if connection_data is None:
-            abapclient._connection = Connection(
-                user=kwargs['user'], passwd=kwargs['passwd'], ashost=kwargs['ashost'], sysnr=kwargs['sysnr'], client=kwargs['client'])
+            filled_values = {'user': kwargs['user'], 'passwd': kwargs['passwd'], 'ashost': kwargs['ashost'],
+                             'sysnr': kwargs['sysnr'], 'client': kwargs['client']}
         else:
-            filled_values = {}
-            for key, value in connection_data._values.items():
-                if value:
-                    filled_values[key] = value
-            abapclient._connection = Connection(**filled_values)
+            filled_values = connection_data.rfcparameters
+        abapclient._connect = lambda: Connection(**filled_values)
+        abapclient._connection = abapclient._connect()
+        abapclient._detect_cit_prefix()
 
+        return abapclient
+
+    @staticmethod
+    def connect_pooled(connection_data: AbapConnectionData, pool: RFCConnectionPool = None) -> CitAbapClient:
+        """Creates a CitAbapClient that borrows a connection from a pool for 
+        every RFC call, so that it can be used by many threads at once. By 
+        default the shared RFCConnectionPool is used."""
+
+        abapclient = CitAbapClient()
+        abapclient._pool = pool if pool is not None else RFCConnectionPool.get_default()
+        abapclient._parameters = connection_data.rfcparameters
+        abapclient._detect_cit_prefix()
+
+        return abapclient
+
+    def _detect_cit_prefix(self) -> None:
         try:
-            abapclient._connection.call(
-                'RFC_FUNCTION_SEARCH', FUNCNAME='DHE2E_CIT_RFC_DATA_ACCESS')
-            abapclient._cit_prefix = 'DHE2E'
+            self.call_rfc('RFC_FUNCTION_SEARCH',
+                          FUNCNAME='DHE2E_CIT_RFC_DATA_ACCESS')
+            self._cit_prefix = 'DHE2E'
         except BaseException:
-            abapclient._connection.call(
-                'RFC_FUNCTION_SEARCH', FUNCNAME='LTE2E_CIT_RFC_DATA_ACCESS')
-            abapclient._cit_prefix = 'LTE2E'
+            self.call_rfc('RFC_FUNCTION_SEARCH',
+                          FUNCNAME='LTE2E_CIT_RFC_DATA_ACCESS')
+            self._cit_prefix = 'LTE2E'
 
-        return abapclient
+    def _cit_rfc_parameters(self, dataset_identifier: str, mode, count: int = 0) -> tuple[str, dict]:
+        parameters = {'IV_TABLE_ID': dataset_identifier,
+                      'IV_MODE': mode, 'IV_NUM_RECS': str(count)}
+        return f'{self._cit_prefix}_CIT_RFC_DATA_ACCESS', parameters
 
     def _call_cit_rfc(self, dataset_identifier: str, mode, count: int = 0):
-        rfcresult = self.call_rfc(
-            f'{self._cit_prefix}_CIT_RFC_DATA_ACCESS', IV_TABLE_ID=dataset_identifier, IV_MODE=mode,
-            IV_NUM_RECS=str(count))
+        function_module, parameters = self._cit_rfc_parameters(
+            dataset_identifier, mode, count)
+        rfcresult = self.call_rfc(function_module, **parameters)
 
         self._handle_returncode(rfcresult)
 
@@ -58,25 +93,172 @@ class CitAbapClient(AbapClient):
             raise RuntimeError(
                 f"The ABAP system returned EV_RC={error_code}: {error_message}")
 
+    @property
+    def countttl(self) -> float:
+        """The number of seconds a record count is memoized"""
+        return self._counts.ttl
+
+    @countttl.setter
+    def countttl(self, countttl: float) -> None:
+        self._counts = TtlLruCache(maxsize=1024, ttl=countttl)
+
+    def invalidate(self, dataset_identifier: str = None) -> None:
+        """Forgets the memoized names and counts of the given dataset or of 
+        all datasets if no identifier is given."""
+
+        with self._nameslock:
+            if dataset_identifier is None:
+                self._names.clear()
+            else:
+                self._names.pop(dataset_identifier, None)
+        if dataset_identifier is None:
+            self._counts.clear()
+        else:
+            self._counts.invalidate(dataset_identifier)
+
+    def get_dataset_info(self, dataset_identifier: str) -> CitDatasetInfo:
+        """Gets the number of records and the table and CDS view names of the
+        dataset with the given identifier. Memoized values are used if 
+        possible, otherwise all of them are read with one RFC call."""
+
+        with self._nameslock:
+            names = self._names.get(dataset_identifier, None)
+        count = self._counts.get(dataset_identifier, None)
+        if names is not None and count is not None:
+            return CitDatasetInfo(dataset_identifier, count, names[0], names[1])
+
+        rfcresult = self._call_cit_rfc(dataset_identifier, 'C')
+        info = CitDatasetInfo(dataset_identifier, int(rfcresult['EV_COUNT']),
+                              rfcresult['EV_TABNAME'], rfcresult['EV_CDSNAME'])
+        with self._nameslock:
+            self._names[dataset_identifier] = (info.tablename, info.cdsname)
+        self._counts.put(dataset_identifier, info.rowcount)
+        return info
+
+    def _get_names(self, dataset_identifier: str) -> tuple[str, str]:
+        with self._nameslock:
+            names = self._names.get(dataset_identifier, None)
+        if names is None:
+            info = self.get_dataset_info(dataset_identifier)
+            names = (info.tablename, info.cdsname)
+        return names
+
     def get_rowcount(self, dataset_identifier: str) -> int:
         """Gets the number of records in the table with the given dataset 
         identifier."""
 
-        rfcresult = self._call_cit_rfc(dataset_identifier, 'C')
-        return int(rfcresult['EV_COUNT'])
+        return self.get_dataset_info(dataset_identifier).rowcount
 
     def get_tablename(self, dataset_identifier: str) -> str:
         """Get the name of the table with the given dataset identifier."""
 
-        rfcresult = self._call_cit_rfc(dataset_identifier, 'C')
-        return rfcresult['EV_TABNAME']
+        return self._get_names(dataset_identifier)[0]
 
     def get_cdsname(self, dataset_identifier: str) -> str:
         """Get the name of CDS view that's based on the table with the given 
         dataset identifier."""
 
-        rfcresult = self._call_cit_rfc(dataset_identifier, 'C')
-        return rfcresult['EV_CDSNAME']
+        return self._get_names(dataset_identifier)[1]
+
+    def get_rowcounts(self, dataset_identifiers: list[str], max_workers: int = 8):
+        """
+        Gets the number of records of many datasets in parallel.
+
+        The counts are read via additional RFC connections, at most 
+        `max_workers` at once. The connections are kept for later calls until
+        `close` is called or borrowed from the pool of the client. A connection
+        whose call failed is closed and not used again.
+        pyrfc releases the GIL while waiting for the ABAP system, so the time
+        of all counts is about the time of the slowest one. Memoized counts 
+        are used if possible and the read counts are memoized.
+
+        Parameters
+        ----------
+        dataset_identifiers : list[str]
+            The identifiers of the datasets.
+        max_workers : int
+            The maximum number of RFC calls at the same time.
+
+        Yields
+        ------
+        CitRowcountResult
+            The results in the order the calls complete. Failed calls are 
+            reported by the `error` of their result.
+        """
+        pending = []
+        for dataset_identifier in dataset_identifiers:
+            count = self._counts.get(dataset_identifier, None)
+            if count is None:
+                pending.append(dataset_identifier)
+            else:
+                yield CitRowcountResult(dataset_identifier, count, 0.0)
+
+        if len(pending) == 0:
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._count_concurrently, dataset_identifier)
+                       for dataset_identifier in pending]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def _count_concurrently(self, dataset_identifier: str) -> CitRowcountResult:
+        start = monotonic()
+        try:
+            if self._pool is not None:
+                rfcresult = self._call_cit_rfc(dataset_identifier, 'C')
+            else:
+                rfcresult = self._count_with_own_connection(dataset_identifier)
+        except Exception as e:
+            return CitRowcountResult(dataset_identifier, None, monotonic() - start, e)
+
+        count = int(rfcresult['EV_COUNT'])
+        with self._nameslock:
+            self._names[dataset_identifier] = (
+                rfcresult['EV_TABNAME'], rfcresult['EV_CDSNAME'])
+        self._counts.put(dataset_identifier, count)
+        return CitRowcountResult(dataset_identifier, count, monotonic() - start)
+
+    def _count_with_own_connection(self, dataset_identifier: str):
+        with self._spareconnectionslock:
+            connection = self._spareconnections.pop() if self._spareconnections else None
+
+        if connection is None:
+            if self._connect is None:
+                raise RuntimeError(
+                    'The client can not open additional RFC connections!')
+            connection = self._connect()
+
+        function_module, parameters = self._cit_rfc_parameters(
+            dataset_identifier, 'C')
+        try:
+            rfcresult = connection.call(function_module, **parameters)
+        except Exception:
+            # the connection may be broken, so it is not used again
+            self._close(connection)
+            raise
+
+        with self._spareconnectionslock:
+            self._spareconnections.append(connection)
+        self._handle_returncode(rfcresult)
+        return rfcresult
+
+    @staticmethod
+    def _close(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """Closes the additional RFC connections of `get_rowcounts`. The
+        client can still be used, new connections are opened if needed."""
+
+        with self._spareconnectionslock:
+            connections = self._spareconnections
+            self._spareconnections = []
+        for connection in connections:
+            self._close(connection)
 
     def update_records(self, dataset_identifier: str, count: int) -> list[str]:
         """Updates the given count of records in table with the given dataset 
@@ -91,7 +273,12 @@ class CitAbapClient(AbapClient):
         identifier. The identifiers of the deletd records are returned as
         list."""
 
-        rfcresult = self._call_cit_rfc(dataset_identifier, 'D', count)
+        try:
+            rfcresult = self._call_cit_rfc(dataset_identifier, 'D', count)
+        finally:
+            # invalidated after the call, so that a concurrent count can't
+            # memoize the count from before the change
+            self._counts.invalidate(dataset_identifier)
         return rfcresult['ET_RECID']
 
     def insert_records(self, dataset_identifier: str, count: int) -> list[str]:
@@ -99,7 +286,10 @@ class CitAbapClient(AbapClient):
         identifier. The identifiers of the inserted records are returned as
         list."""
 
-        rfcresult = self._call_cit_rfc(dataset_identifier, 'I', count)
+        try:
+            rfcresult = self._call_cit_rfc(dataset_identifier, 'I', count)
+        finally:
+            self._counts.invalidate(dataset_identifier)
         return rfcresult['ET_RECID']
 
     def setup_table(self, dataset_identifier: str) -> int:
@@ -107,11 +297,84 @@ class CitAbapClient(AbapClient):
         clearing the contents and generating new records. The number of records
         in the table after initialization is returned."""
 
-        rfcresult = self._call_cit_rfc(dataset_identifier, 'S')
-        return int(rfcresult['EV_COUNT'])
+        try:
+            rfcresult = self._call_cit_rfc(dataset_identifier, 'S')
+        finally:
+            self._counts.invalidate(dataset_identifier)
+        count = int(rfcresult['EV_COUNT'])
+        self._counts.put(dataset_identifier, count)
+        return count
 
     def teardown_table(self, dataset_identifier: str) -> bool:
         """Clears the contents of the table with the given dataset identifier."""
 
-        rfcresult = self._call_cit_rfc(dataset_identifier, 'T')
-        return int(rfcresult['EV_COUNT']) == 0
+        try:
+            rfcresult = self._call_cit_rfc(dataset_identifier, 'T')
+        finally:
+            self._counts.invalidate(dataset_identifier)
+        count = int(rfcresult['EV_COUNT'])
+        self._counts.put(dataset_identifier, count)
+        return count == 0
+
+
+class CitDatasetInfo:
+    """The record count and the names of the objects of a CIT dataset."""
+
+    def __init__(self, dataset_identifier: str, rowcount: int, tablename: str, cdsname: str) -> None:
+        self._dataset_identifier = dataset_identifier
+        self._rowcount = rowcount
+        self._tablename = tablename
+        self._cdsname = cdsname
+
+    @property
+    def dataset_identifier(self) -> str:
+        return self._dataset_identifier
+
+    @property
+    def rowcount(self) -> int:
+        return self._rowcount
+
+    @property
+    def tablename(self) -> str:
+        return self._tablename
+
+    @property
+    def cdsname(self) -> str:
+        return self._cdsname
+
+    def __str__(self) -> str:
+        return (f'Dataset:\t{self.dataset_identifier}, Rows:\t{self.rowcount}, '
+                f'Table:\t{self.tablename}, CDS view:\t{self.cdsname}')
+
+
+class CitRowcountResult:
+    """The result of counting the records of a dataset with `get_rowcounts`."""
+
+    def __init__(self, dataset_identifier: str, rowcount: int, duration: float, error: Exception = None) -> None:
+        self._dataset_identifier = dataset_identifier
+        self._rowcount = rowcount
+        self._duration = duration
+        self._error = error
+
+    @property
+    def dataset_identifier(self) -> str:
+        return self._dataset_identifier
+
+    @property
+    def rowcount(self) -> int:
+        """The number of records or None if the call failed"""
+        return self._rowcount
+
+    @property
+    def duration(self) -> float:
+        """The duration of the call in seconds"""
+        return self._duration
+
+    @property
+    def error(self) -> Exception:
+        return self._error
+
+    def __str__(self) -> str:
+        if self._error is not None:
+            return f'Dataset:\t{self.dataset_identifier}, Error:\t{self.error}, Duration:\t{self.duration:.3f}s'
+        return f'Dataset:\t{self.dataset_identifier}, Rows:\t{self.rowcount}, Duration:\t{self.duration:.3f}s'
@@ -1,16 +1,44 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
+import codecs
+import csv
+import io
 import json
+import zlib
+from concurrent.futures import ThreadPoolExecutor
 
+import pyarrow.parquet as pq
+from azure.core.exceptions import ResourceNotFoundError
 from azure.storage.filedatalake import DataLakeServiceClient
 
+from framework.infrastructure.replications.Replication import (ReplicationSpaceFileCompression,
+                                                               ReplicationSpaceFileDelimiter,
+                                                               ReplicationSpaceFileType)
 from framework.infrastructure.utils.ConnectionDataBase import ConnectionDataBase
+from framework.infrastructure.utils.TtlLruCache import TtlLruCache
+from framework.validation.datalake.RecordReducers import FunctionReducer, RecordReducer
+
+DELIMITERS = {
+    ReplicationSpaceFileDelimiter.COMMA: ',',
+    ReplicationSpaceFileDelimiter.COLON: ':',
+    ReplicationSpaceFileDelimiter.PIPE: '|',
+    ReplicationSpaceFileDelimiter.SEMICOLON: ';',
+    ReplicationSpaceFileDelimiter.TAB: '\t'
+}
 
 
 class DatalakeClient:
+    """A class for reading the files of a container in Azure Data Lake 
+    Storage Gen2.
+
+    Folder listings used by `exists` with `cached=True` are kept for 
+    `listingttl` seconds."""
 
-    def __init__(self) -> None:
+    def __init__(self, listingttl: float = 60.0) -> None:
         self._connection = None
+        self._listings = TtlLruCache(maxsize=64, ttl=listingttl)
+        # the counts are cached by path and etag, so they never get stale
+        self._recordcounts = TtlLruCache(maxsize=4096, ttl=None)
 
     @staticmethod
     def connect_to(connection_data: DatalakeConnectionData = None, **kwargs) -> DatalakeClient:
@@ -42,23 +70,477 @@ class DatalakeClient:
         return pathName
 
     def is_file_Exist(self, foldername: str, filename: str) -> bool:
-        paths = self.get_fileNames(foldername)
-        for path in paths:
-            print(path + '\n')
-            if path == foldername+"/"+filename:
-                return True
-        return False
+        return self.exists(foldername, filename)
 
-    def get_jsonfile_content(self, foldername: str, filename: str):
+    def exists(self, foldername: str, filename: str, cached: bool = False) -> bool:
+        """
+        Checks whether a file exists.
+
+        Parameters
+        ----------
+        foldername : str
+            The folder of the file.
+        filename : str
+            The name of the file, it may contain subfolders.
+        cached : bool
+            If `False` (default) the properties of the file are requested. If
+            `True` the file is looked up in a listing of the folder, which is
+            requested once and kept for `listingttl` seconds. A cached listing
+            of a parent folder is used as well. This is much faster for
+            checking many files of the same folder.
+
+        Returns
+        -------
+        bool
+            `True` if the file exists, otherwise `False`
+        """
+        if cached:
+            path = foldername.rstrip('/') + '/' + filename
+            listing = self._find_listing(path)
+            if listing is None:
+                listing = self.get_listing(foldername)
+            return listing.contains(path)
+
+        try:
+            self._get_file_client(foldername, filename).get_file_properties()
+            return True
+        except ResourceNotFoundError:
+            return False
+
+    def get_listing(self, foldername: str) -> DatalakeListing:
+        """Gets the listing of all files below the folder. The listing is 
+        cached for `listingttl` seconds."""
+
+        foldername = foldername.rstrip('/')
+        listing = self._listings.get(foldername, None)
+        if listing is None:
+            file_system_client = self._connection.get_file_system_client(
+                self.container)
+            files = [path for path in file_system_client.get_paths(path=foldername)
+                     if not getattr(path, 'is_directory', False)]
+            listing = DatalakeListing(foldername, [path.name for path in files],
+                                      {path.name: (path.etag, path.content_length) for path in files})
+            self._listings.put(foldername, listing)
+        return listing
+
+    def _find_listing(self, path: str) -> DatalakeListing:
+        """Finds a cached listing of any folder that contains the path."""
+
+        parts = path.split('/')
+        for i in range(len(parts) - 1, 0, -1):
+            listing = self._listings.get('/'.join(parts[:i]), None)
+            if listing is not None:
+                return listing
+        return None
+
+    def invalidate_listings(self) -> None:
+        self._listings.clear()
+
+    def _get_file_client(self, foldername: str, filename: str):
         file_system_client = self._connection.get_file_system_client(
             self.container)
         directory_client = file_system_client.get_directory_client(foldername)
-        file_client = directory_client.get_file_client(filename)
+        return directory_client.get_file_client(filename)
+
+    def get_jsonfile_content(self, foldername: str, filename: str):
+        """Gets the content of a JSON file. The whole file is loaded into 
+        memory, use `iter_jsonlines` for large files with one JSON document 
+        per line."""
+
+        file_client = self._get_file_client(foldername, filename)
         download = file_client.download_file()
         downloaded_bytes = download.readall().decode('utf-8')
         content = json.loads(downloaded_bytes)
         return content
 
+    def iter_chunks(self, foldername: str, filename: str,
+                    compression: ReplicationSpaceFileCompression = ReplicationSpaceFileCompression.NONE):
+        """Iterates over the content of a file chunk by chunk as it is 
+        downloaded. GZIP compressed files are decompressed on the fly."""
+
+        download = self._get_file_client(foldername, filename).download_file()
+        if compression != ReplicationSpaceFileCompression.GZIP:
+            yield from download.chunks()
+            return
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        for chunk in download.chunks():
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        data = decompressor.flush()
+        if data:
+            yield data
+
+    def iter_lines(self, foldername: str, filename: str,
+                   compression: ReplicationSpaceFileCompression = ReplicationSpaceFileCompression.NONE,
+                   encoding: str = 'utf-8'):
+        """Iterates over the lines of a text file including their line 
+        endings, only one chunk of the file is held in memory."""
+
+        decoder = codecs.getincrementaldecoder(encoding)()
+        pending = ''
+        for chunk in self.iter_chunks(foldername, filename, compression):
+            pending += decoder.decode(chunk)
+            lines = pending.split('\n')
+            pending = lines.pop()
+            for line in lines:
+                yield line + '\n'
+
+        pending += decoder.decode(b'', final=True)
+        if pending:
+            yield pending
+
+    def iter_jsonlines(self, foldername: str, filename: str,
+                       compression: ReplicationSpaceFileCompression = ReplicationSpaceFileCompression.NONE):
+        """Iterates over the records of a file with one JSON document per 
+        line. Empty lines are skipped."""
+
+        for line in self.iter_lines(foldername, filename, compression):
+            if line.strip():
+                yield json.loads(line)
+
+    def iter_csv(self, foldername: str, filename: str,
+                 delimiter: ReplicationSpaceFileDelimiter = ReplicationSpaceFileDelimiter.COMMA,
+                 header: bool = True,
+                 compression: ReplicationSpaceFileCompression = ReplicationSpaceFileCompression.NONE):
+        """
+        Iterates over the records of a CSV file as written by replications to
+        object stores.
+
+        Parameters
+        ----------
+        delimiter : ReplicationSpaceFileDelimiter
+            The column delimiter of the replication space.
+        header : bool
+            Whether the first line holds the column names, see 
+            `ReplicationSpace.set_file_header`.
+        compression : ReplicationSpaceFileCompression
+            The compression of the file.
+
+        Yields
+        ------
+        dict | list
+            The records as dictionary by column name if there is a header, 
+            otherwise as list of values.
+        """
+        lines = self.iter_lines(foldername, filename, compression)
+        reader = csv.reader(lines, delimiter=DELIMITERS[delimiter])
+        if not header:
+            yield from reader
+            return
+
+        columns = next(reader, None)
+        if columns is None:
+            return
+        for values in reader:
+            yield dict(zip(columns, values))
+
+    def open_file(self, foldername: str, filename: str, buffer_size: int = 4 * 1024 * 1024) -> io.BufferedReader:
+        """Opens a file for reading. Only the requested parts of the file are
+        downloaded with ranged reads, so the file object can be used to read
+        e.g. Parquet files without downloading them completely."""
+
+        return io.BufferedReader(DatalakeFile(self._get_file_client(foldername, filename)), buffer_size)
+
+    def _list_files(self, foldername: str) -> list[str]:
+        """Lists the files below the folder, always requesting a fresh 
+        listing which is then cached."""
+
+        self._listings.invalidate(foldername.rstrip('/'))
+        return self.get_listing(foldername).paths
+
+    def download_folder(self, foldername: str, max_workers: int = 8) -> dict[str, bytes]:
+        """Downloads all files below the folder in parallel. The folder is 
+        listed once, the content of the files is returned by path."""
+
+        def download(path: str) -> bytes:
+            directory, separator, name = path.rpartition('/')
+            return self._get_file_client(directory, name).download_file().readall()
+
+        paths = self._list_files(foldername)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(paths, executor.map(download, paths)))
+
+    @staticmethod
+    def detect_format(path: str) -> tuple[ReplicationSpaceFileType, ReplicationSpaceFileCompression]:
+        """Detects the format of a file by its extension. The type is None 
+        for other files, e.g. JSON lines or marker files. Parquet files 
+        compress their pages themselves, a GZIP compressed Parquet file is
+        reported as such but can't be read, see `iter_records`."""
+
+        name = path.lower()
+        compression = ReplicationSpaceFileCompression.NONE
+        if name.endswith('.gz'):
+            compression = ReplicationSpaceFileCompression.GZIP
+            name = name[:-3]
+
+        if name.endswith('.parquet'):
+            return ReplicationSpaceFileType.PARQUET, compression
+        if name.endswith('.csv'):
+            return ReplicationSpaceFileType.CSV, compression
+        return None, compression
+
+    def iter_records(self, foldername: str, filename: str,
+                     delimiter: ReplicationSpaceFileDelimiter = ReplicationSpaceFileDelimiter.COMMA,
+                     header: bool = True):
+        """Iterates over the records of a file using the reader that fits 
+        the extension of the file: Parquet, CSV (optionally GZIP compressed) or
+        JSON lines for .json and .jsonl files."""
+
+        filetype, compression = self.detect_format(filename)
+        if filetype == ReplicationSpaceFileType.PARQUET:
+            self._check_parquet(filename, compression)
+            return self.iter_parquet(foldername, filename)
+        if filetype == ReplicationSpaceFileType.CSV:
+            return self.iter_csv(foldername, filename, delimiter, header, compression)
+
+        name = filename.lower().removesuffix('.gz')
+        if name.endswith('.json') or name.endswith('.jsonl'):
+            return self.iter_jsonlines(foldername, filename, compression)
+        raise ValueError(f'The format of the file {filename} is unknown!')
+
+    def aggregate(self, foldername: str, reducer, max_workers: int = 8,
+                  delimiter: ReplicationSpaceFileDelimiter = ReplicationSpaceFileDelimiter.COMMA,
+                  header: bool = True):
+        """
+        Reduces the records of all files below a folder, e.g. to verify a
+        replication target folder with many part files.
+
+        The folder is listed once and the files are read in parallel, each 
+        file record by record with `iter_records`. Parquet files are read with
+        ranged reads. Files of unknown formats, e.g. marker files, are skipped.
+
+        Parameters
+        ----------
+        foldername : str
+            The folder.
+        reducer : RecordReducer | callable
+            A reducer like RecordCount, KeySet or RecordChecksum, which is 
+            spawned per file and merged afterwards, or a function that is 
+            called with every record.
+        max_workers : int
+            The maximum number of files read at the same time.
+        delimiter : ReplicationSpaceFileDelimiter
+            The column delimiter of CSV files.
+        header : bool
+            Whether CSV files have a header line.
+
+        Returns
+        -------
+        RecordReducer
+            The given reducer holding the result of all files.
+        """
+        if not isinstance(reducer, RecordReducer):
+            reducer = FunctionReducer(reducer)
+
+        def reduce_file(path: str) -> RecordReducer:
+            directory, separator, name = path.rpartition('/')
+            partial = reducer.spawn()
+            for record in self.iter_records(directory, name, delimiter, header):
+                partial.add(record)
+            return partial
+
+        paths = [path for path in self._list_files(foldername)
+                 if self._has_records(path)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for partial in executor.map(reduce_file, paths):
+                reducer.merge(partial)
+        return reducer
+
+    def _has_records(self, path: str) -> bool:
+        filetype, compression = self.detect_format(path)
+        name = path.lower().removesuffix('.gz')
+        return filetype is not None or name.endswith('.json') or name.endswith('.jsonl')
+
+    def get_recordcounts(self, foldername: str, header: bool = True, max_workers: int = 8) -> dict[str, int]:
+        """
+        Counts the records of all record files below a folder without 
+        downloading their content where possible.
+
+        Only the footer of Parquet files is read, it holds the number of rows.
+        CSV files are streamed and their line breaks are counted, the header
+        line is not counted. Line breaks in quoted CSV values are counted as
+        well. JSON lines files are streamed and their lines that are not 
+        empty are counted, like `iter_jsonlines` does. GZIP compressed Parquet
+        files are not supported and raise a ValueError. The counts are cached per file 
+        and etag, so unchanged files are never read twice.
+
+        Parameters
+        ----------
+        foldername : str
+            The folder.
+        header : bool
+            Whether CSV files have a header line.
+        max_workers : int
+            The maximum number of files read at the same time.
+
+        Returns
+        -------
+        dict[str, int]
+            The number of records by file path.
+        """
+        self._listings.invalidate(foldername.rstrip('/'))
+        listing = self.get_listing(foldername)
+        paths = [path for path in listing.paths if self._has_records(path)]
+
+        def count(path: str) -> int:
+            etag = listing.get_etag(path)
+            key = (path, etag, header)
+            if etag is not None:
+                recordcount = self._recordcounts.get(key, None)
+                if recordcount is not None:
+                    return recordcount
+
+            recordcount = self._count_file(path, listing.get_size(path), header)
+            if etag is not None:
+                self._recordcounts.put(key, recordcount)
+            return recordcount
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(paths, executor.map(count, paths)))
+
+    def count_records(self, foldername: str, header: bool = True, max_workers: int = 8) -> int:
+        """Counts the records of all record files below a folder, see 
+        `get_recordcounts`. The result is comparable to the row count of the
+        target table of a replication into a database."""
+
+        return sum(self.get_recordcounts(foldername, header, max_workers).values())
+
+    @staticmethod
+    def _check_parquet(filename: str, compression: ReplicationSpaceFileCompression) -> None:
+        # the footer of a Parquet file can't be read without decompressing
+        # the whole file
+        if compression != ReplicationSpaceFileCompression.NONE:
+            raise ValueError(
+                f'The Parquet file {filename} is {compression.value} compressed, which is not supported!')
+
+    def _count_file(self, path: str, size: int, header: bool) -> int:
+        directory, separator, name = path.rpartition('/')
+        filetype, compression = self.detect_format(name)
+        if filetype == ReplicationSpaceFileType.PARQUET:
+            self._check_parquet(name, compression)
+            file_client = self._get_file_client(directory, name)
+            # pyarrow reads the footer with a few ranged reads, no buffering
+            with DatalakeFile(file_client, size) as file:
+                return pq.ParquetFile(file).metadata.num_rows
+
+        if filetype is None:
+            # empty lines are skipped like by `iter_jsonlines`
+            return sum(1 for line in self.iter_lines(directory, name, compression) if line.strip())
+
+        lines = 0
+        empty = True
+        lastbyte = b'\n'
+        for chunk in self.iter_chunks(directory, name, compression):
+            if chunk:
+                empty = False
+                lines += chunk.count(b'\n')
+                lastbyte = chunk[-1:]
+        if empty:
+            return 0
+        if lastbyte != b'\n':
+            # the last line has no line break
+            lines += 1
+        if header:
+            lines -= 1
+        return max(lines, 0)
+
+    def iter_parquet(self, foldername: str, filename: str, batch_size: int = 10000, columns: list[str] = None):
+        """Iterates over the records of a Parquet file as dictionaries by 
+        column name. The file is read batch by batch via ranged reads."""
+
+        with self.open_file(foldername, filename) as file:
+            parquetfile = pq.ParquetFile(file)
+            for batch in parquetfile.iter_batches(batch_size=batch_size, columns=columns):
+                yield from batch.to_pylist()
+
+
+class DatalakeListing:
+    """The files below a folder indexed by their directories."""
+
+    def __init__(self, foldername: str, paths: list[str], properties: dict[str, tuple] = None) -> None:
+        self._foldername = foldername
+        self._properties = properties if properties is not None else {}
+        self._directories = {}
+        for path in paths:
+            directory, separator, name = path.rpartition('/')
+            self._directories.setdefault(directory, set()).add(name)
+
+    @property
+    def foldername(self) -> str:
+        return self._foldername
+
+    def contains(self, path: str) -> bool:
+        directory, separator, name = path.rpartition('/')
+        return name in self._directories.get(directory, ())
+
+    def get_etag(self, path: str) -> str:
+        return self._properties.get(path, (None, None))[0]
+
+    def get_size(self, path: str) -> int:
+        return self._properties.get(path, (None, None))[1]
+
+    def files_in(self, directory: str) -> list[str]:
+        """Gets the names of the files directly in the given directory."""
+        return sorted(self._directories.get(directory.rstrip('/'), ()))
+
+    @property
+    def paths(self) -> list[str]:
+        return sorted(f'{directory}/{name}' if directory else name
+                      for directory, names in self._directories.items() for name in names)
+
+    def __len__(self) -> int:
+        return sum(len(names) for names in self._directories.values())
+
+
+class DatalakeFile(io.RawIOBase):
+    """A seekable, read-only file object for a file in the data lake that 
+    downloads the requested ranges on demand."""
+
+    def __init__(self, file_client, size: int = None) -> None:
+        self._file_client = file_client
+        self._size = size if size is not None else file_client.get_file_properties().size
+        self._position = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self._size + offset
+        else:
+            raise ValueError(f'Invalid whence {whence}')
+        if position < 0:
+            raise ValueError('Negative seek position')
+        self._position = position
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        length = min(len(buffer), self._size - self._position)
+        if length <= 0:
+            return 0
+
+        data = self._file_client.download_file(
+            offset=self._position, length=length).readall()
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
 
 class DatalakeConnectionData(ConnectionDataBase):
 
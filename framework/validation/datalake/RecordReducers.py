@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+
+
+class RecordReducer:
+    """Reduces a stream of records to a result, e.g. the number of records.
+
+    `DatalakeClient.aggregate` reduces every file with its own reducer created
+    by `spawn` and merges these into the original reducer, so the files can be
+    read in parallel without locking."""
+
+    def spawn(self) -> RecordReducer:
+        """Creates an empty reducer of the same kind."""
+        raise NotImplementedError()
+
+    def add(self, record) -> None:
+        raise NotImplementedError()
+
+    def merge(self, other: RecordReducer) -> None:
+        raise NotImplementedError()
+
+    @property
+    def result(self):
+        raise NotImplementedError()
+
+
+class RecordCount(RecordReducer):
+    """Counts the records."""
+
+    def __init__(self) -> None:
+        self._count = 0
+
+    def spawn(self) -> RecordCount:
+        return RecordCount()
+
+    def add(self, record) -> None:
+        self._count += 1
+
+    def merge(self, other: RecordCount) -> None:
+        self._count += other._count
+
+    @property
+    def result(self) -> int:
+        return self._count
+
+
+def _values(record, columns: list[str]) -> list:
+    if isinstance(record, dict):
+        if columns is None:
+            return list(record.values())
+        return [record[column] for column in columns]
+    return list(record)
+
+
+class KeySet(RecordReducer):
+    """Collects the keys of the records and counts keys that occur more than
+    once. Records are dictionaries, or lists if no key columns are given."""
+
+    def __init__(self, key_columns: list[str] = None) -> None:
+        self._key_columns = key_columns
+        self._keys = set()
+        self._duplicates = 0
+
+    def spawn(self) -> KeySet:
+        return KeySet(self._key_columns)
+
+    def add(self, record) -> None:
+        key = tuple(str(value) for value in _values(record, self._key_columns))
+        if key in self._keys:
+            self._duplicates += 1
+        else:
+            self._keys.add(key)
+
+    def merge(self, other: KeySet) -> None:
+        self._duplicates += other._duplicates + len(self._keys & other._keys)
+        self._keys |= other._keys
+
+    @property
+    def duplicates(self) -> int:
+        return self._duplicates
+
+    @property
+    def result(self) -> set[tuple]:
+        """The keys as tuples of strings"""
+        return self._keys
+
+
+class RecordChecksum(RecordReducer):
+    """Computes a checksum of the records that doesn't depend on their order,
+    so it is the same no matter how the records are split into files."""
+
+    _MODULUS = 2 ** 128
+
+    def __init__(self, columns: list[str] = None) -> None:
+        self._columns = columns
+        self._sum = 0
+
+    def spawn(self) -> RecordChecksum:
+        return RecordChecksum(self._columns)
+
+    def add(self, record) -> None:
+        value = '|'.join('' if value is None else str(value)
+                         for value in _values(record, self._columns))
+        digest = hashlib.md5(value.encode('utf-8')).digest()
+        self._sum = (self._sum + int.from_bytes(digest, 'big')) % self._MODULUS
+
+    def merge(self, other: RecordChecksum) -> None:
+        self._sum = (self._sum + other._sum) % self._MODULUS
+
+    @property
+    def result(self) -> str:
+        return f'{self._sum:032x}'
+
+
+class CombinedReducer(RecordReducer):
+    """Feeds the records into several reducers at once, the result is a
+    dictionary of their results by name."""
+
+    def __init__(self, **reducers: RecordReducer) -> None:
+        self._reducers = reducers
+
+    def spawn(self) -> CombinedReducer:
+        return CombinedReducer(**{name: reducer.spawn() for name, reducer in self._reducers.items()})
+
+    def add(self, record) -> None:
+        for reducer in self._reducers.values():
+            reducer.add(record)
+
+    def merge(self, other: CombinedReducer) -> None:
+        for name, reducer in self._reducers.items():
+            reducer.merge(other._reducers[name])
+
+    def __getitem__(self, name: str) -> RecordReducer:
+        return self._reducers[name]
+
+    @property
+    def result(self) -> dict:
+        return {name: reducer.result for name, reducer in self._reducers.items()}
+
+
+class FunctionReducer(RecordReducer):
+    """Calls a function with every record. The calls are serialized, so the
+    function doesn't need to be thread-safe. The result is None."""
+
+    def __init__(self, function, lock=None) -> None:
+        self._function = function
+        self._lock = lock if lock is not None else threading.Lock()
+
+    def spawn(self) -> FunctionReducer:
+        return FunctionReducer(self._function, self._lock)
+
+    def add(self, record) -> None:
+        with self._lock:
+            self._function(record)
+
+    def merge(self, other: FunctionReducer) -> None:
+        pass
+
+    @property
+    def result(self):
+        return None
@@ -1,15 +1,20 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
 from hdbcli import dbapi
 
 from framework.infrastructure.utils.ConnectionDataBase import ConnectionDataBase
+from framework.validation.hana.HanaConnectionPool import HanaConnectionPool
 
 
 class HanaClient:
 
     def __init__(self) -> None:
         self._connection = None
+        self._pool = None
 
     @staticmethod
     def connect_to(connection_data: HanaConnectionData = None, **kwargs) -> HanaClient:
@@ -25,31 +30,444 @@ class HanaClient:
                 password=connection_data.password)
         return hanaClient
 
+    @staticmethod
+    def connect_pooled(connection_data: HanaConnectionData, minsize: int = 1, maxsize: int = 8) -> HanaClient:
+        """Creates a HanaClient that borrows a connection from a pool for
+        every operation, so that it can be used by many threads at once."""
+
+        return HanaClient.with_pool(HanaConnectionPool(connection_data, minsize, maxsize))
+
+    @staticmethod
+    def with_pool(pool: HanaConnectionPool) -> HanaClient:
+        hanaClient = HanaClient()
+        hanaClient._pool = pool
+        return hanaClient
+
+    @property
+    def pool(self) -> HanaConnectionPool:
+        """The connection pool of the client or None if the client uses a 
+        single connection."""
+        return self._pool
+
+    @contextmanager
+    def _cursor(self):
+        """Provides a cursor for the duration of the with block. If the client
+        has a pool the cursor belongs to a connection borrowed from the pool."""
+
+        if self._pool is None:
+            cursor = self._connection.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+        else:
+            with self._pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+
     def get_rowcount(self, schemaname: str, tablename: str) -> int:
-        cursor = self._connection.cursor()
         sql_command = f'SELECT "RECORD_COUNT" FROM "SYS"."M_TABLES" WHERE SCHEMA_NAME = \'{schemaname}\' AND TABLE_NAME = \'{tablename}\''
-        cursor.execute(sql_command)
-        rows = cursor.fetchall()
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
+            rows = cursor.fetchall()
         return rows[0][0]
 
+    def get_rowcounts(self, schemaname: str, tablenames: list[str], exact: bool = False) -> dict[str, int]:
+        """
+        Gets the number of records of many tables of a schema at once.
+
+        Parameters
+        ----------
+        schemaname : str
+            The name of the schema.
+        tablenames : list[str]
+            The names of the tables.
+        exact : bool
+            If `False` (default) the counts of all tables are read with a 
+            single query from SYS.M_TABLES like `get_rowcount` does. If `True`
+            the records are counted via COUNT(*), one query per table. These 
+            queries run in parallel if the client has a connection pool.
+
+        Returns
+        -------
+        dict[str, int]
+            The number of records per table name. Tables that don't exist are
+            missing in the result.
+        """
+        counts = self.get_rowcounts_across_schemas(
+            [(schemaname, tablename) for tablename in tablenames], exact)
+        return {tablename: count for (schema, tablename), count in counts.items()}
+
+    def get_rowcounts_across_schemas(self, tables: list[tuple[str, str]], exact: bool = False) -> dict[tuple[str, str], int]:
+        """
+        Gets the number of records of many tables in different schemas at 
+        once. The tables are given as (schema name, table name) tuples which 
+        are also the keys of the result. See `get_rowcounts` for details.
+        """
+        if len(tables) == 0:
+            return {}
+
+        if exact:
+            return self._count_exact(tables)
+
+        tablesbyschema = {}
+        for schemaname, tablename in tables:
+            tablesbyschema.setdefault(schemaname, []).append(tablename)
+
+        conditions = []
+        for schemaname, tablenames in tablesbyschema.items():
+            tablelist = ', '.join(
+                f'\'{tablename}\'' for tablename in tablenames)
+            conditions.append(
+                f'(SCHEMA_NAME = \'{schemaname}\' AND TABLE_NAME IN ({tablelist}))')
+
+        sql_command = ('SELECT "SCHEMA_NAME", "TABLE_NAME", "RECORD_COUNT" FROM "SYS"."M_TABLES" WHERE '
+                       + ' OR '.join(conditions))
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
+            rows = cursor.fetchall()
+        return {(row[0], row[1]): row[2] for row in rows}
+
+    def _count_exact(self, tables: list[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        def count(table: tuple[str, str]) -> int:
+            schemaname, tablename = table
+            sql_command = f'SELECT COUNT(*) FROM "{schemaname}"."{tablename}"'
+            with self._cursor() as cursor:
+                cursor.execute(sql_command)
+                rows = cursor.fetchall()
+            return rows[0][0]
+
+        # a single connection can only run one query at a time
+        max_workers = 1 if self._pool is None else self._pool.maxsize
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            counts = executor.map(count, tables)
+            return dict(zip(tables, counts))
+
     def get_rows_by_offset(self, schemaname: str, tablename: str, limit: int, offset: int, columnname: str = None, isDesc: bool = False):
-        cursor = self._connection.cursor()
         order = "DESC" if isDesc else "ASC"
         if columnname is not None:
             sql_command = f'SELECT * FROM {schemaname}.{tablename} ORDER BY {columnname} {order} LIMIT {limit} OFFSET {offset}'
         else:
             sql_command = f'SELECT * FROM {schemaname}.{tablename} LIMIT {limit} OFFSET {offset}'
-        cursor.execute(sql_command)
-        rows = cursor.fetchall()
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
+            rows = cursor.fetchall()
+        return rows
+
+    def iter_rows(self, schemaname: str, tablename: str, key_columns: list[str], batch_size: int = 10000):
+        """
+        Iterates over all rows of a table ordered by the key columns.
+
+        The rows are read in batches with keyset pagination: each batch 
+        continues after the key of the last row of the previous batch instead
+        of using an OFFSET, so every batch costs the same regardless of its 
+        position in the table and at most one batch is held in memory. Prefer
+        this over paging with `get_rows_by_offset` for large tables.
+
+        Parameters
+        ----------
+        schemaname : str
+            The name of the schema.
+        tablename : str
+            The name of the table.
+        key_columns : list[str]
+            The columns that uniquely identify a row, e.g. the primary key.
+        batch_size : int
+            The number of rows that are read per query.
+
+        Yields
+        ------
+        tuple
+            The rows of the table.
+        """
+        if len(key_columns) == 0:
+            raise ValueError('At least one key column is required!')
+        if batch_size < 1:
+            raise ValueError('The batch size must be greater than zero!')
+
+        orderby = ', '.join(f'"{column}"' for column in key_columns)
+        keypositions = None
+        lastkey = None
+        while True:
+            sql_command = f'SELECT * FROM "{schemaname}"."{tablename}"'
+            parameters = []
+            if lastkey is not None:
+                condition, parameters = self._keyset_condition(
+                    key_columns, lastkey)
+                sql_command += f' WHERE {condition}'
+            sql_command += f' ORDER BY {orderby} LIMIT {batch_size}'
+
+            count = 0
+            with self._cursor() as cursor:
+                cursor.execute(sql_command, parameters)
+                if keypositions is None:
+                    keypositions = self._column_positions(
+                        cursor.description, key_columns)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
+                    count += len(rows)
+                    lastrow = rows[-1]
+
+            if count < batch_size:
+                return
+            lastkey = [lastrow[position] for position in keypositions]
+
+    @staticmethod
+    def _keyset_condition(key_columns: list[str], lastkey: list) -> tuple[str, list]:
+        """Builds the condition (k1 > ?) OR (k1 = ? AND k2 > ?) OR ... which
+        selects the rows after the given key in the order of the key columns."""
+
+        conditions = []
+        parameters = []
+        for i, column in enumerate(key_columns):
+            terms = [f'"{key_columns[j]}" = ?' for j in range(i)]
+            terms.append(f'"{column}" > ?')
+            conditions.append('(' + ' AND '.join(terms) + ')')
+            parameters.extend(lastkey[:i + 1])
+        return ' OR '.join(conditions), parameters
+
+    @staticmethod
+    def _column_positions(description, columns: list[str]) -> list[int]:
+        names = [entry[0].upper() for entry in description]
+        positions = []
+        for column in columns:
+            if column.upper() not in names:
+                raise ValueError(
+                    f'The column {column} is not part of the result!')
+            positions.append(names.index(column.upper()))
+        return positions
+
+    def fingerprint(self, schemaname: str, tablename: str, key_columns: list[str], buckets: int = 64,
+                    columns: list[str] = None) -> list[BucketFingerprint]:
+        """
+        Computes checksums of the content of a table inside of HANA.
+
+        The rows are split by the order of the key columns into `buckets` 
+        ranges of the same size. For every range HANA hashes each row, 
+        combines the row hashes into a checksum, see `format_checksum`, and 
+        returns it together with the number of rows and the first and last key
+        of the range. So only one small row per bucket is transferred, independent of
+        the size of the table. Two tables have the same content if all their
+        buckets match.
+
+        Parameters
+        ----------
+        schemaname : str
+            The name of the schema.
+        tablename : str
+            The name of the table.
+        key_columns : list[str]
+            The columns that uniquely identify a row, e.g. the primary key.
+        buckets : int
+            The number of key ranges.
+        columns : list[str]
+            The columns that are part of the checksum, all columns of the table
+            if not given.
+
+        Returns
+        -------
+        list[BucketFingerprint]
+            The fingerprints of the non-empty buckets in key order.
+        """
+        if len(key_columns) == 0:
+            raise ValueError('At least one key column is required!')
+        if buckets < 1:
+            raise ValueError('The number of buckets must be greater than zero!')
+
+        if columns is None:
+            columns = self.get_columnnames(schemaname, tablename)
+
+        sql_command = self._fingerprint_sql(
+            schemaname, tablename, key_columns, buckets, columns)
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
+            rows = cursor.fetchall()
+
+        keycount = len(key_columns)
+        fingerprints = []
+        for row in rows:
+            fingerprints.append(BucketFingerprint(
+                row[0], row[1], tuple(row[2:2 + keycount]), tuple(row[2 + keycount:2 + 2 * keycount]),
+                self.format_checksum(row[2 + 2 * keycount:])))
+        return fingerprints
+
+    # The MD5 hash of a row is split into two 60 bit integers, (start, length)
+    # of their hex digits. The sums of these integers over the rows form the
+    # checksum. Unlike a hash of the concatenated row hashes it doesn't depend
+    # on the order of the rows and stays small for any number of rows.
+    ROWHASH_PARTS = [(1, 15), (16, 15)]
+
+    @staticmethod
+    def _checksum_sql(rowhash: str) -> str:
+        """The aggregates over the hex MD5 row hashes the checksum is formed of."""
+
+        return ', '.join(f'SUM(TO_DECIMAL(HEXTONUM(SUBSTRING({rowhash}, {start}, {length})), 38, 0))'
+                         for start, length in HanaClient.ROWHASH_PARTS)
+
+    @staticmethod
+    def format_checksum(sums) -> str:
+        """Formats the sums of the row hash parts as checksum, None if there
+        were no rows."""
+
+        if any(value is None for value in sums):
+            return None
+        return '-'.join(f'{int(value):x}' for value in sums)
+
+    @staticmethod
+    def _fingerprint_sql(schemaname: str, tablename: str, key_columns: list[str], buckets: int,
+                         columns: list[str]) -> str:
+        keys = ', '.join(f'"{column}"' for column in key_columns)
+        rowvalue = " || '|' || ".join(
+            f'IFNULL(TO_NVARCHAR("{column}"), \'<NULL>\')' for column in columns)
+        firstkey = ', '.join(
+            f'MAX(CASE WHEN "ROWNUMBER" = 1 THEN "{column}" END)' for column in key_columns)
+        lastkey = ', '.join(
+            f'MAX(CASE WHEN "ROWNUMBER" = "BUCKETSIZE" THEN "{column}" END)' for column in key_columns)
+
+        hashed = (f'SELECT {keys}, NTILE({buckets}) OVER (ORDER BY {keys}) AS "BUCKET", '
+                  f'BINTOHEX(HASH_MD5(TO_BINARY({rowvalue}))) AS "ROWHASH" '
+                  f'FROM "{schemaname}"."{tablename}"')
+        numbered = (f'SELECT *, ROW_NUMBER() OVER (PARTITION BY "BUCKET" ORDER BY {keys}) AS "ROWNUMBER", '
+                    f'COUNT(*) OVER (PARTITION BY "BUCKET") AS "BUCKETSIZE" FROM ({hashed})')
+        checksum = HanaClient._checksum_sql('"ROWHASH"')
+        return (f'SELECT "BUCKET", COUNT(*), {firstkey}, {lastkey}, {checksum} '
+                f'FROM ({numbered}) GROUP BY "BUCKET" ORDER BY "BUCKET"')
+
+    def get_partition_boundaries(self, schemaname: str, tablename: str, columnname: str, partitions: int,
+                                 lower=None, upper=None) -> list:
+        """
+        Gets the values of a column that split the rows with lower <= value < 
+        upper into `partitions` partitions of about the same size. A bound of
+        None means that the range is open on that side.
+
+        Returns
+        -------
+        list
+            The distinct lowest values of the partitions in ascending order.
+        """
+        condition, parameters = self._range_condition(columnname, lower, upper)
+        sql_command = (f'SELECT MIN("{columnname}") FROM (SELECT "{columnname}", '
+                       f'NTILE({partitions}) OVER (ORDER BY "{columnname}") AS "PARTITION" '
+                       f'FROM "{schemaname}"."{tablename}" WHERE {condition}) '
+                       f'GROUP BY "PARTITION" ORDER BY 1')
+        with self._cursor() as cursor:
+            cursor.execute(sql_command, parameters)
+            rows = cursor.fetchall()
+
+        boundaries = []
+        for row in rows:
+            if len(boundaries) == 0 or boundaries[-1] != row[0]:
+                boundaries.append(row[0])
+        return boundaries
+
+    def get_partition_digests(self, schemaname: str, tablename: str, columnname: str, ranges: list[tuple],
+                              key_columns: list[str], columns: list[str]) -> list[tuple[int, str]]:
+        """
+        Computes the number of rows and a checksum of the rows for each range
+        of values of a column inside of HANA.
+
+        The checksum is formed of the MD5 hashes of the rows, see 
+        `format_checksum`, so it doesn't depend on the order of the rows. The
+        hashed value of a row are the trimmed string values of the columns 
+        joined by '|', NULL counts as an empty string. This allows to compute
+        the same checksum for other systems on the client side.
+
+        Parameters
+        ----------
+        columnname : str
+            The column the ranges refer to.
+        ranges : list[tuple]
+            (lower, upper) tuples with lower <= value < upper, None means that
+            the range is open on that side. The ranges must not overlap.
+        key_columns : list[str]
+            The columns that identify a row.
+        columns : list[str]
+            The columns that are part of the checksum.
+
+        Returns
+        -------
+        list[tuple[int, str]]
+            The number of rows and the hex checksum per range, the checksum of
+            an empty range is None.
+        """
+        if len(ranges) == 0:
+            return []
+
+        rowvalue = " || '|' || ".join(
+            f'IFNULL(LTRIM(RTRIM(TO_NVARCHAR("{column}"))), \'\')' for column in columns)
+
+        cases = []
+        parameters = []
+        for i, (lower, upper) in enumerate(ranges):
+            condition, rangeparameters = self._range_condition(
+                columnname, lower, upper)
+            cases.append(f'WHEN {condition} THEN {i}')
+            parameters.extend(rangeparameters)
+
+        partitioned = (f'SELECT CASE {" ".join(cases)} END AS "PARTITION", '
+                       f'BINTOHEX(HASH_MD5(TO_BINARY({rowvalue}))) AS "ROWHASH" '
+                       f'FROM "{schemaname}"."{tablename}"')
+        checksum = self._checksum_sql('"ROWHASH"')
+        sql_command = (f'SELECT "PARTITION", COUNT(*), {checksum} '
+                       f'FROM ({partitioned}) WHERE "PARTITION" IS NOT NULL GROUP BY "PARTITION"')
+        with self._cursor() as cursor:
+            cursor.execute(sql_command, parameters)
+            rows = cursor.fetchall()
+
+        digests = [(0, None)] * len(ranges)
+        for row in rows:
+            digests[row[0]] = (row[1], self.format_checksum(row[2:]))
+        return digests
+
+    def get_rows_in_range(self, schemaname: str, tablename: str, columnname: str, lower, upper,
+                          columns: list[str]) -> list:
+        """Gets the given columns of the rows with lower <= value < upper for
+        the given column. A bound of None means that the range is open on that
+        side."""
+
+        condition, parameters = self._range_condition(columnname, lower, upper)
+        selection = ', '.join(f'"{column}"' for column in columns)
+        sql_command = f'SELECT {selection} FROM "{schemaname}"."{tablename}" WHERE {condition}'
+        with self._cursor() as cursor:
+            cursor.execute(sql_command, parameters)
+            rows = cursor.fetchall()
         return rows
 
+    @staticmethod
+    def _range_condition(columnname: str, lower, upper) -> tuple[str, list]:
+        terms = []
+        parameters = []
+        if lower is not None:
+            terms.append(f'"{columnname}" >= ?')
+            parameters.append(lower)
+        if upper is not None:
+            terms.append(f'"{columnname}" < ?')
+            parameters.append(upper)
+        if len(terms) == 0:
+            return '1 = 1', parameters
+        return '(' + ' AND '.join(terms) + ')', parameters
+
+    def get_columnnames(self, schemaname: str, tablename: str) -> list[str]:
+        """Gets the names of the columns of a table in their order."""
+
+        sql_command = ('SELECT "COLUMN_NAME" FROM "SYS"."TABLE_COLUMNS" WHERE '
+                       f'SCHEMA_NAME = \'{schemaname}\' AND TABLE_NAME = \'{tablename}\' ORDER BY "POSITION"')
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
+            rows = cursor.fetchall()
+        return [row[0] for row in rows]
+
     def drop_table(self, schemaname: str, tablename: str) -> None:
-        cursor = self._connection.cursor()
         sql_command = f'DROP TABLE {schemaname}.{tablename}'
-        cursor.execute(sql_command)
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
 
     def table_exists(self, schema_name: str, table_name: str) -> bool:
         """
@@ -68,14 +486,13 @@ class HanaClient:
         bool
             `True` if the table exists, otherwise `False`
         """
-        cursor = self._connection.cursor()
         sql_command = ('SELECT * FROM OBJECTS WHERE '
                        'OBJECT_TYPE=\'TABLE\' AND '
                        f'SCHEMA_NAME=\'{schema_name}\' AND '
                        f'OBJECT_NAME=\'{table_name}\'')
-        cursor.execute(sql_command)
-        rows = cursor.fetchall()
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
+            rows = cursor.fetchall()
         return len(rows) > 0
 
     def create_schema(self, schema_name: str) -> None:
@@ -87,10 +504,9 @@ class HanaClient:
         schema_name : str
             The name of the schema to be created.        
         """
-        cursor = self._connection.cursor()
         sql_command = f'CREATE SCHEMA "{schema_name}"'
-        cursor.execute(sql_command)
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
 
     def delete_schema(self, schema_name: str) -> None:
         """
@@ -101,10 +517,9 @@ class HanaClient:
         schema_name : str
             The name of the schema to be deleted.        
         """
-        cursor = self._connection.cursor()
         sql_command = f'DROP SCHEMA "{schema_name}" CASCADE'
-        cursor.execute(sql_command)
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
 
     def schema_exists(self, schema_name: str) -> bool:
         """
@@ -121,14 +536,53 @@ class HanaClient:
         bool
             `True` if the schema exists, otherwise `False`
         """
-        cursor = self._connection.cursor()
         sql_command = f'SELECT * FROM "SYS"."SCHEMAS" WHERE (SCHEMA_NAME = \'{schema_name}\')'
-        cursor.execute(sql_command)
-        rows = cursor.fetchall()
-        cursor.close()
+        with self._cursor() as cursor:
+            cursor.execute(sql_command)
+            rows = cursor.fetchall()
         return len(rows) > 0
 
 
+class BucketFingerprint:
+    """The checksum of the rows of a table within a range of keys."""
+
+    def __init__(self, bucket: int, rowcount: int, firstkey: tuple, lastkey: tuple, checksum: str) -> None:
+        self._bucket = bucket
+        self._rowcount = rowcount
+        self._firstkey = firstkey
+        self._lastkey = lastkey
+        self._checksum = checksum
+
+    @property
+    def bucket(self) -> int:
+        return self._bucket
+
+    @property
+    def rowcount(self) -> int:
+        return self._rowcount
+
+    @property
+    def firstkey(self) -> tuple:
+        return self._firstkey
+
+    @property
+    def lastkey(self) -> tuple:
+        return self._lastkey
+
+    @property
+    def checksum(self) -> str:
+        return self._checksum
+
+    def matches(self, other: BucketFingerprint) -> bool:
+        """Checks whether both buckets cover the same keys with the same content."""
+        return (self._rowcount == other.rowcount and self._firstkey == other.firstkey
+                and self._lastkey == other.lastkey and self._checksum == other.checksum)
+
+    def __str__(self) -> str:
+        return (f'Bucket:\t{self.bucket}, Rows:\t{self.rowcount}, First key:\t{self.firstkey}, '
+                f'Last key:\t{self.lastkey}, Checksum:\t{self.checksum}')
+
+
 class HanaConnectionData(ConnectionDataBase):
 
     property_names = ['address', 'port', 'user', 'password']
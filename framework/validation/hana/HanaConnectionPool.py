@@ -0,0 +1,316 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from time import monotonic
+
+from hdbcli import dbapi
+
+if TYPE_CHECKING:
+    from framework.validation.hana.HanaClient import HanaConnectionData
+
+
+class HanaConnectionPool:
+    """A thread-safe pool of connections to a HANA database.
+
+    The pool opens `minsize` connections up front and grows up to `maxsize`
+    connections on demand. Connections are checked for liveness when they are
+    borrowed: a connection that has been idle for longer than `pingafter`
+    seconds is pinged with a query, because the client doesn't notice when
+    the server or a firewall dropped it. Connections that have been idle for
+    longer than `maxidle` seconds are closed as long as more than `minsize`
+    connections remain. If all connections are in use, borrowing waits at
+    most `timeout` seconds.
+    """
+
+    PING_SQL = 'SELECT 1 FROM DUMMY'
+
+    def __init__(self, connection_data: HanaConnectionData, minsize: int = 1, maxsize: int = 8,
+                 maxidle: float = 300.0, timeout: float = 30.0, connect=None,
+                 pingafter: float = 30.0) -> None:
+        if minsize < 0 or maxsize < 1 or minsize > maxsize:
+            raise ValueError(
+                'The pool size must satisfy 0 <= minsize <= maxsize and maxsize >= 1!')
+
+        self._connection_data = connection_data
+        self._minsize = minsize
+        self._maxsize = maxsize
+        self._maxidle = maxidle
+        self._timeout = timeout
+        self._pingafter = pingafter
+        self._connect = connect if connect is not None else self._connect_to_hana
+
+        self._condition = threading.Condition()
+        # idle connections with the time they were returned, most recent last
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._created = 0
+        self._evicted = 0
+        self._broken = 0
+        self._totalwaittime = 0.0
+        self._maxwaittime = 0.0
+
+        try:
+            for i in range(minsize):
+                self._idle.append((self._create(), monotonic()))
+        except BaseException:
+            for connection, returned in self._idle:
+                self._close(connection)
+            raise
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def _connect_to_hana(self):
+        return dbapi.connect(
+            address=self._connection_data.address,
+            port=self._connection_data.port,
+            user=self._connection_data.user,
+            password=self._connection_data.password)
+
+    def _create(self):
+        connection = self._connect()
+        self._size += 1
+        self._created += 1
+        return connection
+
+    def _is_alive(self, connection, idletime: float = None) -> bool:
+        """Checks whether a connection can be used. Unless it was used less
+        than `pingafter` seconds ago, it is pinged with a round-trip to the
+        server."""
+
+        try:
+            if not connection.isconnected():
+                return False
+            if idletime is not None and idletime < self._pingafter:
+                return True
+            cursor = connection.cursor()
+            try:
+                cursor.execute(self.PING_SQL)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(connection) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _evict_idle(self) -> None:
+        """Closes the connections that have been idle for too long. Must be
+        called while holding the lock."""
+
+        now = monotonic()
+        while self._idle and self._size > self._minsize:
+            connection, returned = self._idle[0]
+            if now - returned < self._maxidle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._evicted += 1
+            self._close(connection)
+
+    def acquire(self, timeout: float = None):
+        """Borrows a connection from the pool. The connection must be given
+        back via `release`, preferably use `connection` instead.
+
+        Raises
+        ------
+        TimeoutError
+            If no connection became available within the timeout.
+        """
+
+        timeout = self._timeout if timeout is None else timeout
+        start = monotonic()
+        deadline = start + timeout
+        while True:
+            with self._condition:
+                idle = self._take_idle(deadline, timeout)
+            if idle is None:
+                break
+
+            # pinged outside of the lock, so that other threads are not
+            # blocked by the round-trip
+            connection, returned = idle
+            if self._is_alive(connection, monotonic() - returned):
+                with self._condition:
+                    self._record_checkout(start)
+                return connection
+
+            with self._condition:
+                self._size -= 1
+                self._broken += 1
+                self._condition.notify()
+            self._close(connection)
+
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+        with self._condition:
+            self._created += 1
+            self._record_checkout(start)
+        return connection
+
+    def _take_idle(self, deadline: float, timeout: float):
+        """Takes the most recently returned idle connection with the time it
+        was returned or reserves the slot of a new connection and returns
+        None. Must be called while holding the lock."""
+
+        while True:
+            if self._closed:
+                raise RuntimeError('The connection pool has been closed!')
+
+            self._evict_idle()
+            if self._idle:
+                return self._idle.pop()
+
+            if self._size < self._maxsize:
+                # reserve the slot, the connection is opened outside of
+                # the lock so that other threads are not blocked
+                self._size += 1
+                return None
+
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                raise TimeoutError(
+                    f'No HANA connection available after {timeout} seconds')
+            self._condition.wait(remaining)
+
+    def _record_checkout(self, start: float) -> None:
+        waittime = monotonic() - start
+        self._checkouts += 1
+        self._totalwaittime += waittime
+        self._maxwaittime = max(self._maxwaittime, waittime)
+
+    def release(self, connection) -> None:
+        """Gives a borrowed connection back to the pool."""
+
+        with self._condition:
+            if self._closed:
+                self._size -= 1
+                self._close(connection)
+            else:
+                self._idle.append((connection, monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection) -> None:
+        """Removes a borrowed connection from the pool, e.g. because it broke."""
+
+        with self._condition:
+            self._size -= 1
+            self._broken += 1
+            self._close(connection)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """Borrows a connection for the duration of the with block."""
+
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except dbapi.Error:
+            if self._is_alive(connection):
+                self.release(connection)
+            else:
+                self.discard(connection)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        else:
+            self.release(connection)
+
+    def close(self) -> None:
+        """Closes all idle connections. Connections that are still borrowed
+        are closed when they are given back."""
+
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                connection, returned = self._idle.pop()
+                self._size -= 1
+                self._close(connection)
+            self._condition.notify_all()
+
+    def statistics(self) -> HanaConnectionPoolStatistics:
+        with self._condition:
+            return HanaConnectionPoolStatistics(
+                self._size, len(self._idle), self._checkouts, self._created, self._evicted,
+                self._broken, self._totalwaittime, self._maxwaittime)
+
+
+class HanaConnectionPoolStatistics:
+    """A snapshot of the usage of a HanaConnectionPool."""
+
+    def __init__(self, size: int, idle: int, checkouts: int, created: int, evicted: int, broken: int,
+                 totalwaittime: float, maxwaittime: float) -> None:
+        self._size = size
+        self._idle = idle
+        self._checkouts = checkouts
+        self._created = created
+        self._evicted = evicted
+        self._broken = broken
+        self._totalwaittime = totalwaittime
+        self._maxwaittime = maxwaittime
+
+    @property
+    def size(self) -> int:
+        """The number of open connections"""
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """The number of open connections that are not borrowed"""
+        return self._idle
+
+    @property
+    def checkouts(self) -> int:
+        return self._checkouts
+
+    @property
+    def created(self) -> int:
+        return self._created
+
+    @property
+    def evicted(self) -> int:
+        """The number of connections closed because they were idle too long"""
+        return self._evicted
+
+    @property
+    def broken(self) -> int:
+        """The number of connections dropped because they were not alive"""
+        return self._broken
+
+    @property
+    def averagewaittime(self) -> float:
+        """The average time in seconds it took to borrow a connection"""
+        if self._checkouts == 0:
+            return 0.0
+        return self._totalwaittime / self._checkouts
+
+    @property
+    def maxwaittime(self) -> float:
+        """The longest time in seconds it took to borrow a connection"""
+        return self._maxwaittime
+
+    def __str__(self) -> str:
+        return (f'Size:\t{self.size}, Idle:\t{self.idle}, Checkouts:\t{self.checkouts}, '
+                f'Created:\t{self.created}, Evicted:\t{self.evicted}, Broken:\t{self.broken}, '
+                f'Average wait:\t{self.averagewaittime:.3f}s, Max wait:\t{self.maxwaittime:.3f}s')
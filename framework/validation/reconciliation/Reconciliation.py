@@ -0,0 +1,561 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterator
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from enum import Enum
+from time import monotonic
+
+if TYPE_CHECKING:
+    from framework.validation.abap.CitAbapClient import CitAbapClient
+    from framework.validation.hana.HanaClient import HanaClient
+
+
+class KeyRange:
+    """The values lower <= value < upper of the partition column. A bound of
+    None means that the range is open on that side."""
+
+    def __init__(self, lower=None, upper=None) -> None:
+        self._lower = lower
+        self._upper = upper
+
+    @property
+    def lower(self):
+        return self._lower
+
+    @property
+    def upper(self):
+        return self._upper
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, KeyRange) and self._lower == other.lower and self._upper == other.upper
+
+    def __hash__(self) -> int:
+        return hash((self._lower, self._upper))
+
+    def __str__(self) -> str:
+        lower = '-inf' if self._lower is None else self._lower
+        upper = '+inf' if self._upper is None else self._upper
+        return f'[{lower}, {upper})'
+
+
+class PartitionDigest:
+    """The number of rows and the checksum of the rows of a key range."""
+
+    def __init__(self, rowcount: int, checksum: str) -> None:
+        self._rowcount = rowcount
+        self._checksum = checksum
+
+    @property
+    def rowcount(self) -> int:
+        return self._rowcount
+
+    @property
+    def checksum(self) -> str:
+        return self._checksum
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, PartitionDigest) and self._rowcount == other.rowcount
+                and self._checksum == other.checksum)
+
+    def __str__(self) -> str:
+        return f'Rows:\t{self.rowcount}, Checksum:\t{self.checksum}'
+
+
+def normalize(value) -> str:
+    """The representation of a value that is compared between the systems."""
+
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+# the (start, length) of the parts of the hex MD5 row hashes that are summed
+# up, 0-based, the same as `HanaClient.ROWHASH_PARTS`
+ROWHASH_PARTS = [(0, 15), (15, 15)]
+
+
+class DigestAccumulator:
+    """Sums up the row hashes of a key range row by row, so that the digest
+    can be computed while the rows are streamed."""
+
+    def __init__(self) -> None:
+        self._rowcount = 0
+        self._sums = [0] * len(ROWHASH_PARTS)
+
+    def add(self, values: tuple) -> None:
+        rowhash = hashlib.md5('|'.join(values).encode('utf-8')).hexdigest()
+        for i, (start, length) in enumerate(ROWHASH_PARTS):
+            self._sums[i] += int(rowhash[start:start + length], 16)
+        self._rowcount += 1
+
+    @property
+    def digest(self) -> PartitionDigest:
+        if self._rowcount == 0:
+            return PartitionDigest(0, None)
+        return PartitionDigest(self._rowcount, '-'.join(f'{value:x}' for value in self._sums))
+
+
+def compute_digest(rows: list[tuple[tuple, tuple]]) -> PartitionDigest:
+    """Computes the digest of (key, values) tuples of normalized values the
+    same way `HanaClient.get_partition_digests` does inside of HANA. The
+    digest doesn't depend on the order of the rows, so the systems don't
+    have to agree on how they sort the keys."""
+
+    accumulator = DigestAccumulator()
+    for key, values in rows:
+        accumulator.add(values)
+    return accumulator.digest
+
+
+class ReconciliationSide:
+    """One of the two systems that are reconciled. A side describes a table by
+    the partition column, whose values are split into key ranges, the key
+    columns, which identify a record, and the compared columns."""
+
+    def __init__(self, partition_column: str, key_columns: list[str], columns: list[str]) -> None:
+        self._partition_column = partition_column
+        self._key_columns = key_columns
+        self._columns = columns
+
+    @property
+    def fields(self) -> list[str]:
+        """The key columns followed by the compared columns that are no key
+        columns"""
+        return self._key_columns + [column for column in self._columns if column not in self._key_columns]
+
+    def _to_record(self, row) -> tuple[tuple, tuple]:
+        values = dict(zip(self.fields, [normalize(value) for value in row]))
+        return (tuple(values[column] for column in self._key_columns),
+                tuple(values[column] for column in self._columns))
+
+    def rowcount(self) -> int:
+        raise NotImplementedError()
+
+    def digests(self, keyranges: list[KeyRange]) -> list[PartitionDigest]:
+        raise NotImplementedError()
+
+    def records(self, keyrange: KeyRange) -> dict[tuple, tuple]:
+        """Gets the normalized compared values by the normalized key for all
+        records of the range."""
+        raise NotImplementedError()
+
+    def boundaries(self, keyrange: KeyRange, partitions: int) -> list:
+        """Gets the values of the partition column that split the range into
+        partitions of about the same size. Sides that can't compute them
+        return None."""
+        return None
+
+
+class HanaReconciliationSide(ReconciliationSide):
+    """A table in HANA. The digests are computed inside of HANA."""
+
+    def __init__(self, hanaclient: HanaClient, schemaname: str, tablename: str, partition_column: str,
+                 key_columns: list[str], columns: list[str]) -> None:
+        super().__init__(partition_column, key_columns, columns)
+        self._hanaclient = hanaclient
+        self._schemaname = schemaname
+        self._tablename = tablename
+
+    def rowcount(self) -> int:
+        return self._hanaclient.get_rowcount(self._schemaname, self._tablename)
+
+    def digests(self, keyranges: list[KeyRange]) -> list[PartitionDigest]:
+        digests = self._hanaclient.get_partition_digests(
+            self._schemaname, self._tablename, self._partition_column,
+            [(keyrange.lower, keyrange.upper) for keyrange in keyranges], self._key_columns, self._columns)
+        return [PartitionDigest(rowcount, checksum) for rowcount, checksum in digests]
+
+    def records(self, keyrange: KeyRange) -> dict[tuple, tuple]:
+        rows = self._hanaclient.get_rows_in_range(
+            self._schemaname, self._tablename, self._partition_column, keyrange.lower, keyrange.upper,
+            self.fields)
+        return dict(self._to_record(row) for row in rows)
+
+    def boundaries(self, keyrange: KeyRange, partitions: int) -> list:
+        return self._hanaclient.get_partition_boundaries(
+            self._schemaname, self._tablename, self._partition_column, partitions, keyrange.lower,
+            keyrange.upper)
+
+
+# the ABAP internal types of the fields that can be compared, see
+# `normalize_abap`
+ABAP_CHARACTER_TYPES = {'C', 'N', 'D', 'T', 'g'}
+ABAP_INTEGER_TYPES = {'I', 'b', 's', '8'}
+ABAP_COMPARABLE_TYPES = ABAP_CHARACTER_TYPES | ABAP_INTEGER_TYPES | {'P'}
+
+
+def normalize_abap(value: str, abaptype: str) -> str:
+    """Converts a value RFC_READ_TABLE returns in the ABAP external format to
+    the representation of HANA's TO_NVARCHAR, e.g. the date `20240131` to
+    `2024-01-31` and the packed number `12.50-` to `-12.50`. The initial 
+    date is compared like NULL."""
+
+    value = value.strip()
+    if value == '':
+        return value
+    if abaptype == 'D':
+        if value.strip('0') == '':
+            return ''
+        return f'{value[:4]}-{value[4:6]}-{value[6:8]}'
+    if abaptype == 'T':
+        return f'{value[:2]}:{value[2:4]}:{value[4:6]}'
+    if abaptype in ABAP_INTEGER_TYPES or abaptype == 'P':
+        if value.endswith('-'):
+            value = '-' + value[:-1].strip()
+        if abaptype in ABAP_INTEGER_TYPES:
+            value = str(int(value))
+    return value
+
+
+class CitAbapReconciliationSide(ReconciliationSide):
+    """A CIT dataset on an ABAP system. ABAP offers no hash functions via RFC,
+    so the rows of a range are read with RFC_READ_TABLE and the digests are
+    computed on the client side.
+
+    The rows are read page by page and the digests are computed while they
+    are streamed, no rows are kept. Contiguous ranges are read with one
+    query, so the table is read once for the top level ranges and the
+    following levels and the records only read the mismatching ranges
+    again.
+
+    The values are normalized per ABAP type, see `normalize_abap`. Fields of
+    other types, e.g. raw or float fields, can't be compared.
+
+    RFC connections must not be used by several threads at once, so all calls
+    of a side are serialized."""
+
+    def __init__(self, citabapclient: CitAbapClient, dataset_identifier: str, partition_column: str,
+                 key_columns: list[str], columns: list[str], pagesize: int = 10000) -> None:
+        super().__init__(partition_column, key_columns, columns)
+        self._citabapclient = citabapclient
+        self._dataset_identifier = dataset_identifier
+        self._pagesize = pagesize
+        self._lock = threading.Lock()
+        # (ABAP internal type, length) by field name
+        self._fieldtypes = None
+
+    @property
+    def tablename(self) -> str:
+        with self._lock:
+            return self._citabapclient.get_tablename(self._dataset_identifier)
+
+    def rowcount(self) -> int:
+        with self._lock:
+            return self._citabapclient.get_rowcount(self._dataset_identifier)
+
+    @property
+    def _readfields(self) -> list[str]:
+        """The fields followed by the partition column if it is none of them"""
+        fields = self.fields
+        if self._partition_column not in fields:
+            fields = fields + [self._partition_column]
+        return fields
+
+    def _get_fieldtypes(self, tablename: str) -> dict[str, tuple[str, int]]:
+        """Gets the types of the fields, the lock must be held."""
+
+        if self._fieldtypes is None:
+            fieldtypes = self._citabapclient.get_field_types(tablename)
+            for field in self._readfields:
+                if field not in fieldtypes:
+                    raise ValueError(f'The table {tablename} has no field {field}!')
+                if fieldtypes[field][0] not in ABAP_COMPARABLE_TYPES:
+                    raise ValueError(f'The field {field} of the table {tablename} has the ABAP type '
+                                     f'{fieldtypes[field][0]}, which can\'t be compared!')
+            self._fieldtypes = fieldtypes
+        return self._fieldtypes
+
+    def _where(self, keyrange: KeyRange, fieldtypes: dict[str, tuple[str, int]]) -> str:
+        abaptype, length = fieldtypes[self._partition_column]
+        terms = []
+        if keyrange.lower is not None:
+            terms.append(
+                f'{self._partition_column} >= {self._literal(keyrange.lower, abaptype, length)}')
+        if keyrange.upper is not None:
+            terms.append(
+                f'{self._partition_column} < {self._literal(keyrange.upper, abaptype, length)}')
+        return ' AND '.join(terms)
+
+    @staticmethod
+    def _literal(value, abaptype: str, length: int) -> str:
+        """Renders a bound in Open SQL. Bounds of character fields are
+        converted to the ABAP internal format and quoted. ABAP has literals
+        for non-negative integers only, other numbers are passed as text
+        literals, which ABAP converts to the type of the field."""
+
+        if abaptype in ABAP_CHARACTER_TYPES:
+            if abaptype == 'D':
+                text = value.strftime('%Y%m%d') if hasattr(value, 'strftime') else str(value).replace('-', '')
+            elif abaptype == 'T':
+                text = value.strftime('%H%M%S') if hasattr(value, 'strftime') else str(value).replace(':', '')
+            elif abaptype == 'N' and str(value).isdigit():
+                text = str(value).zfill(length)
+            else:
+                text = str(value)
+            return "'" + text.replace("'", "''") + "'"
+
+        try:
+            number = Decimal(str(value))
+        except ArithmeticError:
+            raise ValueError(f'The bound {value} of the numeric partition column is no number!')
+        if number == number.to_integral_value() and number >= 0:
+            return str(int(number))
+        return f"'{number}'"
+
+    def _iter_rows(self, keyrange: KeyRange) -> Iterator[tuple[str, tuple[tuple, tuple]]]:
+        """Reads the (partition value, record) tuples of a range page by page,
+        the lock must be held."""
+
+        tablename = self._citabapclient.get_tablename(self._dataset_identifier)
+        fieldtypes = self._get_fieldtypes(tablename)
+        fields = self._readfields
+        abaptypes = [fieldtypes[field][0] for field in fields]
+        position = fields.index(self._partition_column)
+        for row in self._citabapclient.iter_table(tablename, fields, self._where(keyrange, fieldtypes),
+                                                  pagesize=self._pagesize):
+            values = [normalize_abap(value, abaptype) for value, abaptype in zip(row, abaptypes)]
+            yield values[position], self._to_record(values[:len(self.fields)])
+
+    @staticmethod
+    def _find(keyranges: list[KeyRange], start: int, end: int, value: str) -> int:
+        """Finds the range of a value among the contiguous ranges start to
+        end."""
+
+        while start < end - 1:
+            middle = (start + end - 1) // 2
+            upper = keyranges[middle].upper
+            if upper is None or _comparable(value, upper) < 0:
+                end = middle + 1
+            else:
+                start = middle + 1
+        return start
+
+    def digests(self, keyranges: list[KeyRange]) -> list[PartitionDigest]:
+        accumulators = [DigestAccumulator() for keyrange in keyranges]
+        start = 0
+        with self._lock:
+            while start < len(keyranges):
+                end = start + 1
+                while (end < len(keyranges) and keyranges[end - 1].upper is not None
+                       and keyranges[end - 1].upper == keyranges[end].lower):
+                    end += 1
+
+                span = KeyRange(keyranges[start].lower, keyranges[end - 1].upper)
+                for partitionvalue, (key, values) in self._iter_rows(span):
+                    accumulators[self._find(keyranges, start, end, partitionvalue)].add(values)
+                start = end
+        return [accumulator.digest for accumulator in accumulators]
+
+    def records(self, keyrange: KeyRange) -> dict[tuple, tuple]:
+        with self._lock:
+            return dict(record for partitionvalue, record in self._iter_rows(keyrange))
+
+
+def _comparable(value, bound) -> int:
+    """Compares a value read as string with a bound of the type of the target
+    system, e.g. an int, so that '9' < 10 < '10'. Returns -1, 0 or 1."""
+
+    if not isinstance(value, str) or isinstance(bound, str):
+        other = bound
+    else:
+        try:
+            value = type(bound)(value)
+            other = bound
+        except (TypeError, ValueError, ArithmeticError):
+            other = str(bound)
+    return (value > other) - (value < other)
+
+
+class RecordDifferenceKind(Enum):
+    MISSING_IN_TARGET = 'MISSING_IN_TARGET'
+    MISSING_IN_SOURCE = 'MISSING_IN_SOURCE'
+    CHANGED = 'CHANGED'
+
+
+class RecordDifference:
+    """A record that differs between source and target."""
+
+    def __init__(self, kind: RecordDifferenceKind, key: tuple, sourcevalues: tuple, targetvalues: tuple) -> None:
+        self._kind = kind
+        self._key = key
+        self._sourcevalues = sourcevalues
+        self._targetvalues = targetvalues
+
+    @property
+    def kind(self) -> RecordDifferenceKind:
+        return self._kind
+
+    @property
+    def key(self) -> tuple:
+        return self._key
+
+    @property
+    def sourcevalues(self) -> tuple:
+        """The compared values in the source or None if the record is missing"""
+        return self._sourcevalues
+
+    @property
+    def targetvalues(self) -> tuple:
+        """The compared values in the target or None if the record is missing"""
+        return self._targetvalues
+
+    def __str__(self) -> str:
+        return f'{self.kind.value}:\t{self.key}, Source:\t{self.sourcevalues}, Target:\t{self.targetvalues}'
+
+
+class ReconciliationReport:
+    """The result of a reconciliation."""
+
+    def __init__(self) -> None:
+        self.sourcecount = None
+        self.targetcount = None
+        self.differences = []
+        self.comparedpartitions = 0
+        self.mismatchingpartitions = 0
+        self.comparedleaves = 0
+        self.duration = 0.0
+
+    @property
+    def consistent(self) -> bool:
+        return len(self.differences) == 0 and self.sourcecount == self.targetcount
+
+    def __str__(self) -> str:
+        lines = [f'Source rows:\t{self.sourcecount}, Target rows:\t{self.targetcount}, '
+                 f'Compared partitions:\t{self.comparedpartitions}, '
+                 f'Mismatching partitions:\t{self.mismatchingpartitions}, '
+                 f'Compared leaves:\t{self.comparedleaves}, Differences:\t{len(self.differences)}, '
+                 f'Duration:\t{self.duration:.3f}s']
+        lines.extend(str(difference) for difference in self.differences)
+        return '\n'.join(lines)
+
+
+class Reconciler:
+    """Compares a source with its replicated target down to the records.
+
+    Both sides are split into the same key ranges and only the digests of the
+    ranges are compared. Ranges whose digests differ are split again until
+    they hold at most `leafsize` rows, then the records of these ranges are
+    read from both sides and compared. Source and target are always queried
+    at the same time.
+
+    The key ranges are computed by the target, typically HANA, or by the
+    source if the target can't provide them, e.g. because it is empty. They
+    must be valid for both sides, so the partition column should be 
+    comparable the same way on both sides. The digests don't depend on the
+    order of the rows.
+    """
+
+    def __init__(self, source: ReconciliationSide, target: ReconciliationSide, partitions: int = 64,
+                 leafsize: int = 10000, max_workers: int = 4) -> None:
+        if partitions < 2:
+            raise ValueError('The number of partitions must be at least 2!')
+
+        self._source = source
+        self._target = target
+        self._partitions = partitions
+        self._leafsize = leafsize
+        self._max_workers = max_workers
+
+    @staticmethod
+    def reconcile_cit_dataset(citabapclient: CitAbapClient, dataset_identifier: str, hanaclient: HanaClient,
+                              schemaname: str, tablename: str, partition_column: str, key_columns: list[str],
+                              columns: list[str], **kwargs) -> ReconciliationReport:
+        """Reconciles a CIT dataset with its replication into a HANA table."""
+
+        source = CitAbapReconciliationSide(
+            citabapclient, dataset_identifier, partition_column, key_columns, columns)
+        target = HanaReconciliationSide(
+            hanaclient, schemaname, tablename, partition_column, key_columns, columns)
+        return Reconciler(source, target, **kwargs).reconcile()
+
+    def _split(self, keyrange: KeyRange) -> list[KeyRange]:
+        boundaries = self._target.boundaries(keyrange, self._partitions)
+        if not boundaries:
+            boundaries = self._source.boundaries(keyrange, self._partitions)
+        if not boundaries:
+            return [keyrange]
+
+        points = [boundary for boundary in boundaries
+                  if keyrange.lower is None or boundary > keyrange.lower]
+        if len(points) == 0:
+            return [keyrange]
+
+        keyranges = [KeyRange(keyrange.lower, points[0])]
+        for lower, upper in zip(points, points[1:]):
+            keyranges.append(KeyRange(lower, upper))
+        keyranges.append(KeyRange(points[-1], keyrange.upper))
+        return keyranges
+
+    def reconcile(self) -> ReconciliationReport:
+        start = monotonic()
+        report = ReconciliationReport()
+
+        with ThreadPoolExecutor(max_workers=max(2, self._max_workers)) as executor:
+            sourcecount = executor.submit(self._source.rowcount)
+            targetcount = executor.submit(self._target.rowcount)
+            report.sourcecount = sourcecount.result()
+            report.targetcount = targetcount.result()
+
+            leaves = []
+            keyranges = self._split(KeyRange())
+            rowcount = max(report.sourcecount, report.targetcount)
+            if len(keyranges) == 1 and rowcount > self._leafsize:
+                # comparing the whole table record by record is not what
+                # the reconciliation is meant for
+                raise RuntimeError(f'The table with {rowcount} rows can\'t be partitioned, '
+                                   f'neither side provides boundaries!')
+            while len(keyranges) > 0:
+                sourcedigests = executor.submit(
+                    self._source.digests, keyranges)
+                targetdigests = executor.submit(
+                    self._target.digests, keyranges)
+                report.comparedpartitions += len(keyranges)
+
+                mismatching = [(keyrange, sourcedigest, targetdigest) for keyrange, sourcedigest, targetdigest
+                               in zip(keyranges, sourcedigests.result(), targetdigests.result())
+                               if sourcedigest != targetdigest]
+                report.mismatchingpartitions += len(mismatching)
+
+                keyranges = []
+                for keyrange, sourcedigest, targetdigest in mismatching:
+                    if max(sourcedigest.rowcount, targetdigest.rowcount) <= self._leafsize:
+                        leaves.append(keyrange)
+                        continue
+
+                    subranges = self._split(keyrange)
+                    if len(subranges) == 1:
+                        leaves.append(keyrange)
+                    else:
+                        keyranges.extend(subranges)
+
+            report.comparedleaves = len(leaves)
+            for keyrange in leaves:
+                sourcerecords = executor.submit(self._source.records, keyrange)
+                targetrecords = executor.submit(self._target.records, keyrange)
+                report.differences.extend(self._compare(
+                    sourcerecords.result(), targetrecords.result()))
+
+        report.differences.sort(key=lambda difference: difference.key)
+        report.duration = monotonic() - start
+        return report
+
+    @staticmethod
+    def _compare(sourcerecords: dict[tuple, tuple], targetrecords: dict[tuple, tuple]) -> list[RecordDifference]:
+        differences = []
+        for key, sourcevalues in sourcerecords.items():
+            targetvalues = targetrecords.get(key, None)
+            if targetvalues is None:
+                differences.append(RecordDifference(
+                    RecordDifferenceKind.MISSING_IN_TARGET, key, sourcevalues, None))
+            elif targetvalues != sourcevalues:
+                differences.append(RecordDifference(
+                    RecordDifferenceKind.CHANGED, key, sourcevalues, targetvalues))
+
+        for key, targetvalues in targetrecords.items():
+            if key not in sourcerecords:
+                differences.append(RecordDifference(
+                    RecordDifferenceKind.MISSING_IN_SOURCE, key, None, targetvalues))
+        return differences
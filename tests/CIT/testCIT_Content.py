@@ -2,11 +2,15 @@ import os
 import unittest
 
 from framework.infrastructure.Utils import ConnectionData
-from framework.validation.abap.CitAbapClient import CitAbapClient
+from framework.infrastructure.utils.SessionRegistry import get_citabapclient
+from framework.infrastructure.utils.TestResources import uses_resources
 
 SYSTEM_ID = "SAL"
+DATASET_IDENTIFIERS = ['WA_LS', 'WF_LL', 'WF_LM', 'WF_LS', 'WF_LX', 'WN_LL', 'WN_LM', 'WN_LS', 'WN_LX',
+                       'WS_LL', 'WS_LM', 'WS_LS', 'WS_LX', 'WX_LL', 'WX_LM', 'WX_LS', 'WX_LX']
 
 
+@uses_resources('abap:SAL')
 class testCIT_Content(unittest.TestCase):
     """Performs a check of all CIT tables for expected table sizes.
 
@@ -27,11 +31,14 @@ class testCIT_Content(unittest.TestCase):
                 __file__), 'connectiondata')
 
             connection_data = ConnectionData.for_abap(SYSTEM_ID, test_path)
-            self.abap_system = CitAbapClient.connect_to(connection_data)
+            self.abap_system = get_citabapclient(connection_data)
 
             self.assertIsNotNone(
                 self.abap_system, 'Connection to cluster failed!')
 
+            # count all datasets in parallel, the tests use the memoized counts
+            list(self.abap_system.get_rowcounts(DATASET_IDENTIFIERS))
+
     def _check_size(self, table_id, expected_size):
         count = self.abap_system.get_rowcount(table_id)
         self.assertEqual(expected_size, count)
@@ -2,8 +2,9 @@ import os
 import unittest
 from unittest.case import skip
 
-from framework.infrastructure.Cluster import Cluster
 from framework.infrastructure.Utils import ConnectionData
+from framework.infrastructure.utils.SessionRegistry import get_cluster
+from framework.infrastructure.utils.TestResources import uses_resources
 
 
 def get_connection_data():
@@ -18,6 +19,7 @@ def get_connection_data():
     return connection_data
 
 
+@uses_resources('cluster:CIT')
 class testCIT_RMS_runtime(unittest.TestCase):
     cluster = None
 
@@ -25,7 +27,7 @@ class testCIT_RMS_runtime(unittest.TestCase):
     def setUp(self) -> None:
         if self.cluster == None:
             connection_data = get_connection_data()
-            self.cluster = Cluster.connect_to(connection_data)
+            self.cluster = get_cluster(connection_data)
 
         self.assertIsNotNone(self.cluster, 'Connection to cluster failed!')
 
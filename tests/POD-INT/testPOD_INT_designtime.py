@@ -2,9 +2,10 @@ import os
 import unittest
 from unittest.case import skip
 
-from framework.infrastructure.Cluster import Cluster
 from framework.infrastructure.Rms import ChangerequeststatusStatus
 from framework.infrastructure.Utils import ConnectionData
+from framework.infrastructure.utils.SessionRegistry import get_cluster
+from framework.infrastructure.utils.TestResources import uses_resources
 from framework.infrastructure.replications.Replication import ReplicationLoadtype, ReplicationTaskFilterOperator
 
 
@@ -20,6 +21,7 @@ def get_connection_data():
     return connection_data
 
 
+@uses_resources('cluster:CIT')
 class testPOD_INT_designtime(unittest.TestCase):
     cluster = None
 
@@ -27,7 +29,7 @@ class testPOD_INT_designtime(unittest.TestCase):
     def setUp(self) -> None:
         if self.cluster == None:
             connection_data = get_connection_data()
-            self.cluster = Cluster.connect_to(connection_data)
+            self.cluster = get_cluster(connection_data)
 
         self.assertIsNotNone(self.cluster, 'Connection to cluster failed!')
 
@@ -2,11 +2,13 @@ import os
 import unittest
 from unittest.case import skip
 from framework.infrastructure.Utils import ConnectionData
+from framework.infrastructure.utils.TestResources import uses_resources
 
 
 from framework.validation.abap.AbapClient import AbapClient
 
 
+@uses_resources('abap:SAL')
 class testAbapRfc(unittest.TestCase):
 
     def create_client(self) -> AbapClient:
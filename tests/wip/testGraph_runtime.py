@@ -3,11 +3,12 @@ import uuid
 import os
 from datetime import datetime
 from decimal import *
-from framework.infrastructure.Cluster import Cluster
 from framework.infrastructure.App import App
 from framework.infrastructure.utils.netweaver.SLTConfigurationOperation import SLTConfigurationOperation as sltConfig
-from framework.validation.hana.HanaClient import HanaClient
+from framework.infrastructure.utils.netweaver.MassTransferIdPool import MassTransferIdPool
 from framework.infrastructure.Utils import ConnectionData
+from framework.infrastructure.utils.SessionRegistry import get_cluster, get_hanaclient
+from framework.infrastructure.utils.TestResources import uses_resources
 
 
 def get_connection_data():
@@ -33,6 +34,7 @@ def get_hana_connection_data(name: str):
     return connection_data
 
 
+@uses_resources('cluster:CET', 'hana:HANA_EU10')
 class testPOD_Graph_Pipeline(unittest.TestCase):
     cluster = None
     hanaClient = None
@@ -96,11 +98,11 @@ class testPOD_Graph_Pipeline(unittest.TestCase):
         if self.cluster == None:
             app = App()
             connection_data = get_connection_data()
-            self.cluster = Cluster.connect_to(connection_data)
+            self.cluster = get_cluster(connection_data)
         self.assertIsNotNone(self.cluster, 'Connection to cluster failed!')
         hanaConnectionData = get_hana_connection_data("HANA_EU10")
         if self.hanaClient == None:
-            self.hanaClient = HanaClient.connect_to(hanaConnectionData)
+            self.hanaClient = get_hanaclient(hanaConnectionData)
         self.assertIsNotNone(self.hanaClient, 'Connection to Hana failed!')
         targetTableSuffix = app.getTableSuffix()
         now = datetime.now()
@@ -116,9 +118,12 @@ class testPOD_Graph_Pipeline(unittest.TestCase):
             "SLTtoKafkaReplicationTable": f"POD_PIPELINE_SLT_TO_KAFKA_REPLICATION_{targetTableSuffix}_{timestampSuffix}"
         }
         self.sltoperation = sltConfig()
+        # the SLT configurations for the four SLT tests are created in the background
+        self.mtidpool = MassTransferIdPool(self.sltoperation, size=4, maxcreated=4).start()
 
     @classmethod
     def tearDownClass(self):
+        self.mtidpool.close()
         self.hanaClient = None
 
     def test_start_CDStoHANA_Initial(self):
@@ -181,7 +186,7 @@ class testPOD_Graph_Pipeline(unittest.TestCase):
 
     def test_start_SLTtoHANA_Initial(self):
         RUN_ID = "test" + uuid.uuid4().hex
-        MT_ID, _ = self.sltoperation.get_mass_transfer_id()
+        MT_ID, _ = self.mtidpool.lease()
         configSubstitutions = {
             "SLT_TABLE_NAME": "SNWD_SO",
             "KAFKA_CONNECTION": "KAFKA",
@@ -197,7 +202,7 @@ class testPOD_Graph_Pipeline(unittest.TestCase):
 
     def test_start_SLTtoHANA_Replication(self):
         RUN_ID = "test" + uuid.uuid4().hex
-        MT_ID, _ = self.sltoperation.get_mass_transfer_id()
+        MT_ID, _ = self.mtidpool.lease()
         configSubstitutions = {
             "SLT_TABLE_NAME": "SNWD_SO",
             "KAFKA_CONNECTION": "KAFKA",
@@ -213,7 +218,7 @@ class testPOD_Graph_Pipeline(unittest.TestCase):
 
     def test_start_SLTtoKafka_Initial(self):
         RUN_ID = "test" + uuid.uuid4().hex
-        MT_ID, _ = self.sltoperation.get_mass_transfer_id()
+        MT_ID, _ = self.mtidpool.lease()
         configSubstitutions = {
             "SLT_TABLE_NAME": "SNWD_SO",
             "KAFKA_CONNECTION": "KAFKA",
@@ -231,7 +236,7 @@ class testPOD_Graph_Pipeline(unittest.TestCase):
     
     def test_start_SLTtoKafka_Replication(self):
         RUN_ID = "test" + uuid.uuid4().hex
-        MT_ID, _ = self.sltoperation.get_mass_transfer_id()
+        MT_ID, _ = self.mtidpool.lease()
         configSubstitutions = {
             "SLT_TABLE_NAME": "SNWD_SO",
             "KAFKA_CONNECTION": "KAFKA",
@@ -1,10 +1,21 @@
+import argparse
+import glob
+import shutil
+import tempfile
 import unittest
 import sys
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 import xmlrunner
 import os
 #  Add the project's root directory into sys.path
 sys.path.insert(0, os.path.abspath(
     os.path.join(os.path.dirname(__file__), '..')))
+from testtimings import TestTimings, TimedTestResult, pack  # noqa: E402
+from framework.infrastructure.utils.TestResources import DEFAULT_LIMITS, ResourceLimiter, get_resources  # noqa: E402
+
+# the discovered test classes of a worker process, see run_classes
+_discovered = {}
 
 
 def get_suite(prefix, path, cuspattern):
@@ -16,25 +27,232 @@ def get_suite(prefix, path, cuspattern):
     return suite
 
 
+def iter_tests(suite):
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+def get_classname(test):
+    return f'{type(test).__module__}.{type(test).__qualname__}'
+
+
+def group_by_class(suite):
+    """Groups the tests of the suite by their test class, keeping the order
+    of discovery. A class is never split, so its fixtures run only once."""
+
+    classes = {}
+    for test in iter_tests(suite):
+        classes.setdefault(get_classname(test), []).append(test)
+    return classes
+
+
+def estimate_classes(classes, timings):
+    """Estimates the duration of every class from the timings of its tests."""
+
+    return {classname: timings.estimate_all(test.id() for test in tests)
+            for classname, tests in classes.items()}
+
+
+def select_shard(durations, index, count):
+    """Selects the classes of shard `index` of `count` (1-based). The classes
+    are packed longest first by their estimated durations, so every executor
+    of a CI run with the same timings gets the same split."""
+
+    return pack(durations, count)[index - 1]
+
+
+def get_class_resources(classes):
+    """Gets the resources every class uses, those of all of its tests."""
+
+    return {classname: set().union(*(get_resources(test) for test in tests))
+            for classname, tests in classes.items()}
+
+
+def parse_shard(value):
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected i/n")
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected 1 <= i <= n")
+    return index, count
+
+
+def run_classes(prefix, path, pattern, classnames, output):
+    """Runs the tests of the given classes, the JUnit XML is written into the
+    output folder. Used by the worker processes, which discover the tests
+    again because test cases can't be passed between processes."""
+
+    key = (prefix, path, pattern)
+    if key not in _discovered:
+        _discovered[key] = group_by_class(get_suite(prefix, path, pattern))
+    classes = _discovered[key]
+    suite = unittest.TestSuite()
+    for classname in classnames:
+        suite.addTests(classes.get(classname, []))
+    runner = xmlrunner.XMLTestRunner(output=output, resultclass=TimedTestResult)
+    result = runner.run(suite)
+    return result.wasSuccessful(), result.durations
+
+
+def merge_reports(folders, filename):
+    """Merges the JUnit XML files of the folders into one report."""
+
+    testsuites = ET.Element('testsuites')
+    totals = {'tests': 0, 'failures': 0, 'errors': 0, 'skipped': 0}
+    time = 0.0
+    for folder in folders:
+        for report in sorted(glob.glob(os.path.join(folder, '*.xml'))):
+            root = ET.parse(report).getroot()
+            suites = [root] if root.tag == 'testsuite' else root.findall('testsuite')
+            for testsuite in suites:
+                for name in totals:
+                    totals[name] += int(testsuite.get(name, 0))
+                time += float(testsuite.get('time', 0))
+                testsuites.append(testsuite)
+
+    for name, value in totals.items():
+        testsuites.set(name, str(value))
+    testsuites.set('time', f'{time:.3f}')
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    ET.ElementTree(testsuites).write(filename, encoding='UTF-8', xml_declaration=True)
+
+
+def write_error_report(folder, classname, message):
+    """Writes a JUnit XML file that reports a class that didn't run as one
+    test with an error, so that it shows up in the merged report."""
+
+    testsuite = ET.Element('testsuite', name=classname, tests='1', failures='0', errors='1',
+                           skipped='0', time='0.000')
+    testcase = ET.SubElement(testsuite, 'testcase', classname=classname, name=classname, time='0.000')
+    ET.SubElement(testcase, 'error', message=message, type='RuntimeError').text = message
+    os.makedirs(folder, exist_ok=True)
+    ET.ElementTree(testsuite).write(os.path.join(folder, 'TEST-error.xml'), encoding='UTF-8',
+                                    xml_declaration=True)
+
+
+def run_parallel(prefix, path, pattern, durations, resources, output, workers, timings, limiter):
+    """Runs the classes in worker processes and merges their reports into
+    one JUnit XML file in the output folder. The measured durations are
+    recorded into the timings. A class whose worker fails or whose resources
+    can never be acquired is reported as failed, the reports of the other
+    classes are merged anyway.
+
+    The classes are started longest first. A class is only started when all
+    resources it uses are below their limit, otherwise the next class that
+    can run is started, so the workers are kept busy without overloading
+    the shared systems.
+    """
+
+    tempdir = tempfile.mkdtemp(prefix='runtestcases-')
+    pending = sorted(durations, key=lambda classname: (-durations[classname], classname))
+    running = {}
+    folders = []
+    successful = True
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for classname in list(pending):
+                    if len(running) >= workers:
+                        break
+                    if not limiter.try_acquire(resources[classname]):
+                        continue
+                    pending.remove(classname)
+                    folder = os.path.join(tempdir, f'class-{len(folders)}')
+                    folders.append(folder)
+                    future = executor.submit(run_classes, prefix, path, pattern, [classname], folder)
+                    running[future] = (classname, folder)
+
+                if not running:
+                    # nothing runs, so the resources are held by someone else
+                    for classname in pending:
+                        message = f'The resources of {classname} can never be acquired!'
+                        print(message, file=sys.stderr)
+                        folder = os.path.join(tempdir, f'class-{len(folders)}')
+                        folders.append(folder)
+                        write_error_report(folder, classname, message)
+                    successful = False
+                    break
+
+                done, notdone = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    classname, folder = running.pop(future)
+                    limiter.release(resources[classname])
+                    try:
+                        classsuccessful, measured = future.result()
+                    except Exception as e:
+                        # e.g. a crashed worker process or a test class that
+                        # can't be imported, the other classes still run
+                        message = f'{classname} failed: {e!r}'
+                        print(message, file=sys.stderr)
+                        write_error_report(folder, classname, message)
+                        successful = False
+                        continue
+                    successful = successful and classsuccessful
+                    timings.record(measured)
+
+        merge_reports(folders, os.path.join(output, 'TEST-results.xml'))
+        return successful
+    finally:
+        shutil.rmtree(tempdir, ignore_errors=True)
+
+
+def parse_limit(value):
+    name, separator, limit = value.partition('=')
+    try:
+        limit = int(limit)
+    except ValueError:
+        limit = 0
+    if not name or limit < 1:
+        raise argparse.ArgumentTypeError(f"invalid limit '{value}', expected name=n with n > 0")
+    return name, limit
+
+
+def parse_args(args):
+    parser = argparse.ArgumentParser(description='Runs the test cases with the given prefix.')
+    parser.add_argument('prefix', help="the prefix of the test methods, e.g. 'test_validation'")
+    parser.add_argument('path', nargs='?', default='tests')
+    parser.add_argument('pattern', nargs='?', default='test*.py')
+    parser.add_argument('output', nargs='?', default='testresult')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='the number of processes the test classes are distributed across')
+    parser.add_argument('--shard', type=parse_shard, default=None,
+                        help="run only the shard i of n, e.g. '2/4'")
+    parser.add_argument('--timings', default=None,
+                        help='the JSON file the test durations are read from and recorded into')
+    parser.add_argument('--limit', type=parse_limit, action='append', default=[],
+                        help="the maximum number of concurrent test classes using a resource or a kind "
+                        f"of resources, e.g. 'cluster=4' or 'abap:CIT_S4=2', defaults: {DEFAULT_LIMITS}")
+    parsed = parser.parse_args(args)
+    if parsed.workers < 1:
+        parser.error('--workers must be greater than zero')
+    return parsed
+
+
 # prefix values: "test_runGraph"
 # python runtestcases.py "test_validation" "tests" "testJobs*.py"
+# python runtestcases.py "test_validation" "tests" "test*.py" "testresult" --workers 4 --shard 1/2
+# python runtestcases.py "test_validation" "tests" "test*.py" "testresult" --workers 4 --timings timings.json
+# python runtestcases.py "test_validation" "tests" "test*.py" "testresult" --workers 8 --limit cluster=4 --limit hana=8
 if __name__ == '__main__':
-    argsLen = len(sys.argv)
-    if argsLen < 2:
-        raise Exception("please set testcases'prefix")
-    prefix = sys.argv[1]
-    if argsLen >= 3:
-        path = sys.argv[2]
-    else:
-        path = "tests"
-    if argsLen >= 4:
-        pattern = sys.argv[3]
-    else:
-        pattern = "test*.py"
-    if argsLen >= 5:
-        output = sys.argv[4]
-    else:
-        output = "testresult"
-    runner = xmlrunner.XMLTestRunner(output=output)
-    ret = not runner.run(get_suite(prefix, path, pattern)).wasSuccessful()
-    sys.exit(ret) 
\ No newline at end of file
+    args = parse_args(sys.argv[1:])
+    timings = TestTimings(args.timings)
+    if args.workers == 1 and args.shard is None:
+        runner = xmlrunner.XMLTestRunner(output=args.output, resultclass=TimedTestResult)
+        result = runner.run(get_suite(args.prefix, args.path, args.pattern))
+        timings.record(result.durations)
+        timings.save()
+        sys.exit(not result.wasSuccessful())
+
+    classes = group_by_class(get_suite(args.prefix, args.path, args.pattern))
+    durations = estimate_classes(classes, timings)
+    if args.shard is not None:
+        durations = {classname: durations[classname] for classname in select_shard(durations, *args.shard)}
+    limiter = ResourceLimiter({**DEFAULT_LIMITS, **dict(args.limit)})
+    ret = not run_parallel(args.prefix, args.path, args.pattern, durations, get_class_resources(classes),
+                           args.output, args.workers, timings, limiter)
+    timings.save()
+    sys.exit(ret)
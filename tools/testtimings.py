@@ -0,0 +1,104 @@
+import heapq
+import json
+import os
+import statistics
+from time import monotonic
+
+import xmlrunner.result
+
+
+class TestTimings:
+    """The wall times of the tests by test id, persisted in a JSON file.
+
+    A new measurement is averaged with the previous one, so a single slow run
+    doesn't distort the schedule. Tests that have never run are estimated
+    with the median of the known durations. The file has to be shared by all
+    executors of a sharded run, otherwise they compute different shards.
+    """
+
+    def __init__(self, filename=None, default=1.0):
+        self._filename = filename
+        self._default = default
+        self._durations = {}
+        if filename is not None and os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as file:
+                self._durations = json.load(file)
+
+    def __len__(self):
+        return len(self._durations)
+
+    def get(self, testid):
+        return self._durations.get(testid, None)
+
+    def estimate(self, testid):
+        duration = self._durations.get(testid, None)
+        if duration is not None:
+            return duration
+        if self._durations:
+            return statistics.median(self._durations.values())
+        return self._default
+
+    def estimate_all(self, testids):
+        return sum(self.estimate(testid) for testid in testids)
+
+    def record(self, durations):
+        for testid, duration in durations.items():
+            previous = self._durations.get(testid, None)
+            self._durations[testid] = duration if previous is None else (previous + duration) / 2
+
+    def save(self):
+        if self._filename is None:
+            return
+        # written to a temporary file first, so an aborted run can't corrupt it
+        temporary = self._filename + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self._durations, file, indent=1, sort_keys=True)
+        os.replace(temporary, self._filename)
+
+
+def pack(durations, bins):
+    """Distributes the items across the bins with the longest processing
+    time first rule: the longest item goes into the bin with the smallest
+    total so far. Ties are broken by name, so the result is deterministic.
+
+    Parameters
+    ----------
+    durations : dict
+        The estimated durations by item.
+    bins : int
+        The number of bins.
+
+    Returns
+    -------
+    list[list]
+        The items of every bin, longest first.
+    """
+
+    if bins < 1:
+        raise ValueError('The number of bins must be greater than zero!')
+    packed = [[] for i in range(bins)]
+    heap = [(0.0, i) for i in range(bins)]
+    for item in sorted(durations, key=lambda item: (-durations[item], item)):
+        total, i = heapq.heappop(heap)
+        packed[i].append(item)
+        heapq.heappush(heap, (total + durations[item], i))
+    return packed
+
+
+class TimedTestResult(xmlrunner.result._XMLTestResult):
+    """Records the wall time of every test including its setUp and tearDown."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.durations = {}
+        self._started = None
+
+    def startTest(self, test):
+        self._started = monotonic()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        if self._started is not None:
+            self.durations[test.id()] = monotonic() - self._started
+            self._started = None